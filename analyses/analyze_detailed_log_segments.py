@@ -1,6 +1,6 @@
 """
 Detailed Log CSV Akıllı Segmentasyon Analizi
-- Sütun kaymalarını düzeltir
+- Logu sürümlü şemasına göre okur (log_cache.load_log_cached; sütun kayması tahmini yok)
 - Training session'larını tespit eder (büyük episode/update reset'leri)
 - Geçerli segmentleri belirler
 - Özet rapor oluşturur
@@ -11,7 +11,6 @@ import numpy as np
 import os
 import sys
 from pathlib import Path
-from collections import Counter
 
 # Windows encoding sorunu için
 if sys.platform == 'win32':
@@ -26,6 +25,9 @@ elif os.path.basename(os.getcwd()) == "analyses":
 else:
     BASE_DIR = "."
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from log_cache import load_log_cached  # noqa: E402
+
 MODELS_DIR = os.path.join(BASE_DIR, "models")
 ANALYSES_DIR = os.path.join(BASE_DIR, "analyses")
 DETAILED_LOG_FILE = os.path.join(MODELS_DIR, "detailed_log.csv")
@@ -33,79 +35,13 @@ OUTPUT_DIR = os.path.join(ANALYSES_DIR, "detailed_log_analysis")
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def load_csv_with_fix(file_path):
-    """CSV'yi yükle ve sütun kaymasını düzelt"""
+def load_detailed_log(file_path):
+    """Detaylı logu sürümlü şemasına göre yükle (cache: sadece yeni eklenen satırlar parse edilir)"""
     print(f"CSV yükleniyor: {file_path}")
-    
-    # Önce ilk birkaç satırı oku
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = [f.readline().strip() for _ in range(10)]
-    
-    header = lines[0]
-    print(f"Header: {header}")
-    print(f"Header sütun sayısı: {len(header.split(','))}")
-    
-    # İlk veri satırlarını kontrol et
-    data_lines = lines[1:6]
-    for i, line in enumerate(data_lines):
-        cols = line.split(',')
-        print(f"Satır {i+2} sütun sayısı: {len(cols)} - Örnek: {line[:80]}")
-    
-    # CSV'yi yükle (header'ı skip et, manuel oluştur)
-    # Önce tüm satırları oku
-    all_lines = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            all_lines.append(line.strip())
-    
-    header_line = all_lines[0]
-    data_lines = all_lines[1:]
-    
-    # En yaygın sütun sayısını bul
-    col_counts = Counter([len(line.split(',')) for line in data_lines if line.strip()])
-    most_common_cols = col_counts.most_common(1)[0][0]
-    print(f"\nEn yaygın sütun sayısı: {most_common_cols}")
-    print(f"Sütun sayısı dağılımı: {dict(col_counts.most_common(5))}")
-    
-    # Verileri parse et
-    parsed_data = []
-    for line in data_lines:
-        if not line.strip():
-            continue
-        cols = line.split(',')
-        if len(cols) == most_common_cols:
-            parsed_data.append(cols)
-        elif len(cols) > most_common_cols:
-            # Fazla sütun varsa, son birkaçını birleştir (virgül içeren string'ler için)
-            if len(cols) == most_common_cols + 1:
-                # Son iki sütunu birleştir (Reason sütunu virgül içerebilir)
-                cols = cols[:most_common_cols-1] + [','.join(cols[most_common_cols-1:])]
-                parsed_data.append(cols)
-        else:
-            # Eksik sütun varsa skip et
-            continue
-    
-    # DataFrame oluştur
-    # Format: Episode,Update,Return,Reason,StartAlt,StartDist,final_dist,final_vel
-    if most_common_cols == 8:
-        column_names = ['Episode', 'Update', 'Return', 'Reason', 'StartAlt', 'StartDist', 'final_dist', 'final_vel']
-    elif most_common_cols == 7:
-        column_names = ['Episode', 'Update', 'Return', 'Reason', 'StartAlt', 'StartDist', 'Difficulty']
-    else:
-        # En yaygın format'a göre tahmin et
-        column_names = [f'Col{i+1}' for i in range(most_common_cols)]
-    
-    df = pd.DataFrame(parsed_data, columns=column_names)
-    
-    # Veri tiplerini düzelt
-    df['Episode'] = pd.to_numeric(df['Episode'], errors='coerce')
-    df['Update'] = pd.to_numeric(df['Update'], errors='coerce')
-    df['Return'] = pd.to_numeric(df['Return'], errors='coerce')
-    df['Reason'] = df['Reason'].astype(str).str.strip()
-    df['StartAlt'] = pd.to_numeric(df['StartAlt'], errors='coerce')
-    df['StartDist'] = pd.to_numeric(df['StartDist'], errors='coerce')
-    
-    print(f"\n✓ CSV yüklendi: {len(df)} satır")
+    df = load_log_cached(file_path, "detailed", verbose=True)
+    name, version = df.attrs["schema"]
+
+    print(f"\n✓ CSV yüklendi: {len(df)} satır (şema: {name}/v{version})")
     print(f"Sütunlar: {list(df.columns)}")
     print(f"\nİlk 5 kayıt:")
     print(df.head().to_string())
@@ -241,7 +177,7 @@ def main():
     print()
     
     # CSV yükle
-    df = load_csv_with_fix(DETAILED_LOG_FILE)
+    df = load_detailed_log(DETAILED_LOG_FILE)
     
     if df is None or len(df) == 0:
         print("❌ CSV yüklenemedi, analiz durduruluyor.")
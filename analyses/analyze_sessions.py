@@ -40,6 +40,9 @@ elif os.path.basename(os.getcwd()) == "analyses":
 else:
     BASE_DIR = "."
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from log_cache import load_log_cached  # noqa: E402
+
 SESSION_DIR = os.path.join(BASE_DIR, "analyses", "detailed_log_analysis")
 OUTPUT_DIR = os.path.join(BASE_DIR, "images")
 
@@ -53,7 +56,7 @@ def load_all_sessions(session_dir):
     
     for session_file in session_files:
         try:
-            df = pd.read_csv(session_file)
+            df = load_log_cached(session_file)  # değişmemiş session dosyaları cache'ten gelir
             
             # Veri tiplerini düzelt
             df['Episode'] = pd.to_numeric(df['Episode'], errors='coerce')
@@ -40,6 +40,9 @@ elif os.path.basename(os.getcwd()) == "analyses":
 else:
     BASE_DIR = "."
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from log_cache import load_log_cached  # noqa: E402
+
 MODELS_DIR = os.path.join(BASE_DIR, "models")
 DETAILED_LOG_FILE = os.path.join(MODELS_DIR, "detailed_log.csv")
 UPDATE_LOG_FILE = os.path.join(MODELS_DIR, "update_logs.csv")
@@ -56,34 +59,14 @@ def load_data():
         print(f"HATA: {DETAILED_LOG_FILE} bulunamadı!")
         return None, None
     
-    # Detaylı log - CSV'yi düzgün oku
-    # CSV'de sütun kayması varsa düzelt
-    df_detailed = pd.read_csv(DETAILED_LOG_FILE)
-    
-    # Eğer Return sütunu string ise ve Reason sayısal ise, sütunlar kaymış demektir
-    if df_detailed['Return'].dtype == 'object' and df_detailed['Reason'].dtype in ['float64', 'int64']:
-        print("   [WARN] CSV sutun kaymasi tespit edildi, duzeltiliyor...")
-        # Sütunları yeniden düzenle: Episode, Update, Return (numeric), Reason (string), StartAlt, StartDist, Difficulty
-        # Mevcut: Episode(int), Update(float), Return(string), Reason(float), StartAlt(float), StartDist(float), Difficulty(float)
-        # İstenen: Episode(int), Update(int), Return(float), Reason(string), StartAlt(float), StartDist(float), Difficulty(float)
-        
-        # Yeni DataFrame oluştur
-        new_df = pd.DataFrame()
-        new_df['Episode'] = df_detailed['Episode'].astype(int)
-        new_df['Update'] = df_detailed['Update'].astype(int)
-        new_df['Return'] = pd.to_numeric(df_detailed['Return'], errors='coerce')  # Eski Update sütunu
-        new_df['Reason'] = df_detailed['Return'].astype(str).str.strip()  # Eski Return sütunu (Reason olacak)
-        new_df['StartAlt'] = df_detailed['Reason'].astype(float)  # Eski Reason sütunu (StartAlt olacak)
-        new_df['StartDist'] = df_detailed['StartAlt'].astype(float)  # Eski StartAlt sütunu (StartDist olacak)
-        new_df['Difficulty'] = df_detailed['StartDist'].astype(float)  # Eski StartDist sütunu (Difficulty olacak)
-        
-        df_detailed = new_df
-        print(f"   [OK] Sutunlar duzeltildi. Success sayisi: {(df_detailed['Reason'].astype(str).str.strip() == 'Success').sum()}")
-    
+    # Sürümlü şemaya göre, doğru dtype'larla okunur; önceki çalıştırmadan beri eklenen satırlar parse edilir
+    df_detailed = load_log_cached(DETAILED_LOG_FILE, "detailed", verbose=True)
+    print(f"   Sema: {df_detailed.attrs['schema'][0]}/v{df_detailed.attrs['schema'][1]}")
+
     # Update log (varsa)
     df_updates = None
     if os.path.exists(UPDATE_LOG_FILE):
-        df_updates = pd.read_csv(UPDATE_LOG_FILE)
+        df_updates = load_log_cached(UPDATE_LOG_FILE, "update", verbose=True)
     
     print(f"[OK] {len(df_detailed)} episode yuklendi")
     if df_updates is not None:
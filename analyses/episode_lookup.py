@@ -0,0 +1,121 @@
+"""
+Episode Arama (Random Access)
+Tek bir episode'un (veya aralığın) adım verisini log'un tamamını taramadan, episode indeksi
+üzerinden dosya başına tek seek ile okur:
+- models/trajectories/*.traj (indeks: trajectories/episode_index.csv, train_main günceller)
+- Eski models/state_log.csv (indeks: state_log.index.csv, ilk kullanımda bir kez kurulur)
+
+Kullanım:
+    python analyses/episode_lookup.py --episode 1234
+    python analyses/episode_lookup.py --episodes 1200:1210 --out ep1200.csv
+    python analyses/episode_lookup.py --episode 5 --update 301   # resume sonrası run'daki episode 5
+    python analyses/episode_lookup.py --state-log models/state_log.csv --episode 1234
+    python analyses/episode_lookup.py --rebuild
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+
+# Dosya yolları
+if os.path.basename(os.getcwd()) == "scripts":
+    BASE_DIR = ".."
+elif os.path.basename(os.getcwd()) == "analyses":
+    BASE_DIR = ".."
+else:
+    BASE_DIR = "."
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from traj_store import EpisodeIndex, rebuild_csv_index, rebuild_traj_index  # noqa: E402
+
+TRAJ_DIR = os.path.join(BASE_DIR, "models", "trajectories")
+
+
+def open_index(args):
+    if args.state_log:
+        index_path = os.path.splitext(args.state_log)[0] + ".index.csv"
+        if args.rebuild or not os.path.exists(index_path):
+            t0 = time.perf_counter()
+            rebuild_csv_index(args.state_log, index_path)
+            print(f"İndeks kuruldu: {index_path} ({time.perf_counter() - t0:.2f} s)")
+        return EpisodeIndex(index_path)
+    if args.rebuild:
+        t0 = time.perf_counter()
+        rebuild_traj_index(args.traj_dir)
+        print(f"İndeks kuruldu: {args.traj_dir} ({time.perf_counter() - t0:.2f} s)")
+    return EpisodeIndex.for_trajectories(args.traj_dir)
+
+
+def to_frame(rows):
+    """Çok boyutlu sütunları (obs, actions, ...) obs_0, obs_1, ... olarak düzleştirir"""
+    flat = {}
+    for key, value in rows.items():
+        value = np.asarray(value)
+        if value.ndim == 1:
+            flat[key] = value
+        else:
+            for i in range(value.shape[1]):
+                flat[f"{key}_{i}"] = value[:, i]
+    return pd.DataFrame(flat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Episode indeksi ile tek episode / aralık okuma")
+    parser.add_argument("--traj-dir", default=TRAJ_DIR)
+    parser.add_argument("--state-log", help="Eski metin adım logu (state_log.csv) üzerinden ara")
+    parser.add_argument("--episode", type=int)
+    parser.add_argument("--episodes", help="Episode aralığı (dahil), ör. 1200:1210")
+    parser.add_argument("--update", type=int,
+                        help="Episode numarası birden fazla run'da (resume) geçiyorsa: bu update'i içeren run")
+    parser.add_argument("--rebuild", action="store_true", help="İndeksi baştan kur")
+    parser.add_argument("--out", help="Sonucu CSV olarak kaydet")
+    args = parser.parse_args()
+
+    source = args.state_log or args.traj_dir
+    if not os.path.exists(source):
+        print(f"Kaynak bulunamadı: {source} (train_main.py SAVE_TRAJECTORIES=True ile kaydedilir)")
+        return
+
+    index = open_index(args)
+    print(f"{len(index)} episode segmenti, {len(index.runs)} run indekste.")
+    if args.episode is None and not args.episodes:
+        return
+
+    t0 = time.perf_counter()
+    try:
+        if args.episodes:
+            lo, _, hi = args.episodes.partition(":")
+            segs = index.lookup(int(lo), int(hi), update=args.update)
+            rows = index.episodes(int(lo), int(hi), update=args.update) if segs else None
+        else:
+            segs = index.lookup(args.episode, update=args.update)
+            rows = index.episode(args.episode, update=args.update) if segs else None
+    except ValueError as e:
+        # Episode numarası resume'lar arasında tekrar ediyor: birleştirilmiş satırlar döndürmek yerine dur
+        print(f"Belirsiz: {e}")
+        return
+    elapsed = time.perf_counter() - t0
+    if rows is None:
+        print("İndekste eşleşen episode yok.")
+        return
+
+    df = to_frame(rows)
+    print(f"{len(segs)} segment, {len(df)} adım okundu ({1000 * elapsed:.1f} ms)")
+    for up, ep, name, off, length in segs:
+        print(f"  Update {up:>6} | Episode {ep:>7} | {name} @ {off} (+{length})")
+    print(df.head(10).to_string())
+    if args.out:
+        df.to_csv(args.out, index=False)
+        print(f"Kaydedildi: {args.out}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Offline Ödül Yeniden Puanlama (Reward Re-scoring)
+Kayıtlı ham yörüngeleri (models/trajectories/traj_up*.traj, train_main SAVE_TRAJECTORIES;
+eski traj_up*.npz kayıtları da okunur)
+alternatif bir ödül ayarıyla tek vektörize geçişte yeniden değerlendirir:
+- Episode return'lerinin nasıl kayacağı
+- Bitiş sebebi (termination reason) dağılımının nasıl değişeceği
+- Terim bazlı katkılar (hangi shaping terimi ne kadar ağırlık taşıyor)
+
+Her dosya kendi kayıtlı ödül ayarıyla (meta reward_params) puanlanır: baseline o ayarın kendisi,
+alternatif ise o ayarın üzerine verilen değişiklikler. Aralık bir ödül ayarı değişikliğini aşsa da
+Δ her dosyada kendi kaydına göre hesaplanır. Baseline ödülleri kayıttaki rewards sütunuyla kontrol edilir.
+
+Episode'lar yeni ayarın İLK done'unda kesilir (ör. tavan eşiği düşürülürse episode
+daha erken biter). Yeni ayarda hiç done olmayan episode'lar "Truncated" sayılır
+(kayıt orijinal bitişte sona erdiği için devamı bilinmiyor).
+
+Kullanım:
+    python analyses/rescore_rewards.py --set ceiling_dy=52 --set crash_penalty=-400
+    python analyses/rescore_rewards.py --config yeni_odul.json --updates 500:800
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+if sys.platform == 'win32':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+
+# Dosya yolları
+if os.path.basename(os.getcwd()) == "scripts":
+    BASE_DIR = ".."
+elif os.path.basename(os.getcwd()) == "analyses":
+    BASE_DIR = ".."
+else:
+    BASE_DIR = "."
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from env import REWARD_PARAMS, REWARD_TERMS, TERMINATION_REASONS, reward_done_batch  # noqa: E402
+from traj_store import TRAJ_EXT, TrajectoryFile, list_trajectories as list_traj_files  # noqa: E402
+
+TRAJ_DIR = os.path.join(BASE_DIR, "models", "trajectories")
+BASELINE_ATOL = 1e-4  # baseline ödülü ile kayıttaki ödül arasında izin verilen fark (float32 kayıt)
+TRUNCATED = len(TERMINATION_REASONS)  # yeni ayarda done olmayan episode'un sebep kodu
+REASON_NAMES = TERMINATION_REASONS + ("Truncated",)
+
+
+def list_trajectories(traj_dir, first=None, last=None):
+    """
+    traj_up{N}.traj dosyalarını update sırasıyla döner: [(update, path), ...]
+    .traj'ı olmayan update'ler için eski traj_up{N}.npz kullanılır.
+    """
+    files = dict(list_traj_files(traj_dir, first, last, ext=".npz"))
+    files.update(list_traj_files(traj_dir, first, last, ext=TRAJ_EXT))
+    return sorted(files.items())
+
+
+def load_trajectory(path):
+    """Puanlama için gereken sütunlar: (states, step_counts, episode, rewards, max_steps, reward_params)"""
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return (data["states"], data["step_counts"], data["episode"], data["rewards"],
+                    int(data["max_steps"]), json.loads(str(data["reward_params"])))
+    traj = TrajectoryFile(path)
+    return (traj["states"], traj["step_counts"], traj["episode"], traj["rewards"],
+            int(traj.meta["max_steps"]), traj.meta["reward_params"])
+
+
+class EpisodeScorer():
+    """
+    Episode bazlı birikimli skorlar. Dosyalar sırayla beslenir; dosya sınırını aşan episode bir sonraki
+    dosyada devam eder. Ödül ayarı her add_file çağrısında verilir (dosyalar farklı ayarla kaydedilmiş olabilir).
+    """
+
+    def __init__(self):
+        self.returns = []
+        self.lengths = []
+        self.reasons = []
+        self.terms = {name: [] for name in REWARD_TERMS}
+        self._open = None  # dosya sınırında yarım kalan episode: (return, len, done_seen, reason, terms)
+
+    def add_file(self, states, step_counts, starts, continues, max_steps, params):
+        """
+        states (T, 13), step_counts (T,), starts: her episode parçasının ilk satır index'i.
+        continues=True: ilk parça önceki dosyanın son episode'unun devamı.
+        params: bu dosyanın puanlanacağı ödül ayarı. Dönüş: adım başına ödüller (T,)
+        """
+        rewards, dones, reasons, terms = reward_done_batch(
+            states, step_counts, params, max_steps, scaled=True, return_terms=True)
+        n_seg = len(starts)
+        seg = np.repeat(np.arange(n_seg), np.diff(np.append(starts, len(states))))
+
+        # Episode içinde yeni ayarın ilk done'undan SONRAKİ satırlar sayılmaz
+        done_cum = np.cumsum(dones) - dones  # satırdan önceki done sayısı (dosya genelinde)
+        done_before = done_cum - done_cum[starts][seg]
+        if continues and self._open is not None and self._open[2]:
+            # Önceki dosyada zaten bitmiş episode'un devamı sayılmaz
+            done_before[seg == 0] += 1
+        valid = done_before == 0
+
+        ep_ret = np.bincount(seg, weights=rewards * valid, minlength=n_seg)
+        ep_len = np.bincount(seg, weights=valid, minlength=n_seg).astype(np.int64)
+        ep_terms = {name: np.bincount(seg, weights=terms[name] * valid, minlength=n_seg) for name in REWARD_TERMS}
+        first_done = valid & dones
+        ep_done = np.bincount(seg, weights=first_done, minlength=n_seg) > 0
+        ep_reason = np.full(n_seg, TRUNCATED, dtype=np.int64)
+        ep_reason[seg[first_done]] = reasons[first_done]
+
+        if continues and self._open is not None:
+            o_ret, o_len, o_done, o_reason, o_terms = self._open
+            ep_ret[0] += o_ret
+            ep_len[0] += o_len
+            for name in REWARD_TERMS:
+                ep_terms[name][0] += o_terms[name]
+            if o_done:
+                ep_done[0], ep_reason[0] = True, o_reason
+        elif self._open is not None:
+            self._close_open()
+
+        # Son episode parçası bir sonraki dosyada devam edebilir
+        last = n_seg - 1
+        self._open = (ep_ret[last], ep_len[last], bool(ep_done[last]), int(ep_reason[last]),
+                      {name: ep_terms[name][last] for name in REWARD_TERMS})
+        self.returns.append(ep_ret[:last])
+        self.lengths.append(ep_len[:last])
+        self.reasons.append(ep_reason[:last])
+        for name in REWARD_TERMS:
+            self.terms[name].append(ep_terms[name][:last])
+        return rewards
+
+    def _close_open(self):
+        o_ret, o_len, _, o_reason, o_terms = self._open
+        self.returns.append(np.array([o_ret]))
+        self.lengths.append(np.array([o_len]))
+        self.reasons.append(np.array([o_reason]))
+        for name in REWARD_TERMS:
+            self.terms[name].append(np.array([o_terms[name]]))
+        self._open = None
+
+    def result(self):
+        if self._open is not None:
+            self._close_open()
+        out = {
+            "returns": np.concatenate(self.returns) if self.returns else np.zeros(0),
+            "lengths": np.concatenate(self.lengths) if self.lengths else np.zeros(0, dtype=np.int64),
+            "reasons": np.concatenate(self.reasons) if self.reasons else np.zeros(0, dtype=np.int64),
+        }
+        out["terms"] = {name: np.concatenate(v) if v else np.zeros(0) for name, v in self.terms.items()}
+        return out
+
+
+def rescore(files, params):
+    """
+    Yörünge dosyalarını tek tek (stream) okuyup hem kayıttaki (baseline) hem alternatif ayarla puanlar.
+    Her dosyanın baseline'ı kendi kayıtlı ayarı, alternatifi o ayar + params değişiklikleridir.
+    Dönüş: (baseline sonucu, alternatif sonucu, adım sayısı, baseline kontrolü)
+    Baseline kontrolü: {"max_err", "bad_steps", "bad_updates"}: baseline ödüllerinin kayıttaki rewards'tan farkı;
+    "retunes": kayıtlı ödül ayarının bir önceki dosyadan farklı olduğu update'ler
+    """
+    base, alt = EpisodeScorer(), EpisodeScorer()
+    check = {"max_err": 0.0, "bad_steps": 0, "bad_updates": [], "retunes": []}
+    prev_up, prev_ep, prev_params = None, None, None
+    total_steps = 0
+    for up, path in files:
+        states, step_counts, episode, recorded_rewards, max_steps, recorded = load_trajectory(path)
+        # Baseline: bu yörünge kaydedilirken geçerli olan ayar
+        base_params = {**REWARD_PARAMS, **recorded}
+        if prev_params is not None and base_params != prev_params:
+            check["retunes"].append(up)
+        prev_params = base_params
+
+        starts = np.flatnonzero(np.r_[True, episode[1:] != episode[:-1]])
+        # Ardışık update ve aynı episode numarası -> önceki dosyadaki episode devam ediyor
+        continues = prev_up is not None and up == prev_up + 1 and episode[0] == prev_ep
+        rewards = base.add_file(states, step_counts, starts, continues, max_steps, base_params)
+        alt.add_file(states, step_counts, starts, continues, max_steps, {**base_params, **params})
+        prev_up, prev_ep = up, episode[-1]
+        total_steps += len(states)
+
+        err = np.abs(rewards - recorded_rewards)
+        bad = int(np.count_nonzero(err > BASELINE_ATOL))
+        check["max_err"] = max(check["max_err"], float(err.max(initial=0.0)))
+        if bad:
+            check["bad_steps"] += bad
+            check["bad_updates"].append(up)
+
+    if total_steps == 0:
+        return None, None, 0, check
+    return base.result(), alt.result(), total_steps, check
+
+
+def print_report(base, alt, changed):
+    n = len(base["returns"])
+    print(f"\nEpisode sayısı: {n}")
+    print(f"Değişen parametreler: {', '.join(f'{k}={v}' for k, v in changed.items()) or '(yok)'}")
+
+    print("\n=== RETURN ===")
+    delta = alt["returns"] - base["returns"]
+    print(f"  Ortalama return : {base['returns'].mean():>10.2f} -> {alt['returns'].mean():>10.2f}  (Δ {delta.mean():+.2f})")
+    print(f"  Medyan return   : {np.median(base['returns']):>10.2f} -> {np.median(alt['returns']):>10.2f}")
+    print(f"  Ortalama uzunluk: {base['lengths'].mean():>10.1f} -> {alt['lengths'].mean():>10.1f}")
+    print(f"  Return'ü değişen episode: {np.count_nonzero(np.abs(delta) > 1e-9)} / {n}")
+
+    print("\n=== BİTİŞ SEBEBİ DAĞILIMI ===")
+    b_counts = np.bincount(base["reasons"], minlength=len(REASON_NAMES))
+    a_counts = np.bincount(alt["reasons"], minlength=len(REASON_NAMES))
+    for code, name in enumerate(REASON_NAMES):
+        if b_counts[code] == 0 and a_counts[code] == 0:
+            continue
+        print(f"  {name:<12}: {100 * b_counts[code] / n:>6.2f}% -> {100 * a_counts[code] / n:>6.2f}%"
+              f"  ({int(a_counts[code]) - int(b_counts[code]):+d})")
+
+    # Sebep geçişleri (ör. Crash -> MissedZone)
+    moved = base["reasons"] != alt["reasons"]
+    if moved.any():
+        print("\n  Sebep değişimleri:")
+        pairs, counts = np.unique(np.stack([base["reasons"][moved], alt["reasons"][moved]]), axis=1, return_counts=True)
+        for (b, a), c in sorted(zip(pairs.T, counts), key=lambda x: -x[1]):
+            print(f"    {REASON_NAMES[b]:<12} -> {REASON_NAMES[a]:<12}: {c}")
+
+    print("\n=== TERİM KATKILARI (episode başına ortalama) ===")
+    for name in REWARD_TERMS:
+        b, a = base["terms"][name].mean(), alt["terms"][name].mean()
+        if b == 0.0 and a == 0.0:
+            continue
+        print(f"  {name:<20}: {b:>10.3f} -> {a:>10.3f}  (Δ {a - b:+.3f})")
+
+
+def parse_overrides(items):
+    params = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        key = key.strip()
+        if key not in REWARD_PARAMS:
+            raise SystemExit(f"Bilinmeyen ödül parametresi: {key} (bkz. env.REWARD_PARAMS)")
+        params[key] = float(value)
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kayıtlı yörüngeleri alternatif ödül ayarıyla yeniden puanla")
+    parser.add_argument("--traj-dir", default=TRAJ_DIR)
+    parser.add_argument("--config", help="Alternatif parametreler (JSON: {\"ceiling_dy\": 52.0, ...})")
+    parser.add_argument("--set", action="append", default=[], metavar="AD=DEĞER", help="Tek parametre değiştir (tekrarlanabilir)")
+    parser.add_argument("--updates", help="Update aralığı, ör. 500:800")
+    args = parser.parse_args()
+
+    params = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            params.update(parse_overrides(f"{k}={v}" for k, v in json.load(f).items()))
+    params.update(parse_overrides(args.set))
+
+    first = last = None
+    if args.updates:
+        lo, _, hi = args.updates.partition(":")
+        first = int(lo) if lo else None
+        last = int(hi) if hi else None
+
+    files = list_trajectories(args.traj_dir, first, last)
+    if not files:
+        print(f"Yörünge dosyası bulunamadı: {args.traj_dir} (train_main.py SAVE_TRAJECTORIES=True ile kaydedilir)")
+        return
+
+    print(f"{len(files)} yörünge dosyası okunuyor ({files[0][0]}..{files[-1][0]})...")
+    base, alt, steps, check = rescore(files, params)
+    print(f"{steps} adım yeniden puanlandı.")
+    if check["bad_steps"]:
+        shown = ", ".join(map(str, check["bad_updates"][:10])) + (" ..." if len(check["bad_updates"]) > 10 else "")
+        print(f"UYARI: baseline ödülleri kayıttaki rewards ile uyuşmuyor: {check['bad_steps']} adım, "
+              f"{len(check['bad_updates'])} update ({shown}), en büyük fark {check['max_err']:.3g}. "
+              f"Kayıt sonrası ödül kodu değişmiş olabilir; bu update'lerde Δ güvenilir değil.")
+    else:
+        print(f"Baseline kontrolü: kayıttaki rewards ile aynı (en büyük fark {check['max_err']:.2g})")
+    if check["retunes"]:
+        print(f"Kayıtlı ödül ayarı aralık içinde değişiyor (update {', '.join(map(str, check['retunes']))}); "
+              f"her dosya kendi ayarına göre puanlandı.")
+    print_report(base, alt, params)
+
+
+if __name__ == "__main__":
+    main()
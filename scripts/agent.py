@@ -8,6 +8,8 @@ from tensorflow.keras.optimizers import Adam  # type: ignore
 from tensorflow.keras import Model # type: ignore 
 import tensorflow as tf
 
+from numpy_policy import POLICY_BUNDLE_VERSION, save_bundle
+
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
 LOG_2PI = np.log(2.0 * np.pi).astype(np.float32)
@@ -28,9 +30,63 @@ def gaussian_entropy(log_std):
     return tf.reduce_sum(log_std + 0.5 * (LOG_2PI + 1.0), axis=-1)
 
 
+def compute_gae(rewards, dones, values, last_values, gamma, lam, truncated=None, bootstrap_values=None):
+    """
+    N paralel ortam için GAE: rewards / dones / values (T,) veya (T, N), last_values skaler veya (N,).
+    truncated (dones'un alt kümesi, ör. TimeLimit): zincir kesilir ama bootstrap_values[t]
+    (bitiş state'inin V'si) ile bootstrap yapılır; diğer done'larda bootstrap yok.
+    Dönüş: adv, ret (float64, girişle aynı şekil)
+
+    delta tek vektörize geçişte hesaplanır; adv_t = delta_t + gamma*lam*(1-done_t)*adv_{t+1}
+    zaman üzerinde geriye doğru taranır, her adımda N ortam birlikte (N,) vektör işlemiyle.
+    N=1'de aynı tarama Python float'larıyla yapılır (1800 adımda 0.24 ms; (1,) dizilerle ~2 ms).
+    """
+    r = np.asarray(rewards, dtype=np.float64)
+    squeeze = r.ndim == 1
+    T = r.shape[0]
+    r = r.reshape(T, -1)
+    N = r.shape[1]
+    d = np.asarray(dones).reshape(T, N).astype(bool)
+    v = np.asarray(values, dtype=np.float64).reshape(T, N)
+    last = np.broadcast_to(np.asarray(last_values, dtype=np.float64).reshape(-1), (N,))
+
+    v_next = np.concatenate([v[1:], last[None, :]], axis=0)
+    bootstrap = ~d
+    if truncated is not None:
+        tr = np.asarray(truncated).reshape(T, N).astype(bool) & d
+        v_next = np.where(tr, np.asarray(bootstrap_values, dtype=np.float64).reshape(T, N), v_next)
+        bootstrap = bootstrap | tr
+    delta = r + gamma * v_next * bootstrap - v
+    cont = (gamma * lam) * ~d  # bitişte zincir kesilir
+
+    adv = np.empty((T, N), dtype=np.float64)
+    if N == 1:
+        delta_l, cont_l = delta[:, 0].tolist(), cont[:, 0].tolist()
+        out = [0.0] * T
+        a = 0.0
+        for t in range(T - 1, -1, -1):
+            a = delta_l[t] + cont_l[t] * a
+            out[t] = a
+        adv[:, 0] = out
+    else:
+        a = np.zeros(N, dtype=np.float64)
+        for t in range(T - 1, -1, -1):
+            a = delta[t] + cont[t] * a
+            adv[t] = a
+
+    ret = adv + v
+    if squeeze:
+        return adv[:, 0], ret[:, 0]
+    return adv, ret
+
+
 class PPOAgent:
 
-    def __init__(self):
+    def __init__(self, compiled=True, jit_compile=False):
+        # compiled: act / _train_step tf.function (graph) olarak çalışır; False -> eager (eski davranış)
+        # jit_compile: graph fonksiyonları ayrıca XLA ile derlenir
+        self.compiled = compiled
+        self.jit_compile = jit_compile
         self.state_size = 13
         self.action_size = 4  # [pitch, yaw, thrust, roll] - 4 continuous action
         self.lr = 1e-4
@@ -41,6 +97,8 @@ class PPOAgent:
         self.ent_coef = 0.02  # Artırıldı: 0.01 → 0.02 (exploration teşvik etmek için)
         self.epochs = 4
         self.batch_size = 256
+        # None: her update'te tüm epoch'lar; değer: epoch ortalama KL'i bunu aşınca kalan epoch'lar atlanır
+        self.target_kl = None
         self.max_grad_norm = 0.5
 
         self.model = self.build_model()
@@ -54,6 +112,36 @@ class PPOAgent:
 
         tmp = self.model(tf.zeros((1,self.state_size), tf.float32))
 
+    @property
+    def model(self):
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        # Graph fonksiyonları trace anındaki modele bağlanır; model değişince (ör. checkpoint yükleme) yeniden kurulur
+        self._model = model
+        self._build_fns()
+
+    def _build_fns(self):
+        obs_spec = tf.TensorSpec((None, self.state_size), tf.float32)
+        act_spec = tf.TensorSpec((None, self.action_size), tf.float32)
+        vec_spec = tf.TensorSpec((None,), tf.float32)
+        scalar_spec = tf.TensorSpec((), tf.float32)
+        if not self.compiled:
+            self._act_fn = self._act_packed
+            self._train_step_fn = self._train_step_packed
+            self._train_epochs_fn = self._train_epochs
+            return
+        self._act_fn = tf.function(self._act_packed, input_signature=[obs_spec],
+                                   jit_compile=self.jit_compile)
+        self._train_step_fn = tf.function(self._train_step_packed,
+                                          input_signature=[obs_spec, act_spec, vec_spec, vec_spec, vec_spec],
+                                          jit_compile=self.jit_compile)
+        # Epoch döngüsü dinamik minibatch boyutları içerdiğinden XLA'sız; içindeki train step XLA olabilir
+        self._train_epochs_fn = tf.function(self._train_epochs,
+                                            input_signature=[obs_spec, act_spec, vec_spec, vec_spec, vec_spec,
+                                                             scalar_spec])
+
 
     def build_model(self):
         inp = Input(shape=(self.state_size,),dtype=tf.float32)
@@ -67,38 +155,59 @@ class PPOAgent:
         return Model(inp,[mu,v])
     
 
+    def policy_bundle(self):
+        """Dense ağırlıkları + log_std NumPy olarak (numpy_policy.NumpyPolicy ile TF'siz çalıştırılır)"""
+        dense = [layer for layer in self.model.layers if isinstance(layer, Dense)]
+        heads = {layer.name: layer for layer in dense if layer.name in ("mu", "v")}
+        trunk = [layer for layer in dense if layer.name not in heads]
+        bundle = {"format_version": np.int64(POLICY_BUNDLE_VERSION), "n_trunk": np.int64(len(trunk)),
+                  "log_std": self.log_std.numpy()}
+        for i, layer in enumerate(trunk):
+            kernel, bias = layer.get_weights()
+            bundle[f"trunk_kernel_{i}"] = kernel
+            bundle[f"trunk_bias_{i}"] = bias
+            bundle[f"trunk_act_{i}"] = np.array(layer.activation.__name__)
+        for name in ("mu", "v"):
+            bundle[f"{name}_kernel"], bundle[f"{name}_bias"] = heads[name].get_weights()
+        return bundle
+
+    def export_bundle(self, path):
+        save_bundle(path, self.policy_bundle())
+
     def act(self,state):
-        s = tf.convert_to_tensor(state[None,:], tf.float32)
+        a, logp, v = self.act_batch(np.asarray(state, dtype=np.float32)[None, :])
+        return a[0], float(logp[0]), float(v[0])
+
+    def act_batch(self, states):
+        """
+        N ortam için tek forward pass: (N, 13) -> aksiyon (N, 4), logp (N,), value (N,)
+        Gürültü ve tanh düzeltmesi satır bazında uygulanır.
+        """
+        s = np.asarray(states, dtype=np.float32)
+        # Tek host senkronizasyonu: [aksiyon (4), logp, value] tek tensörde
+        out = self._act_fn(s).numpy()
+        return out[:, :self.action_size], out[:, self.action_size], out[:, self.action_size + 1]
+
+    def _act_packed(self, s):
+        """(N, 13) -> (N, action_size + 2): [tanh aksiyon, logp, value]"""
         mu, v = self.model(s)
-        mu = tf.squeeze(mu, 0)
-        v = float(tf.squeeze(v,0).numpy())
 
         std = tf.exp(self.log_std)
-        eps = tf.random.normal((self.action_size,))
+        eps = tf.random.normal(tf.shape(mu))
         pre_tanh = mu + std * eps
         a = tf.tanh(pre_tanh)
 
-        logp_gauss = gaussian_log_prob(pre_tanh[None,:], mu[None,:], self.log_std[None, :])[0]
-        correction = tf.reduce_sum(tf.math.log(1.0 - a*a+1e-6))
-        logp = float((logp_gauss - correction).numpy())
+        logp_gauss = gaussian_log_prob(pre_tanh, mu, self.log_std[None, :])
+        correction = tf.reduce_sum(tf.math.log(1.0 - a*a+1e-6), axis=-1)
+        logp = logp_gauss - correction
 
-        return a.numpy().astype(np.float32), logp, v
+        return tf.concat([a, logp[:, None], v], axis=-1)
     
 
-    def _compute_gae(self, rewards, dones, values, last_value):
-        T = len(rewards)
-        adv = np.zeros(T, dtype=np.float32)
-        last_gae = 0.0
-
-        for t in reversed(range(T)):
-            nonterm = 1.0 - dones[t]
-            v_next = last_value if t == T - 1 else values[t + 1]
-            delta = rewards[t] + self.gamma * v_next * nonterm - values[t]
-            last_gae = delta + self.gamma * self.gae_lambda * nonterm * last_gae
-            adv[t] = last_gae
-
-        ret = adv + values
-        return adv, ret
+    def _compute_gae(self, rewards, dones, values, last_value, truncated=None, bootstrap_values=None):
+        adv, ret = compute_gae(rewards, dones, values, last_value, self.gamma, self.gae_lambda,
+                               truncated, bootstrap_values)
+        return adv.astype(np.float32), ret.astype(np.float32)
 
     def _train_step(self, obs, act_tanh, old_logp, adv, ret):
             with tf.GradientTape() as tape:
@@ -134,8 +243,62 @@ class PPOAgent:
 
             return loss, policy_loss, value_loss, ent, approx_kl, clip_frac
 
-    def train(self,states, actions, old_logps, rewards, dones, values, last_value):
-        adv, ret = self._compute_gae(rewards, dones, values, last_value)
+    def _train_step_packed(self, obs, act_tanh, old_logp, adv, ret):
+        """_train_step metrikleri tek (6,) tensörde: [loss, policy_loss, value_loss, entropy, kl, clip_frac]"""
+        return tf.stack(self._train_step(obs, act_tanh, old_logp, adv, ret))
+
+    def _train_epochs(self, obs, act, old_lp, adv, ret, target_kl):
+        """
+        Tüm epoch'lar tek graph çağrısında: karıştırma, minibatch dilimleme ve metrik toplama cihazda.
+        Bir epoch'un ortalama KL'i target_kl'i aşarsa kalan epoch'lar çalışmaz (kapalı: inf).
+        Dönüş: (7,) [minibatch ortalaması: loss, policy_loss, value_loss, entropy, kl, clip_frac; epoch sayısı]
+        """
+        n = tf.shape(obs)[0]
+        totals = tf.zeros((6,), tf.float32)
+        steps = tf.constant(0.0)
+        epochs_run = tf.constant(0.0)
+        for _ in tf.range(self.epochs):
+            perm = tf.random.shuffle(tf.range(n))
+            epoch_totals = tf.zeros((6,), tf.float32)
+            epoch_steps = tf.constant(0.0)
+            for start in tf.range(0, n, self.batch_size):
+                mb = perm[start:start + self.batch_size]
+                epoch_totals += self._train_step_fn(
+                    tf.gather(obs, mb),
+                    tf.gather(act, mb),
+                    tf.gather(old_lp, mb),
+                    tf.gather(adv, mb),
+                    tf.gather(ret, mb),
+                )
+                epoch_steps += 1.0
+            totals += epoch_totals
+            steps += epoch_steps
+            epochs_run += 1.0
+            if epoch_totals[4] / tf.maximum(epoch_steps, 1.0) > target_kl:
+                break
+        return tf.concat([totals / tf.maximum(steps, 1.0), [epochs_run]], axis=0)
+
+    def _build_optimizer(self):
+        # Adam slot değişkenleri graph döngüsünün içinde oluşturulamaz; ilk update'ten önce kurulur
+        vars_ = self.model.trainable_variables + [self.log_std]
+        if hasattr(self.opt, "build"):
+            if not (getattr(self.opt, "built", False) or getattr(self.opt, "_built", False)):
+                self.opt.build(vars_)
+        else:
+            self.opt._create_all_weights(vars_)  # OptimizerV2 (TF <= 2.10)
+
+    def train(self,states, actions, old_logps, rewards, dones, values, last_value,
+              truncated=None, bootstrap_values=None):
+        """
+        Rollout (T,) veya N ortamlı (T, N) olabilir (states (T, N, 13), last_value (N,)).
+        truncated / bootstrap_values: bkz. compute_gae (TimeLimit bitişinde bootstrap).
+        """
+        adv, ret = self._compute_gae(rewards, dones, values, last_value, truncated, bootstrap_values)
+        states = np.reshape(states, (-1, self.state_size))
+        actions = np.reshape(actions, (-1, self.action_size))
+        old_logps = np.reshape(old_logps, (-1,))
+        adv = adv.reshape(-1)
+        ret = ret.reshape(-1)
 
         # normalize adv (stabilite)
         adv = (adv - adv.mean()) / (adv.std() + 1e-8)
@@ -147,34 +310,13 @@ class PPOAgent:
         adv_t = tf.convert_to_tensor(adv, tf.float32)
         ret_t = tf.convert_to_tensor(ret, tf.float32)
 
-        n = states.shape[0]
-        idx = np.arange(n)
-
-        # epoch + minibatch
-        logs = {"loss": 0.0, "policy_loss": 0.0, "value_loss": 0.0, "entropy": 0.0, "kl": 0.0, "clip_frac": 0.0}
-        steps = 0
-
-        for _ in range(self.epochs):
-            np.random.shuffle(idx)
-            for start in range(0, n, self.batch_size):
-                mb = idx[start:start + self.batch_size]
-                loss, pl, vl, ent, kl, cf = self._train_step(
-                    tf.gather(obs, mb),
-                    tf.gather(act, mb),
-                    tf.gather(old_lp, mb),
-                    tf.gather(adv_t, mb),
-                    tf.gather(ret_t, mb),
-                )
-                logs["loss"] += float(loss.numpy())
-                logs["policy_loss"] += float(pl.numpy())
-                logs["value_loss"] += float(vl.numpy())
-                logs["entropy"] += float(ent.numpy())
-                logs["kl"] += float(kl.numpy())
-                logs["clip_frac"] += float(cf.numpy())
-                steps += 1
-
-        for k in logs:
-            logs[k] /= max(1, steps)
+        # epoch + minibatch: tek graph çağrısı, metrikler host'a update sonunda bir kez çekilir
+        self._build_optimizer()
+        target_kl = np.inf if self.target_kl is None else self.target_kl
+        totals = self._train_epochs_fn(obs, act, old_lp, adv_t, ret_t, tf.constant(target_kl, tf.float32)).numpy()
+        keys = ("loss", "policy_loss", "value_loss", "entropy", "kl", "clip_frac")
+        logs = {k: float(x) for k, x in zip(keys, totals[:6])}
+        logs["epochs"] = int(totals[6])
         return logs
 
     
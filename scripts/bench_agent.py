@@ -0,0 +1,96 @@
+"""
+Agent Benchmark'ı: PPOAgent.act gecikmesi ve update (train) süresi
+- eager (eski davranış), graph (tf.function) ve graph + XLA karşılaştırılır
+- --batch N: N ortam için N ayrı act vs tek act_batch
+- Kullanım: python scripts/bench_agent.py --acts 2000 --rollout 2048
+            python scripts/bench_agent.py --batch 16
+"""
+
+import time
+import argparse
+import numpy as np
+
+from agent import PPOAgent
+
+
+MODES = (("eager", dict(compiled=False)),
+         ("graph", dict(compiled=True)),
+         ("graph+xla", dict(compiled=True, jit_compile=True)))
+
+
+def bench_act(agent, n):
+    """Dönüş: act başına ortalama gecikme (µs)"""
+    state = np.random.default_rng(0).normal(size=13).astype(np.float32)
+    for _ in range(20):  # trace / ısınma
+        agent.act(state)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        agent.act(state)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def bench_batch(agent, n_envs, n):
+    """Dönüş: (N ayrı act, tek act_batch) - ortam-adımı başına gecikme (µs)"""
+    states = np.random.default_rng(0).normal(size=(n_envs, 13)).astype(np.float32)
+    agent.act(states[0])
+    agent.act_batch(states)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        for s in states:
+            agent.act(s)
+    single = (time.perf_counter() - t0) / (n * n_envs) * 1e6
+    t0 = time.perf_counter()
+    for _ in range(n):
+        agent.act_batch(states)
+    batched = (time.perf_counter() - t0) / (n * n_envs) * 1e6
+    return single, batched
+
+
+def make_rollout(T, seed=0):
+    rng = np.random.default_rng(seed)
+    states = rng.normal(size=(T, 13)).astype(np.float32)
+    actions = np.tanh(rng.normal(size=(T, 4))).astype(np.float32)
+    old_logps = (rng.normal(size=T) - 5.0).astype(np.float32)
+    rewards = rng.normal(size=T).astype(np.float32)
+    dones = (rng.random(T) < 0.01).astype(np.float32)
+    values = rng.normal(size=T).astype(np.float32)
+    return states, actions, old_logps, rewards, dones, values, 0.0
+
+
+def bench_train(agent, T, repeats):
+    """Dönüş: update başına ortalama süre (s); ilk (trace) update hariç"""
+    rollout = make_rollout(T)
+    agent.train(*rollout)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        agent.train(*rollout)
+    return (time.perf_counter() - t0) / repeats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PPOAgent act / update benchmark'ı")
+    parser.add_argument("--acts", type=int, default=2000, help="Ölçülen act çağrısı sayısı")
+    parser.add_argument("--rollout", type=int, default=2048, help="Update başına adım sayısı")
+    parser.add_argument("--updates", type=int, default=3, help="Ölçülen update sayısı")
+    parser.add_argument("--no-xla", action="store_true", help="XLA modunu atla")
+    parser.add_argument("--batch", type=int, default=0, help="N ortam: N ayrı act vs act_batch")
+    args = parser.parse_args()
+
+    if args.batch:
+        agent = PPOAgent()
+        single, batched = bench_batch(agent, args.batch, max(1, args.acts // args.batch))
+        print(f"N={args.batch}: {single:.1f} µs/ortam-adımı (N x act) -> {batched:.1f} µs (act_batch), x{single / batched:.1f}")
+        raise SystemExit
+
+    print(f"{'mod':<10} {'act (µs)':>10} {'update (s)':>11}")
+    base = None
+    for name, kwargs in MODES:
+        if args.no_xla and kwargs.get("jit_compile"):
+            continue
+        agent = PPOAgent(**kwargs)
+        act_us = bench_act(agent, args.acts)
+        upd_s = bench_train(agent, args.rollout, args.updates)
+        if base is None:
+            base = (act_us, upd_s)
+        print(f"{name:<10} {act_us:>10.1f} {upd_s:>11.3f}   "
+              f"(act x{base[0] / act_us:.1f}, update x{base[1] / upd_s:.1f})")
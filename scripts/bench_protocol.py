@@ -0,0 +1,242 @@
+"""
+Protokol Benchmark'ı: Unity olmadan stand-in sunucu üzerinde Env.step hızını ölçer
+- CSV (v1) ve binary (v2) protokolleri karşılaştırılır
+- --pool N: 1..N instance ile ConnectorPool/VecEnv ölçeklenmesi (ayrı process sunucular)
+- --pool N --check: VecEnv'in her env'e kendi sunucusunun cevaplarını doğru sırayla verdiğini doğrular
+- Kullanım: python scripts/bench_protocol.py --steps 5000
+            python scripts/bench_protocol.py --pool 8 --delay 0.005 --steps 400
+- --async N: N AsyncEnv'in tek event loop'ta eşzamanlı adımlanması
+- --auto-reset: episode başına round trip sayısı, ayrı reset komutu vs auto-reset (mode 2)
+- --repeat K: action repeat (mode 3) ile simüle edilen tick/s, K=1'e karşı
+"""
+
+import time
+import asyncio
+import argparse
+import numpy as np
+
+from connector import Connector
+from env import Env, VecEnv, AsyncEnv
+from standin_server import StandInServer, spawn_servers
+
+
+def bench_env_steps(binary, steps, repeat=1, delay=0.0):
+    """Dönüş: simüle edilen physics tick/s (repeat=1'de step/s)"""
+    server = StandInServer(port=0, delay=delay).start()
+    env = Env(con=Connector("127.0.0.1", server.port, binary=binary), action_repeat=repeat)
+    action = np.zeros(4, dtype=np.float32)
+
+    env.initialStart()
+    env.readStates()
+    ticks = 0
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        _, done, _ = env.step(action)
+        ticks += env.info["ticks"]
+        if done:
+            env.initialStart()
+            env.readStates()
+    elapsed = time.perf_counter() - t0
+
+    env.con.close()
+    server.stop()
+    return ticks / elapsed
+
+
+def bench_pool(n, steps, base_port, delay, binary):
+    """N instance, her biri `steps` adım -> toplam env-step/s"""
+    procs = spawn_servers(n, base_port, binary=binary, delay=delay)
+    venv = VecEnv(n, base_port=base_port, binary=binary)
+    actions = np.zeros((n, 4), dtype=np.float32)
+
+    venv.initialStart()
+    venv.readStates()
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        _, dones, _ = venv.step(actions)
+        if dones.any():
+            idx = list(np.flatnonzero(dones))
+            venv.initialStart(idx)
+            venv.readStates(idx)
+    elapsed = time.perf_counter() - t0
+
+    venv.pool.close()
+    for p in procs:
+        p.terminate()
+    return n * steps / elapsed
+
+
+def _rollout_single(port, binary, seed, actions):
+    """Tek Env ile referans yörünge: (T, 13) state, (T,) done"""
+    env = Env(con=Connector("127.0.0.1", port, binary=binary))
+    env.rng = np.random.default_rng(seed)
+    env.initialStart()
+    env.read_states_array()
+    states = np.empty((len(actions), 13), dtype=np.float32)
+    dones = np.zeros(len(actions), dtype=bool)
+    for t, a in enumerate(actions):
+        _, dones[t], _ = env.step_array(a, out=states[t])
+        if dones[t]:
+            env.initialStart()
+            env.read_states_array()
+    env.con.close()
+    return states, dones
+
+
+def check_pool(n, steps, base_port, binary):
+    """
+    N spawn_servers instance'ı üzerinde VecEnv'i farklı reset seed'i ve aksiyon dizisiyle sürer; her env'in
+    yörüngesini aynı seed/aksiyonlarla tek Env + ayrı sunucudan alınan referansla birebir karşılaştırır.
+    Cevaplar env'ler arasında karışsa veya sırası kaysa yörüngeler ayrışır. Dönüş: hatalı env index'leri
+    """
+    rng = np.random.default_rng(1234)
+    actions = rng.uniform(-1.0, 1.0, (n, steps, 4)).astype(np.float32)
+    actions[:, :, 2] = 1.0  # tam itki: episode'lar kısa (CeilingHit), per-index reset yolu da sınanır
+    seeds = [100 + i for i in range(n)]
+
+    procs = spawn_servers(n, base_port, binary=binary)
+    venv = VecEnv(n, base_port=base_port, binary=binary, auto_reset=False, action_repeat=1)
+    for e, seed in zip(venv.envs, seeds):
+        e.rng = np.random.default_rng(seed)
+    states = np.empty((steps, n, 13), dtype=np.float32)
+    venv.initialStart()
+    venv.readStates()
+    for t in range(steps):
+        states[t], dones, _ = venv.step(actions[:, t])
+        if dones.any():
+            idx = list(np.flatnonzero(dones))
+            venv.initialStart(idx)
+            venv.readStates(idx)
+    venv.pool.close()
+    for p in procs:
+        p.terminate()
+
+    server = StandInServer(port=0).start()
+    failed = []
+    for i in range(n):
+        ref, ref_dones = _rollout_single(server.port, binary, seeds[i], actions[i])
+        ok = np.array_equal(states[:, i], ref)
+        print(f"  env {i}: {'OK' if ok else 'HATA'}  ({int(ref_dones.sum())} episode, {steps} adım)")
+        if not ok:
+            failed.append(i)
+    server.stop()
+
+    # Yörüngeler birbirinden farklı olmalı, yoksa karışma fark edilmez
+    if n > 1 and any(np.array_equal(states[:, i], states[:, j]) for i in range(n) for j in range(i + 1, n)):
+        raise RuntimeError("Env yörüngeleri birbirinin aynı: kontrol anlamsız")
+    return failed
+
+
+def bench_auto_reset(auto_reset, steps, delay, binary, seed=0):
+    """
+    Dönüş: (step/s, episode başına toplam round trip, episode başına reset round trip'i)
+    İki mod aynı seed'le çalışır: reset parametreleri ve aksiyonlar aynı, episode'lar birebir aynı.
+    """
+    server = StandInServer(port=0, delay=delay).start()
+    env = Env(con=Connector("127.0.0.1", server.port, binary=binary), auto_reset=auto_reset)
+    env.rng = np.random.default_rng(seed)  # reset çekilişleri (global np.random yerine)
+    rng = np.random.default_rng(seed + 1)
+    actions = rng.uniform(-1.0, 1.0, (steps, 4)).astype(np.float32)
+    actions[:, 2] = 1.0  # tam itki: episode'lar kısa (CeilingHit), reset maliyeti görünür
+
+    env.initialStart()
+    env.read_states_array()
+    episodes = 0
+    t0 = time.perf_counter()
+    for a in actions:
+        _, done, _ = env.step_array(a)
+        if done:
+            episodes += 1
+            if not env.auto_reset:
+                env.initialStart()
+                env.read_states_array()
+    elapsed = time.perf_counter() - t0
+
+    env.con.close()
+    server.stop()
+    # İlk initialStart hariç sunucu komutları: her step bir komut, geri kalanı ayrı reset komutu
+    round_trips = server.frames - 1
+    resets = round_trips - steps
+    return steps / elapsed, round_trips / max(episodes, 1), resets / max(episodes, 1)
+
+
+async def _async_episode_loop(env, steps):
+    action = np.zeros(4, dtype=np.float32)
+    await env.initialStart()
+    await env.readStates()
+    for _ in range(steps):
+        _, done, _ = await env.step(action)
+        if done:
+            await env.initialStart()
+            await env.readStates()
+
+
+async def _bench_async(n, steps, base_port, binary):
+    envs = [await AsyncEnv.create(("127.0.0.1", base_port + i), binary=binary) for i in range(n)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_async_episode_loop(e, steps) for e in envs))
+    elapsed = time.perf_counter() - t0
+    for e in envs:
+        e.con.close()
+    return n * steps / elapsed
+
+
+def bench_async(n, steps, base_port, delay, binary):
+    """N AsyncEnv, tek thread / tek event loop -> toplam env-step/s"""
+    procs = spawn_servers(n, base_port, binary=binary, delay=delay)
+    rate = asyncio.run(_bench_async(n, steps, base_port, binary))
+    for p in procs:
+        p.terminate()
+    return rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Connector protokol benchmark'ı")
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--pool", type=int, default=0, help="1..N instance ile havuz ölçeklenmesi")
+    parser.add_argument("--async", dest="async_n", type=int, default=0, help="1..N AsyncEnv ile ölçeklenme")
+    parser.add_argument("--check", action="store_true", help="--pool ile: ölçüm yerine doğruluk kontrolü")
+    parser.add_argument("--delay", type=float, default=0.0, help="Sunucu komut başına bekleme (s)")
+    parser.add_argument("--base-port", type=int, default=5100)
+    parser.add_argument("--binary", action="store_true")
+    parser.add_argument("--auto-reset", action="store_true", help="Ayrı reset vs auto-reset karşılaştırması")
+    parser.add_argument("--seed", type=int, default=0, help="--auto-reset: reset ve aksiyon seed'i (iki mod için aynı)")
+    parser.add_argument("--repeat", type=int, default=0, help="Action repeat K ile tick/s karşılaştırması")
+    args = parser.parse_args()
+
+    if args.repeat:
+        base = bench_env_steps(args.binary, args.steps, 1, args.delay)
+        rep_rate = bench_env_steps(args.binary, args.steps // args.repeat, args.repeat, args.delay)
+        print(f"K=1 : {base:>9.0f} tick/s")
+        print(f"K={args.repeat:<2}: {rep_rate:>9.0f} tick/s  ({rep_rate / base:.2f}x)")
+        raise SystemExit
+
+    if args.auto_reset:
+        results = {}
+        for label, auto in (("Ayrı reset", False), ("Auto-reset", True)):
+            rate, per_ep, resets = bench_auto_reset(auto, args.steps, args.delay, args.binary, args.seed)
+            results[label] = per_ep
+            print(f"{label:<10}: {rate:>9.0f} step/s  {per_ep:.2f} round trip/episode  (reset: {resets:.2f})")
+        print(f"Fark: {results['Ayrı reset'] - results['Auto-reset']:.2f} round trip/episode")
+        raise SystemExit
+
+    if args.pool and args.check:
+        failed = check_pool(args.pool, args.steps, args.base_port, args.binary)
+        print(f"{args.pool} instance: " + ("tüm env'ler doğru" if not failed else f"HATALI env'ler: {failed}"))
+        raise SystemExit(1 if failed else 0)
+
+    if args.pool or args.async_n:
+        bench, limit = (bench_pool, args.pool) if args.pool else (bench_async, args.async_n)
+        base_rate = None
+        n = 1
+        while n <= limit:
+            rate = bench(n, args.steps, args.base_port + 100 * n, args.delay, args.binary)
+            base_rate = base_rate or rate
+            print(f"{n:>3} instance: {rate:>9.0f} env-step/s  ({rate / base_rate:.2f}x)")
+            n *= 2
+        raise SystemExit
+
+    csv_rate = bench_env_steps(False, args.steps)
+    bin_rate = bench_env_steps(True, args.steps)
+    print(f"CSV    (v1): {csv_rate:>9.0f} step/s")
+    print(f"Binary (v2): {bin_rate:>9.0f} step/s  ({bin_rate / csv_rate:.2f}x)")
@@ -1,32 +1,329 @@
 import socket
+import struct
+import asyncio
+import selectors
+
+# --- PROTOKOL SÜRÜMLERİ ---
+# 1: CSV satır protokolü (Unity connector.cs varsayılanı, fallback)
+# 2: Binary protokol: [uint16 eleman sayısı][N x float32] (little-endian)
+PROTO_CSV = 1
+PROTO_BINARY = 2
+
+# Handshake komutu: "9,<istenen sürüm>"
+# Unity doAction() mode 9'u tanımıyor -> 13 alanlı normal state döner -> CSV'de kalınır.
+# Binary destekleyen sunucu "9,<kabul edilen sürüm>" ile cevap verir.
+HANDSHAKE_MODE = 9
+
+# Özellik pazarlığı da aynı komutla: "9,<özellik kodu>" -> destekleyen sunucu "9,<kod>" döner
+# (sürüm kodlarıyla çakışmasın diye 16'dan başlar)
+FEATURE_AUTO_RESET = 16
+FEATURE_ACTION_REPEAT = 17
+
+# Auto-reset adımı: 2,pitch,yaw,thrust,roll,commit,x,y,z,reset_pitch,reset_yaw
+# Sunucu aksiyonu uygular, ayrıca verilen reset parametreleriyle spekülatif bir reset state'i hesaplar;
+# cevap 26 float: [adım state'i (13), reset sonrası state (13)].
+# commit=1: önceki cevaptaki spekülatif reset'e geç (aksiyon yeni episode'da uygulanır).
+# Action repeat ile birlikte: sona K eklenir (..., reset_yaw, K) -> cevap K*13 + 13 float
+AUTO_RESET_MODE = 2
+
+# Action repeat adımı: 3,pitch,yaw,thrust,roll,K
+# Sunucu aksiyonu K physics tick boyunca uygular; cevap K*13 float (her tick'in state'i, sırayla)
+ACTION_REPEAT_MODE = 3
+
+_FRAME_HEADER = struct.Struct("<H")
+
+RECV_BUFFER_SIZE = 64 * 1024
+
 
 class Connector():
-    def __init__(self, ip, port):
+    def __init__(self, ip, port, binary=False):
         self.ip = ip
         self.port = port
         print(f"Unity ({self.ip}:{self.port}) aranıyor...")
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.connect((self.ip, self.port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # küçük istek/cevap paketleri
         print("Bağlandı!")
-        self._buf = ""  # <-- EKLENDİ
+        self._rbuf = bytearray(RECV_BUFFER_SIZE)
+        self._rview = memoryview(self._rbuf)
+        self._start = self._end = self._scan = 0
+        self.proto = PROTO_CSV
+
+        if binary:
+            self.proto = self.handshake(PROTO_BINARY)
+
+    @property
+    def binary(self):
+        return self.proto == PROTO_BINARY
+
+    def handshake(self, version):
+        """
+        Bağlantı anında protokol sürümü pazarlığı (her zaman CSV üzerinden yapılır).
+        Sunucu sürümü onaylamazsa (ör. eski connector.cs) CSV'de kalınır.
+        """
+        self.sendCs((HANDSHAKE_MODE, version))
+        reply = self.readCs()
+        parts = [x.strip() for x in reply.split(",")]
+        if len(parts) == 2 and parts[0] == str(HANDSHAKE_MODE):
+            accepted = int(float(parts[1]))
+            if accepted in (PROTO_CSV, PROTO_BINARY):
+                print(f"Protokol: v{accepted} ({'binary' if accepted == PROTO_BINARY else 'csv'})")
+                return accepted
+        # Eski sunucu handshake'i normal komut gibi işledi ve state döndü -> CSV fallback
+        print("Protokol: v1 (csv, sunucu handshake desteklemiyor)")
+        return PROTO_CSV
+
+    def request_feature(self, code):
+        """
+        Opsiyonel sunucu özelliği iste (ör. FEATURE_AUTO_RESET). Onaylanırsa True.
+        Eski sunucu komutu tanımaz ve normal state döner -> False.
+        """
+        self.sendCs((HANDSHAKE_MODE, code))
+        return _is_control_reply(self.readCs(), code)
 
     def sendCs(self, data):
+        if self.binary:
+            data = tuple(data)
+            msg = _FRAME_HEADER.pack(len(data)) + struct.pack(f"<{len(data)}f", *data)
+            self.sock.sendall(msg)
+            return
         msg = ",".join(map(str, data)) + "\n"
         self.sock.sendall(msg.encode("utf-8"))
 
     def readCs(self):
-        # newline gelene kadar oku (bufferlı)
-        while "\n" not in self._buf:
-            chunk = self.sock.recv(4096)
-            if not chunk:
-                raise ConnectionError("Unity bağlantısı kapandı (recv=0).")
-            self._buf += chunk.decode("utf-8", errors="replace")
+        """
+        CSV modunda bir satır (str), binary modda bir frame'in ham float32 payload'ı (bytes) döner.
+        Env.parse_states her ikisini de kabul eder.
+        """
+        frame = self._next_frame()
+        while frame is None:
+            self._fill()
+            frame = self._next_frame()
+        return frame
+
+    def read_many(self):
+        """
+        Buffer'da hazır bekleyen TÜM tam frame'leri liste olarak döner.
+        Hiç tam frame yoksa en az bir tane gelene kadar bekler.
+        """
+        frames = [self.readCs()]
+        frame = self._next_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self._next_frame()
+        return frames
+
+    # --- Receive buffer (önceden ayrılmış bytearray + memoryview, recv_into) ---
+    # Geçerli veri: self._rbuf[self._start:self._end]
+    # self._scan: newline aramasının kaldığı yer (aynı byte'lar tekrar taranmaz)
+
+    def _fill(self):
+        if self._end == len(self._rbuf):
+            pending = self._end - self._start
+            if self._start > 0:
+                # Bekleyen (yarım) frame'i başa taşı, alanı geri kazan
+                self._rbuf[:pending] = bytes(self._rview[self._start:self._end])
+                self._scan -= self._start
+                self._start, self._end = 0, pending
+            else:
+                # Tek frame buffer'dan büyük: kapasiteyi ikiye katla
+                self._rview.release()
+                self._rbuf.extend(bytes(len(self._rbuf)))
+                self._rview = memoryview(self._rbuf)
+
+        n = self.sock.recv_into(self._rview[self._end:])
+        if n == 0:
+            raise ConnectionError("Unity bağlantısı kapandı (recv=0).")
+        self._end += n
+
+    def _next_frame(self):
+        """Buffer'daki bir sonraki tam frame'i döner, yoksa None (soket okunmaz)."""
+        if self.binary:
+            return self._next_binary_frame()
+
+        while True:
+            nl = self._rbuf.find(b"\n", self._scan, self._end)
+            if nl < 0:
+                self._scan = self._end
+                return None
+
+            # Sadece tam satır decode edilir (kopyasız memoryview üzerinden)
+            line = str(self._rview[self._start:nl], "utf-8", "replace").strip()
+            self._start = self._scan = nl + 1
+            if self._start == self._end:
+                self._start = self._end = self._scan = 0
+
+            # BOŞ SATIR GELİRSE: yut ve devam et (özyineleme yok)
+            if line:
+                return line
+
+    def _next_binary_frame(self):
+        available = self._end - self._start
+        if available < _FRAME_HEADER.size:
+            return None
+        (count,) = _FRAME_HEADER.unpack_from(self._rbuf, self._start)
+        frame_end = self._start + _FRAME_HEADER.size + 4 * count
+        if frame_end > self._end:
+            return None
+
+        payload = bytes(self._rview[self._start + _FRAME_HEADER.size:frame_end])
+        self._start = self._scan = frame_end
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0
+        return payload
+
+    def close(self):
+        try:
+            self._rview.release()
+            self.sock.close()
+        except OSError:
+            pass
+
 
-        line, self._buf = self._buf.split("\n", 1)
-        line = line.strip()
+def _is_control_reply(frame, code):
+    """Cevap "9,<code>" mu? (CSV satırı veya binary payload)"""
+    if isinstance(frame, (bytes, bytearray)):
+        values = struct.unpack(f"<{len(frame) // 4}f", frame)
+    else:
+        values = [float(x) for x in frame.split(",") if x.strip()]
+    return len(values) == 2 and int(values[0]) == HANDSHAKE_MODE and int(values[1]) == code
 
-        # BOŞ SATIR GELİRSE: yut ve tekrar oku
-        if line == "":
-            return self.readCs()
 
-        return line
+class ConnectorPool():
+    """
+    N simülatör instance'ına (ardışık portlar) bağlantı havuzu.
+    Önce tüm aksiyonlar gönderilir, sonra cevaplar selectors ile toplanır;
+    böylece N simülatör sırayla değil aynı anda adımlanır.
+    """
+
+    def __init__(self, ip, base_port, n, binary=False, ports=None):
+        # ports: ardışık olmayan portlar (ör. OS'in verdiği port=0 portları); verilirse base_port/n yok sayılır
+        self.ip = ip
+        self.ports = list(ports) if ports is not None else [base_port + i for i in range(n)]
+        self.cons = [Connector(ip, p, binary=binary) for p in self.ports]
+
+        self.sel = selectors.DefaultSelector()
+        for i, con in enumerate(self.cons):
+            self.sel.register(con.sock, selectors.EVENT_READ, i)
+
+    def __len__(self):
+        return len(self.cons)
+
+    def __getitem__(self, i):
+        return self.cons[i]
+
+    def send_all(self, datas, indices=None):
+        """datas[k] -> indices[k] numaralı connector'a (indices=None: hepsi)"""
+        if indices is None:
+            indices = range(len(self.cons))
+        for i, data in zip(indices, datas):
+            self.cons[i].sendCs(data)
+
+    def read_all(self, indices=None):
+        """
+        Verilen connector'ların her birinden bir frame okur (hangisi önce hazırsa).
+        Dönüş: indices sırasıyla frame listesi.
+        """
+        if indices is None:
+            indices = range(len(self.cons))
+        frames = {}
+        pending = set()
+        for i in indices:
+            # Buffer'da zaten tam frame varsa soketi beklemeye gerek yok
+            frame = self.cons[i]._next_frame()
+            if frame is None:
+                pending.add(i)
+            else:
+                frames[i] = frame
+
+        while pending:
+            for key, _ in self.sel.select():
+                i = key.data
+                con = self.cons[i]
+                con._fill()  # beklenmeyen connector'dan gelen veri de buffer'a alınır
+                if i not in pending:
+                    continue
+                frame = con._next_frame()
+                if frame is not None:
+                    frames[i] = frame
+                    pending.discard(i)
+
+        return [frames[i] for i in indices]
+
+    def close(self):
+        self.sel.close()
+        for con in self.cons:
+            con.close()
+
+
+class AsyncConnector():
+    """
+    Connector'ın asyncio stream tabanlı karşılığı (aynı newline/CSV ve binary protokol).
+    Kullanım: con = await AsyncConnector(ip, port).connect()
+    """
+
+    def __init__(self, ip, port, binary=False):
+        self.ip = ip
+        self.port = port
+        self.want_binary = binary
+        self.proto = PROTO_CSV
+        self.reader = None
+        self.writer = None
+
+    @property
+    def binary(self):
+        return self.proto == PROTO_BINARY
+
+    async def connect(self):
+        print(f"Unity ({self.ip}:{self.port}) aranıyor (async)...")
+        self.reader, self.writer = await asyncio.open_connection(self.ip, self.port)
+        sock = self.writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        print("Bağlandı!")
+        if self.want_binary:
+            self.proto = await self.handshake(PROTO_BINARY)
+        return self
+
+    async def handshake(self, version):
+        """Connector.handshake ile aynı: onay gelmezse CSV'de kalınır."""
+        await self.sendCs((HANDSHAKE_MODE, version))
+        reply = await self.readCs()
+        parts = [x.strip() for x in reply.split(",")]
+        if len(parts) == 2 and parts[0] == str(HANDSHAKE_MODE):
+            accepted = int(float(parts[1]))
+            if accepted in (PROTO_CSV, PROTO_BINARY):
+                return accepted
+        return PROTO_CSV
+
+    async def request_feature(self, code):
+        """Connector.request_feature ile aynı."""
+        await self.sendCs((HANDSHAKE_MODE, code))
+        return _is_control_reply(await self.readCs(), code)
+
+    async def sendCs(self, data):
+        if self.binary:
+            data = tuple(data)
+            self.writer.write(_FRAME_HEADER.pack(len(data)) + struct.pack(f"<{len(data)}f", *data))
+        else:
+            self.writer.write((",".join(map(str, data)) + "\n").encode("utf-8"))
+        await self.writer.drain()
+
+    async def readCs(self):
+        if self.binary:
+            header = await self.reader.readexactly(_FRAME_HEADER.size)
+            (count,) = _FRAME_HEADER.unpack(header)
+            return await self.reader.readexactly(4 * count)
+
+        while True:
+            raw = await self.reader.readline()
+            if not raw:
+                raise ConnectionError("Unity bağlantısı kapandı (recv=0).")
+            line = raw.decode("utf-8", errors="replace").strip()
+            # BOŞ SATIR GELİRSE: yut ve devam et
+            if line:
+                return line
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
@@ -1,7 +1,168 @@
+import math
 import connector
+import sim
 import numpy as np
 ip = "127.0.0.1"
 port = 5000
+binary_protocol = False  # True: handshake ile binary float32 protokolü dene (desteklenmezse CSV)
+auto_reset_protocol = False  # True: sunucudan auto-reset (mode 2) iste; bölüm sonunda ayrı reset round trip'i olmaz
+action_repeat_ticks = 1  # K > 1: her step aksiyonu K physics tick (K x 0.02 s) uygular, tek round trip (mode 3)
+
+REWARD_SCALE = 0.35  # Env.step'te ödüle uygulanan ölçek
+
+# compute_reward_done_batch'in döndürdüğü sebep kodları (index = kod)
+TERMINATION_REASONS = ("Running", "CeilingHit", "OutOfBounds", "Tilted", "Spin",
+                       "MissedZone", "Success", "Crash", "TimeLimit")
+REASON_CODES = {name: code for code, name in enumerate(TERMINATION_REASONS)}
+
+# --- ÖDÜL PARAMETRELERİ ---
+# compute_reward_done (skaler) ve compute_reward_done_batch aynı sözlüğü okur.
+# Ayarlamalar burada yapılır; analyses/rescore_rewards.py ile kayıtlı yörüngeler
+# üzerinde alternatif değerler eğitim açmadan denenebilir.
+REWARD_PARAMS = {
+    # Terminal: tavan
+    "ceiling_dy": 54.0, "ceiling_vy": 0.3, "ceiling_penalty": -1200.0,
+    # Terminal: yatay sınır
+    "bounds": 20.0, "out_of_bounds_penalty": -675.0,
+    # Terminal: devrilme / spin
+    "tilt_up_y": 0.35, "tilt_penalty": -500.0,
+    "spin_w": 7.3, "spin_penalty": -675.0,
+    # İniş: bölge dışı (progressive ceza)
+    "landing_dy": 1.7, "zone_radius": 15.2,
+    "missed_base": -150.0, "missed_free_dist": 8.5, "missed_per_m": -30.0, "missed_cap": -350.0,
+    # İniş: başarı / crash kriterleri
+    "land_vy": 4.5, "land_vh": 4.0, "land_up_y": 0.85, "land_w": 5.0,
+    "success_reward": 2000.0, "success_step_bonus": 0.8, "crash_penalty": -300.0,
+    # Shaping
+    "time_penalty": -0.018,
+    "up_coef": 0.38, "up_dy_scale": 32.0,
+    "height_dy": 50.0, "height_coef": -0.22,
+    "high_alt_dy": 48.0, "high_alt_coef": -0.08,
+    "center_far_dist": 15.0, "center_far_coef": -0.3, "center_near_coef": -0.1,
+    "vh_coef": -0.09,
+    "descent_coef": 0.081, "descent_alt": 15.0,
+    "stability_up_y": 0.85, "stability_coef": 0.08,
+    "spin_coef": -0.04,
+    "approach_dy": 35.0, "approach_coef": 0.2, "approach_scale": 35.0,
+    "center_bonus_coef": 0.37, "center_bonus_scale": 15.0,
+    "slow_vy": 3.5, "slow_coef": 0.068, "slow_ref": 3.6, "slow_div": 3.5,
+    "time_limit_penalty": -60.0,
+}
+
+# return_terms=True ile dönen terim katkılarının adları (shaping toplama sırasıyla)
+REWARD_TERMS = ("terminal", "time", "up_velocity", "height", "high_altitude", "center_distance",
+                "horizontal_velocity", "vertical_velocity", "stability", "spin", "approach_bonus",
+                "center_bonus", "slow_descent_bonus", "time_limit")
+
+def reward_done_batch(states, step_counts, params=REWARD_PARAMS, max_steps=1000, scaled=True, return_terms=False):
+    """
+    Env.compute_reward_done'ın vektörize hali: (N, 13) state -> tek NumPy geçişi.
+    Dönüş: rewards (N,) float64, dones (N,) bool, reasons (N,) int8 (TERMINATION_REASONS index'i)
+    scaled=True: Env.step'teki REWARD_SCALE (0.35) uygulanmış ödül.
+    return_terms=True: 4. eleman olarak {REWARD_TERMS adı: (N,) katkı} sözlüğü de döner
+    (terim toplamı yuvarlama farkı dışında ödüle eşittir; terminal satırlarda sadece "terminal" dolu).
+    Skaler versiyonla bit-bit aynı sonuç için işlem sırası birebir korunmuştur;
+    skaler fonksiyonda değişiklik yapılırsa buraya da aynen yansıtılmalı.
+    """
+    p = params
+    s = np.asarray(states, dtype=np.float64)
+    if s.ndim == 1:
+        s = s[None, :]
+    n = s.shape[0]
+    step_counts = np.broadcast_to(np.asarray(step_counts, dtype=np.int64), (n,))
+
+    dx, dy, dz = s[:, 0], s[:, 1], s[:, 2]
+    vx, vy, vz = s[:, 3], s[:, 4], s[:, 5]
+    wx, wy, wz = s[:, 6], s[:, 7], s[:, 8]
+    qx, qy, qz, qw = s[:, 9], s[:, 10], s[:, 11], s[:, 12]
+
+    # Quaternion normalize (qnorm <= 1e-6 ise bölme yok: x / 1.0 == x)
+    qnorm = np.sqrt(qx*qx + qy*qy + qz*qz + qw*qw)
+    qnorm = np.where(qnorm > 1e-6, qnorm, 1.0)
+    qx = qx / qnorm; qz = qz / qnorm
+
+    up_y = 1.0 - 2.0*(qx*qx + qz*qz)
+
+    dist_h = np.sqrt(dx*dx + dz*dz)
+    v_h    = np.sqrt(vx*vx + vz*vz)
+    w_mag  = np.sqrt(wx*wx + wy*wy + wz*wz)
+
+    rewards = np.zeros(n, dtype=np.float64)
+    reasons = np.zeros(n, dtype=np.int8)
+    open_ = np.ones(n, dtype=bool)  # henüz terminal dalına düşmemiş satırlar
+
+    def terminal(mask, value, reason):
+        m = open_ & mask
+        rewards[m] = value[m] if isinstance(value, np.ndarray) else value
+        reasons[m] = REASON_CODES[reason]
+        open_[m] = False
+
+    with np.errstate(all="ignore"):
+        # --- TERMINAL ---
+        terminal((dy >= p["ceiling_dy"]) & (vy > p["ceiling_vy"]), p["ceiling_penalty"], "CeilingHit")
+        terminal((np.abs(dx) >= p["bounds"]) | (np.abs(dz) >= p["bounds"]), p["out_of_bounds_penalty"], "OutOfBounds")
+        terminal(up_y < p["tilt_up_y"], p["tilt_penalty"], "Tilted")
+        terminal(w_mag > p["spin_w"], p["spin_penalty"], "Spin")
+
+        # --- LANDING CHECK ---
+        landing = dy <= p["landing_dy"]
+        in_zone = dist_h < p["zone_radius"]
+        distance_penalty = p["missed_per_m"] * np.maximum(0.0, dist_h - p["missed_free_dist"])
+        terminal(landing & ~in_zone, np.maximum(p["missed_cap"], p["missed_base"] + distance_penalty), "MissedZone")
+
+        ok = ((np.abs(vy) <= p["land_vy"]) & (v_h <= p["land_vh"])
+              & (up_y >= p["land_up_y"]) & (w_mag <= p["land_w"]))
+        bonus = (max_steps - step_counts).astype(np.float64) * p["success_step_bonus"]
+        terminal(landing & ok, p["success_reward"] + bonus, "Success")
+        terminal(landing, p["crash_penalty"], "Crash")
+
+        # --- SHAPING --- (skaler versiyondaki toplama sırasıyla aynı; r - x == r + (-x))
+        shaping = (
+            ("time", np.full(n, p["time_penalty"])),
+            ("up_velocity", -np.where(vy > 0.0, p["up_coef"] * vy * (dy / p["up_dy_scale"]), 0.0)),
+            ("height", np.where(dy > p["height_dy"], p["height_coef"] * (dy - p["height_dy"]), 0.0)),
+            ("high_altitude", np.where(dy > p["high_alt_dy"], p["high_alt_coef"] * (dy - p["high_alt_dy"]), 0.0)),
+            ("center_distance", np.where(dist_h > p["center_far_dist"],
+                                         p["center_far_coef"] * dist_h, p["center_near_coef"] * dist_h)),
+            ("horizontal_velocity", p["vh_coef"] * v_h),
+            ("vertical_velocity", -np.where(vy < 0.0, p["descent_coef"] * np.abs(vy)
+                                            * (1.0 + (p["descent_alt"] / (dy + 1.0))), 0.0)),
+            ("stability", np.where(up_y < p["stability_up_y"], -p["stability_coef"] * (p["stability_up_y"] - up_y),
+                                   p["stability_coef"] * (up_y - p["stability_up_y"]))),
+            ("spin", p["spin_coef"] * w_mag),
+            ("approach_bonus", np.where(dy < p["approach_dy"],
+                                        p["approach_coef"] * np.exp(-dy / p["approach_scale"]), 0.0)),
+            ("center_bonus", p["center_bonus_coef"] * np.exp(-dist_h / p["center_bonus_scale"])),
+            ("slow_descent_bonus", np.where((vy < 0.0) & (np.abs(vy) < p["slow_vy"]),
+                                            p["slow_coef"] * (p["slow_ref"] - np.abs(vy)) / p["slow_div"], 0.0)),
+        )
+        r = shaping[0][1]
+        for _, term in shaping[1:]:
+            r = r + term
+
+        timeout = open_ & (step_counts >= max_steps)
+        terminal(step_counts >= max_steps, r + p["time_limit_penalty"], "TimeLimit")
+        rewards[open_] = r[open_]
+
+    dones = reasons != REASON_CODES["Running"]
+    scale = REWARD_SCALE if scaled else 1.0
+    if scaled:
+        rewards *= REWARD_SCALE
+    if not return_terms:
+        return rewards, dones, reasons
+
+    # Terim katkıları: terminal dalına düşen satırlarda shaping yok, TimeLimit'te shaping + ceza
+    shaped = ~dones | timeout
+    terms = {"terminal": np.where(dones & ~timeout, rewards, 0.0)}
+    for name, term in shaping:
+        terms[name] = np.where(shaped, term, 0.0) * scale
+    terms["time_limit"] = np.where(timeout, p["time_limit_penalty"], 0.0) * scale
+    return rewards, dones, reasons, terms
+
+
+# normalize_state: log-compress uygulanan sütunlar (dy, vx..vz, wx..wz); dx/dz doğrusal, quaternion dokunulmaz
+_LOG_NORM_COLUMNS = np.zeros(13, dtype=bool)
+_LOG_NORM_COLUMNS[[1, 3, 4, 5, 6, 7, 8]] = True
 
 # SINIRLAR
 # dx max = 1200
@@ -14,12 +175,14 @@ port = 5000
 
 class Env():
 
-    def __init__(self):
-        self.con = connector.Connector(ip,port)
+    def __init__(self, con=None, auto_reset=None, action_repeat=None):
+        # con verilmezse Unity'e bağlanılır (stand-in sunucu / test için dışarıdan verilebilir)
+        self.con = con if con is not None else connector.Connector(ip, port, binary=binary_protocol)
         self.done = False
         self.termination_reason = "TimeLimit"
         self.max_steps = 1000
         self.step_count = 0
+        self.reward_params = dict(REWARD_PARAMS)  # deney için örnek bazında değiştirilebilir
         
         # Başlangıç değerleri - kolayca değiştirilebilir
         self.init_y_min = 44.5
@@ -32,6 +195,8 @@ class Env():
         self.init_pitch_max = 2.0
         self.init_yaw_min = -2.0
         self.init_yaw_max = 2.0
+        # Reset çekilişleri: varsayılan global np.random; örnek bazında Generator verilebilir (HeadlessEnv(seed))
+        self.rng = np.random
         
         # State normalizasyon ölçekleri (log-compress için)
         # Konuşma bazlı: state_normalization_discussion.txt
@@ -39,6 +204,31 @@ class Env():
         self.dy_scale = 50.0  # Yükseklik ölçeği
         self.v_scale = 25.0   # Doğrusal hız ölçeği (m/s)
         self.w_scale = 4.0    # Açısal hız ölçeği (rad/s)
+        self._norm_key = None  # _norm_scale önbelleği
+
+        # Auto-reset: bitiş adımının cevabı bir sonraki episode'un ilk state'ini de taşır.
+        # step bu durumda yeni başlangıç state'ini döner, bitiş state'i info["terminal_observation"]'da.
+        # info["ticks"]: son step'te uygulanan physics tick sayısı (action repeat'te erken bitişte < K)
+        self.info = {"terminal_observation": None, "ticks": 1}
+        self.auto_reset = False
+        self._commit_reset = False
+        self._next_reset = None
+        if auto_reset is None:
+            auto_reset = auto_reset_protocol
+        if auto_reset:
+            self.auto_reset = self.con.request_feature(connector.FEATURE_AUTO_RESET)
+            if not self.auto_reset:
+                print("Auto-reset: sunucu desteklemiyor, ayrı reset komutu kullanılacak")
+
+        # Action repeat: sunucu destekliyorsa K tick tek komutla, yoksa istemci tarafında K ayrı step
+        self.action_repeat = int(action_repeat if action_repeat is not None else action_repeat_ticks)
+        self.remote_repeat = False
+        if self.action_repeat > 1:
+            self.remote_repeat = self.con.request_feature(connector.FEATURE_ACTION_REPEAT)
+            if not self.remote_repeat:
+                print(f"Action repeat: sunucu desteklemiyor, her step {self.action_repeat} ayrı komut olacak")
+        self._frame_ticks = 1  # son gönderilen komutun cevabındaki tick sayısı
+        self._reply_buf = np.empty(13, dtype=np.float32)
 
     def log_norm(self, x, scale):
         """
@@ -47,54 +237,85 @@ class Env():
         """
         return np.clip(np.sign(x) * np.log1p(np.abs(x) / scale), -1.0, 1.0)
     
-    def normalize_state(self, states):
+    def _norm_scale(self):
+        """
+        Sütun başına ölçek vektörü (13,): dx/dz -> dx_scale, dy -> dy_scale, v -> v_scale,
+        w -> w_scale, quaternion -> 1.0. *_scale değişirse bir sonraki çağrıda yeniden kurulur.
+        """
+        key = (self.dx_scale, self.dy_scale, self.v_scale, self.w_scale)
+        if key != self._norm_key:
+            scale = np.ones(13, dtype=np.float32)
+            scale[[0, 2]] = self.dx_scale
+            scale[1] = self.dy_scale
+            scale[3:6] = self.v_scale
+            scale[6:9] = self.w_scale
+            self._norm_key, self._norm_scale_vec = key, scale
+        return self._norm_scale_vec
+
+    def normalize_state(self, states, out=None):
         """
         State normalizasyonu: Agent'a gönderilen state'leri normalize eder.
         State format: [dx, dy, dz, vx, vy, vz, wx, wy, wz, qx, qy, qz, qw]
-        
+        (13,) veya (N, 13) kabul eder; out verilirse sonuç oraya yazılır (float32, state ile aynı şekil,
+        state ile aynı bellek olmamalı), yoksa yeni dizi döner.
+
         Normalizasyon stratejisi:
         - dx, dz: Basit normalize (/45)
         - dy: Log-compress (scale=50)
         - vx, vy, vz: Log-compress (scale=25 m/s)
         - wx, wy, wz: Log-compress (scale=4 rad/s)
         - qx, qy, qz, qw: Zaten [-1, 1] aralığında, dokunma
+
+        Tüm sütunlar tek geçişte: sign(x) * f(|x| / scale), f = log1p (log sütunları) veya birim;
+        ilk 9 sütun [-1, 1]'e kırpılır. Ara dizi oluşturulmaz (in-place ufunc'lar).
         """
-        states_norm = states.copy().astype(np.float32)
-        
-        # Pozisyon: dx, dz -> basit normalize
-        states_norm[0] = np.clip(states[0] / self.dx_scale, -1.0, 1.0)  # dx
-        states_norm[2] = np.clip(states[2] / self.dx_scale, -1.0, 1.0)  # dz
-        
-        # Yükseklik: dy -> log-compress
-        states_norm[1] = self.log_norm(states[1], self.dy_scale)  # dy (sadece pozitif, ama sign korunur)
-        
-        # Doğrusal hız: vx, vy, vz -> log-compress
-        states_norm[3] = self.log_norm(states[3], self.v_scale)  # vx
-        states_norm[4] = self.log_norm(states[4], self.v_scale)  # vy
-        states_norm[5] = self.log_norm(states[5], self.v_scale)  # vz
-        
-        # Açısal hız: wx, wy, wz -> log-compress
-        states_norm[6] = self.log_norm(states[6], self.w_scale)  # wx
-        states_norm[7] = self.log_norm(states[7], self.w_scale)  # wy
-        states_norm[8] = self.log_norm(states[8], self.w_scale)  # wz
-        
-        # Quaternion: qx, qy, qz, qw -> zaten normalize, dokunma
-        # states_norm[9:13] = states[9:13]  # Değişiklik yok
-        
-        return states_norm
+        x = np.asarray(states, dtype=np.float32)
+        if out is None:
+            out = np.empty(x.shape, dtype=np.float32)
+
+        np.abs(x, out=out)
+        np.divide(out, self._norm_scale(), out=out)
+        np.log1p(out, out=out, where=_LOG_NORM_COLUMNS)  # where=False sütunlar olduğu gibi kalır
+        np.copysign(out, x, out=out)
+        clipped = out[..., :9]
+        np.clip(clipped, -1.0, 1.0, out=clipped)
+        return out
+
+    def parse_states(self, s, out=None, count=13):
+        """
+        Frame -> (count,) float32 (auto-reset cevabı için count=26).
+        out verilirse (ör. rollout buffer satırı) sonuç oraya yazılır.
+        """
+        if out is None:
+            out = np.empty(count, dtype=np.float32)
+
+        # Headless sim: state zaten float dizisi
+        if isinstance(s, np.ndarray):
+            if s.shape != (count,):
+                raise ValueError(f"Beklenen {count} eleman, ancak {s.shape} şekilli state alındı.")
+            out[:] = s
+            return out
+
+        # Binary protokol: ham float32 payload, metin parse yok
+        if isinstance(s, (bytes, bytearray, memoryview)):
+            states = np.frombuffer(s, dtype="<f4")
+            if states.shape[0] != count:
+                raise ValueError(f"Beklenen {count} eleman, ancak {states.shape[0]} eleman alındı (binary frame).")
+            out[:] = states
+            return out
 
-    def parse_states(self,s:str):
         s = s.strip().replace('\n', '').replace('\r', '')
         if not s:
             raise ValueError("Boş state string alındı")
         arr = s.split(",")
         arr = [x.strip() for x in arr if x.strip()]
-        if len(arr) != 13:
-            raise ValueError(f"Beklenen 13 eleman, ancak {len(arr)} eleman alındı. State: {s[:100]}")
-        states = np.array([float(x) for x in arr], dtype=np.float32)
-        return states
+        if len(arr) != count:
+            raise ValueError(f"Beklenen {count} eleman, ancak {len(arr)} eleman alındı. State: {s[:100]}")
+        out[:] = [float(x) for x in arr]
+        return out
         
     def compute_reward_done(self, states):
+        p = self.reward_params
         self.termination_reason = "Running"
         reward = 0.0
         done = False
@@ -105,130 +326,138 @@ class Env():
         qx, qy, qz, qw = map(float, states[9:13])
 
         # Quaternion normalize
-        qnorm = (qx*qx + qy*qy + qz*qz + qw*qw) ** 0.5
+        qnorm = math.sqrt(qx*qx + qy*qy + qz*qz + qw*qw)  # sqrt: batch versiyonla bit-bit aynı
         if qnorm > 1e-6:
             qx/=qnorm; qy/=qnorm; qz/=qnorm; qw/=qnorm
 
         up_y = 1.0 - 2.0*(qx*qx + qz*qz)
 
-        dist_h = (dx*dx + dz*dz) ** 0.5
-        v_h    = (vx*vx + vz*vz) ** 0.5
-        w_mag  = (wx*wx + wy*wy + wz*wz) ** 0.5
+        dist_h = math.sqrt(dx*dx + dz*dz)
+        v_h    = math.sqrt(vx*vx + vz*vz)
+        w_mag  = math.sqrt(wx*wx + wy*wy + wz*wz)
 
         # --- TERMINAL ---
         # Ceiling: Daha erken yakala ve çok sert cezalandır (yukarı kaçmayı önle)
-        if dy >= 54.0 and vy > 0.3:  # Threshold düşürüldü: 60→50 (reward hacking önleme)
+        if dy >= p["ceiling_dy"] and vy > p["ceiling_vy"]:  # Threshold düşürüldü: 60→50 (reward hacking önleme)
             self.termination_reason = "CeilingHit"
-            return -1200.0, True  # Penalty artırıldı: -1000 → -1200
+            return p["ceiling_penalty"], True  # Penalty artırıldı: -1000 → -1200
 
-        if abs(dx) >= 20.0 or abs(dz) >= 20.0:  # Sınır genişletildi: 25m → 30m
+        if abs(dx) >= p["bounds"] or abs(dz) >= p["bounds"]:  # Sınır genişletildi: 25m → 30m
             self.termination_reason = "OutOfBounds"
-            return -675.0, True  # Cezası artırıldı: -500 → -600
+            return p["out_of_bounds_penalty"], True  # Cezası artırıldı: -500 → -600
 
         # Tilt: low'da çok devrildiyse bitir
-        if up_y < 0.35:
+        if up_y < p["tilt_up_y"]:
             self.termination_reason = "Tilted"
-            return -500.0, True
+            return p["tilt_penalty"], True
 
-        if w_mag > 7.3:
+        if w_mag > p["spin_w"]:
             self.termination_reason = "Spin"
-            return -675.0, True
+            return p["spin_penalty"], True
 
         # --- LANDING CHECK ---
-        if dy <= 1.7:
+        if dy <= p["landing_dy"]:
             # zone: kare yerine daire daha stabil
-            in_zone = (dist_h < 15.2)  # daha da gevşetildi: 4.5 → 6.0 (normal inişleri başarı say)
+            in_zone = (dist_h < p["zone_radius"])  # daha da gevşetildi: 4.5 → 6.0 (normal inişleri başarı say)
 
             if not in_zone:
                 self.termination_reason = "MissedZone"
                 # PROGRESSIVE MISSEDZONE REWARD: Zone'a yakınlığa göre ceza
                 # dist_h = 6.5m → -150 (hafif), dist_h = 10m → -250 (orta), dist_h = 15m → -350 (sert)
-                base_penalty = -150.0  # Zone sınırında (6.5m)
-                distance_penalty = -30.0 * max(0.0, dist_h - 8.5)  # Her 1m uzaklık için -20
-                missed_zone_reward = max(-350.0, base_penalty + distance_penalty)  # Max -350 cap
+                base_penalty = p["missed_base"]  # Zone sınırında (6.5m)
+                distance_penalty = p["missed_per_m"] * max(0.0, dist_h - p["missed_free_dist"])  # Her 1m uzaklık için -20
+                missed_zone_reward = max(p["missed_cap"], base_penalty + distance_penalty)  # Max -350 cap
                 return missed_zone_reward, True
 
-            ok_vy   = (abs(vy) <= 4.5)   # sıkılaştırıldı: 4.5 → 2.5 (daha yumuşak iniş)
-            ok_vh   = (v_h <= 4.0)       # sıkılaştırıldı: 3.0 → 2.0 (daha kontrollü)
-            ok_tilt = (up_y >= 0.85)     # aynı
-            ok_spin = (w_mag <= 5.0)     # aynı
+            ok_vy   = (abs(vy) <= p["land_vy"])   # sıkılaştırıldı: 4.5 → 2.5 (daha yumuşak iniş)
+            ok_vh   = (v_h <= p["land_vh"])       # sıkılaştırıldı: 3.0 → 2.0 (daha kontrollü)
+            ok_tilt = (up_y >= p["land_up_y"])     # aynı
+            ok_spin = (w_mag <= p["land_w"])     # aynı
 
             if ok_vy and ok_vh and ok_tilt and ok_spin:
-                bonus = (self.max_steps - self.step_count) * 0.8
+                bonus = (self.max_steps - self.step_count) * p["success_step_bonus"]
                 self.termination_reason = "Success"
-                return 2000.0 + bonus, True  # Ödül artırıldı: 1500 → 2000
+                return p["success_reward"] + bonus, True  # Ödül artırıldı: 1500 → 2000
             else:
                 self.termination_reason = "Crash"
-                return -300.0, True
+                return p["crash_penalty"], True
 
         # --- SHAPING ---
-        reward += -0.018
+        reward += p["time_penalty"]
 
         # YUKARI GİTME CEZASI (yukarı kaçmayı önle)
         if vy > 0.0:  # Yukarı gidiyorsa
             # İrtifa arttıkça artan penalty: dy=20m → küçük, dy=40m → büyük
-            up_penalty = 0.38 * vy * (dy / 32.0)  # Artırıldı: 0.15 → 0.20 (dy=40m, vy=2 → ~0.8 ceza)
+            up_penalty = p["up_coef"] * vy * (dy / p["up_dy_scale"])  # Artırıldı: 0.15 → 0.20 (dy=40m, vy=2 → ~0.8 ceza)
             reward -= up_penalty
         
         # DİKEY UZAKLIK (YÜKSEKLİK) CEZASI (yüksekten başlamayı caydır)
         # İrtifa arttıkça artan progressive ceza
-        if dy > 50.0:  # 20m üzeri için ceza
-            height_penalty = -0.22 * (dy - 50.0)  # dy=20m → 0, dy=30m → -2.0
+        if dy > p["height_dy"]:  # 20m üzeri için ceza
+            height_penalty = p["height_coef"] * (dy - p["height_dy"])  # dy=20m → 0, dy=30m → -2.0
             reward += height_penalty
         
         # YÜKSEK İRTİFA EKSTRA CEZASI (ceiling'e yaklaşmayı caydır - reward hacking önleme)
-        if dy > 48.0:
-            high_altitude_penalty = -0.08 * (dy - 48.0)  # dy=30m → 0, dy=50m → -1.0
+        if dy > p["high_alt_dy"]:
+            high_altitude_penalty = p["high_alt_coef"] * (dy - p["high_alt_dy"])  # dy=30m → 0, dy=50m → -1.0
             reward += high_altitude_penalty
 
         # merkeze uzaklık cezası (artırıldı: drift sorununu çözmek için)
         # Progressive: mesafe arttıkça ceza artıyor
-        if dist_h > 15.0:
-            reward += -0.3 * dist_h  # 10m üzeri: daha agresif ceza (artırıldı: -0.09 → -0.12)
+        if dist_h > p["center_far_dist"]:
+            reward += p["center_far_coef"] * dist_h  # 10m üzeri: daha agresif ceza (artırıldı: -0.09 → -0.12)
         else:
-            reward += -0.1 * dist_h  # 10m altı: orta seviye ceza (artırıldı: -0.03 → -0.05)
+            reward += p["center_near_coef"] * dist_h  # 10m altı: orta seviye ceza (artırıldı: -0.03 → -0.05)
 
         # yatay hız cezası (artırıldı: drift'i azaltmak için)
-        reward += -0.09 * v_h
+        reward += p["vh_coef"] * v_h
 
         # VERTICAL VELOCITY: HER İRTİFADA AKTİF (PROGRESSIVE)
         # Yüksek irtifada küçük ceza, düşük irtifada büyük ceza
         # NOT: Strateji tartışılabilir - yüksek irtifada erken kontrol için daha büyük ceza da mantıklı olabilir
         if vy < 0.0:  # Aşağı düşüyorsa
             # İrtifa azaldıkça artan penalty: dy=30m → ~1.48x, dy=20m → ~1.71x, dy=10m → ~2.36x, dy=5m → ~3.5x, dy=1.5m → ~7.0x
-            altitude_factor = 1.0 + (15.0 / (dy + 1.0))
-            reward -= 0.081 * abs(vy) * altitude_factor
+            altitude_factor = 1.0 + (p["descent_alt"] / (dy + 1.0))
+            reward -= p["descent_coef"] * abs(vy) * altitude_factor
 
         # stabilite: penalty ve bonus dengeli
-        if up_y < 0.85:
-            reward += -0.08 * (0.85 - up_y)
+        if up_y < p["stability_up_y"]:
+            reward += -p["stability_coef"] * (p["stability_up_y"] - up_y)
         else:
-            reward += 0.08 * (up_y - 0.85)  # Bonus eşit ağırlıkta
+            reward += p["stability_coef"] * (up_y - p["stability_up_y"])  # Bonus eşit ağırlıkta
 
         # küçük spin cezası
-        reward += -0.04 * w_mag
+        reward += p["spin_coef"] * w_mag
         
         # YERE YAKLAŞMA BONUSU (agent'ı inişe teşvik et)
-        if dy < 35.0:
-            approach_bonus = 0.2 * np.exp(-dy / 35.0)  # Max ~0.05
+        if dy < p["approach_dy"]:
+            approach_bonus = p["approach_coef"] * np.exp(-dy / p["approach_scale"])  # Max ~0.05
             reward += approach_bonus
         
         # MERKEZE YAKLAŞMA BONUSU (exponential - dead code'dan alındı)
-        center_bonus = 0.37 * np.exp(-dist_h / 15.0)  # Max ~0.12, merkeze yaklaştıkça artar (artırıldı: 0.09 → 0.12)
+        center_bonus = p["center_bonus_coef"] * np.exp(-dist_h / p["center_bonus_scale"])  # Max ~0.12, merkeze yaklaştıkça artar (artırıldı: 0.09 → 0.12)
         reward += center_bonus
         
         # YAVAŞ İNİŞ BONUSU (vy > -2 m/s iken)
-        if vy < 0.0 and abs(vy) < 3.5:
-            slow_descent_bonus = 0.068 * (3.6 - abs(vy)) / 3.5  # Max ~0.03
+        if vy < 0.0 and abs(vy) < p["slow_vy"]:
+            slow_descent_bonus = p["slow_coef"] * (p["slow_ref"] - abs(vy)) / p["slow_div"]  # Max ~0.03
             reward += slow_descent_bonus
 
         if self.step_count >= self.max_steps:
             self.termination_reason = "TimeLimit"
-            return reward - 60.0, True
+            return reward + p["time_limit_penalty"], True
 
         return reward, False
+
+    def compute_reward_done_batch(self, states, step_counts, scaled=True, return_terms=False):
+        """
+        compute_reward_done'ın vektörize hali (bkz. reward_done_batch).
+        self.reward_params ve self.max_steps kullanılır; termination_reason yan etkisi yoktur.
+        """
+        return reward_done_batch(states, step_counts, self.reward_params, self.max_steps,
+                                 scaled=scaled, return_terms=return_terms)
     
-    
+
     def step(self, action):
         """
         Action format: [pitch, yaw, thrust_raw, roll]
@@ -236,7 +465,58 @@ class Env():
         - yaw: [-1, 1] -> RCS yaw control  
         - thrust_raw: [-1, 1] -> normalized to [0, 1] for main engine
         - roll: [-1, 1] -> RCS roll control
+        Dönüş: (state listesi, done, reward). Dizi döndüren hali: step_array
+        """
+        states, done, reward = self.step_array(action)
+        return states.tolist(), done, reward
+
+    def step_array(self, action, out=None):
+        """
+        step'in NumPy hali: (13,) float32 state, done, reward.
+        out verilirse (ör. önceden ayrılmış buffer satırı) state oraya yazılır, liste oluşturulmaz.
+        action_repeat > 1 ise ödül K tick boyunca toplanır, bitişte erken durulur.
+        """
+        if self.action_repeat > 1 and not self.remote_repeat:
+            return self._repeat_locally(action, out)
+
+        # Unity'e gönder
+        self.con.sendCs(self.step_msg(action))
+
+        # Unity'den gelen yeni durumu oku
+        return self.finish_step_array(self.con.readCs(), out)
+
+    def _repeat_locally(self, action, out):
+        """Sunucu action repeat desteklemiyorsa: aynı aksiyonla K ayrı step (aynı semantik, round trip tasarrufu yok)."""
+        reward = 0.0
+        for k in range(self.action_repeat):
+            self.con.sendCs(self.step_msg(action))
+            states, done, r = self.finish_step_array(self.con.readCs(), out)
+            reward += r
+            if done:
+                break
+        self.info["ticks"] = k + 1
+        return states, done, reward
+
+    def step_msg(self, action):
         """
+        Adım komutu: normalde mode 0, auto-reset açıksa mode 2 (bekleyen reset parametreleriyle),
+        sunucu tarafı action repeat'te mode 3 (veya sonuna K eklenmiş mode 2).
+        """
+        if self._commit_reset:
+            self.step_count = 0  # bekleyen reset bu komutla onaylanıyor -> yeni episode'un ilk adımı
+        msg = self.action_msg(action)
+        ticks = self.action_repeat if self.remote_repeat else 1
+        self._frame_ticks = ticks
+        if self.auto_reset:
+            commit, self._commit_reset = self._commit_reset, False
+            msg = (connector.AUTO_RESET_MODE,) + msg[1:5] + (1 if commit else 0,) + self._next_reset
+            return msg + (ticks,) if ticks > 1 else msg
+        if ticks > 1:
+            return (connector.ACTION_REPEAT_MODE,) + msg[1:5] + (ticks,)
+        return msg
+
+    def action_msg(self, action):
+        """Aksiyonu Unity komutuna çevirir (mode 0). step_count burada artar."""
         self.step_count += 1
         pitch = float(action[0])
         yaw = float(action[1])
@@ -247,45 +527,224 @@ class Env():
         
         roll = float(action[3])  # Roll kontrolü
 
-        # Unity'e gönder
-        self.con.sendCs((0, pitch, yaw, thrust, roll, 0, 0, 0, 0, 0, 0, 0, 0))  
-        
-        # Unity'den gelen yeni durumu oku
-        states = self.parse_states(self.con.readCs())
-        
-        # Ödülü hesapla
-        reward_step, done = self.compute_reward_done(states)
-        
-        # --- KRİTİK EKLEME: REWARD SCALING ---
-        # Ödülü 2'ye bölüyoruz (0.1 → 0.5). (+500 -> +250, -500 -> -250)
-        # Shaping signal'ların görünür olması için scaling artırıldı.
-        # Value Loss patlaması riski düşük (0.5x güvenli aralıkta).
-        reward_step *= 0.35 
-        # -------------------------------------
+        return (0, pitch, yaw, thrust, roll, 0, 0, 0, 0, 0, 0, 0, 0)
+
+    def finish_step(self, frame):
+        """finish_step_array'in liste döndüren hali."""
+        states, done, reward = self.finish_step_array(frame)
+        return states.tolist(), done, reward
+
+    def finish_step_array(self, frame, out=None):
+        """
+        Unity cevabını (state) parse eder, ödül/done hesaplar.
+        Cevap düzeni: [tick state'leri (K x 13)][auto-reset'te reset sonrası state (13)]
+        """
+        ticks = self._frame_ticks
+        count = 13 * ticks + (13 if self.auto_reset else 0)
+        if count == 13:
+            values = self.parse_states(frame, out)
+        else:
+            if self._reply_buf.shape[0] != count:
+                self._reply_buf = np.empty(count, dtype=np.float32)
+            values = self.parse_states(frame, self._reply_buf, count=count)
+
+        reward_step = 0.0
+        for k in range(ticks):
+            if k > 0:
+                self.step_count += 1  # action_msg ilk tick'i saydı
+            states = values[13 * k:13 * (k + 1)]
+
+            # Ödülü hesapla
+            reward_tick, done = self.compute_reward_done(states)
+
+            # --- KRİTİK EKLEME: REWARD SCALING ---
+            # Ödülü 2'ye bölüyoruz (0.1 → 0.5). (+500 -> +250, -500 -> -250)
+            # Shaping signal'ların görünür olması için scaling artırıldı.
+            # Value Loss patlaması riski düşük (0.5x güvenli aralıkta).
+            reward_step += reward_tick * REWARD_SCALE
+            # -------------------------------------
+            if done:
+                break  # sunucu kalan tick'leri de simüle etti ama episode burada bitti
+        self.info["ticks"] = k + 1
 
         self.done = bool(done)
+        if self.auto_reset:
+            states = self._apply_auto_reset(states, values[-13:], out)
+        elif count != 13:
+            if out is None:
+                out = np.empty(13, dtype=np.float32)
+            out[:] = states
+            states = out
         
         # Raw state döndür (loglar için). Normalize işlemi train_main.py'de yapılacak
-        return states.tolist(), self.done, float(reward_step)
+        return states, self.done, float(reward_step)
+
+    def _apply_auto_reset(self, last, reset, out):
+        """
+        Bitişte: yeni episode'un ilk state'i (reset) döner, bitiş state'i (last) info'ya yazılır
+        ve bir sonraki adım komutu reset'i onaylar (commit). Bitmediyse son tick state'i döner.
+        """
+        if out is None:
+            out = np.empty(13, dtype=np.float32)
+        if self.done:
+            self.info["terminal_observation"] = last.copy()
+            out[:] = reset
+            self._commit_reset = True
+            self._next_reset = self.draw_reset()
+        else:
+            self.info["terminal_observation"] = None
+            out[:] = last
+        return out
     
 
     def initialStart(self):
+        self.con.sendCs(self.reset_msg())
+
+    def reset_msg(self):
+        """Yeni episode için rastgele başlangıç komutu (mode 1)."""
         self.done = False
         self.step_count = 0
-        # Başlangıç değerleri sınıf parametrelerinden alınıyor
-        y = np.random.uniform(self.init_y_min, self.init_y_max)
-        z = np.random.uniform(self.init_z_min, self.init_z_max)
-        x = np.random.uniform(self.init_x_min, self.init_x_max)
-        pitch = np.random.uniform(self.init_pitch_min, self.init_pitch_max)
-        yaw = np.random.uniform(self.init_yaw_min, self.init_yaw_max)
+        self.info["terminal_observation"] = None
+        x, y, z, pitch, yaw = self.draw_reset()
+        if self.auto_reset:
+            # Bu episode bittiğinde geçilecek reset (mode 2 komutlarıyla sunucuya gider)
+            self._commit_reset = False
+            self._next_reset = self.draw_reset()
+
+        return (1,x,y,z,pitch,yaw,0,0,0,0,0,0,0,0)
 
-        self.con.sendCs((1,x,y,z,pitch,yaw,0,0,0,0,0,0,0,0))
+    def draw_reset(self):
+        """Rastgele başlangıç koşulu: (x, y, z, pitch, yaw)"""
+        # Başlangıç değerleri sınıf parametrelerinden alınıyor
+        y = self.rng.uniform(self.init_y_min, self.init_y_max)
+        z = self.rng.uniform(self.init_z_min, self.init_z_max)
+        x = self.rng.uniform(self.init_x_min, self.init_x_max)
+        pitch = self.rng.uniform(self.init_pitch_min, self.init_pitch_max)
+        yaw = self.rng.uniform(self.init_yaw_min, self.init_yaw_max)
+        return (x, y, z, pitch, yaw)
 
     def readStates(self):
-        states = self.parse_states(self.con.readCs())
-        return states.tolist()
+        return self.read_states_array().tolist()
+
+    def read_states_array(self, out=None):
+        """readStates'in NumPy hali: (13,) float32 (out verilirse oraya yazılır)."""
+        return self.parse_states(self.con.readCs(), out)
 
     
 
 
 
+
+
+class HeadlessEnv(Env):
+    """
+    Unity yerine sim.RocketSim (saf NumPy, env.cs ApplyPhysics taklidi) kullanan Env.
+    initialStart / readStates / step ve ödül mantığı Env ile birebir aynı.
+    seed: bu env'in reset çekilişleri için ayrı Generator (global np.random'a dokunulmaz).
+    """
+
+    def __init__(self, seed=None, auto_reset=None, action_repeat=None):
+        super().__init__(con=sim.RocketSim(), auto_reset=auto_reset, action_repeat=action_repeat)
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+
+
+class VecEnv():
+    """
+    N simülatör instance'ı üzerinde N Env (ConnectorPool ile).
+    Tüm aksiyonlar önce gönderilir, cevaplar birlikte toplanır -> N instance aynı anda adımlanır.
+    auto_reset=True: biten env step içinde yeni episode'a geçer (bitiş state'i envs[i].info'da),
+    initialStart/readStates sadece ilk başta gerekir. action_repeat=K: her step K physics tick.
+    """
+
+    def __init__(self, n, base_port=port, binary=None, pool=None, auto_reset=None, action_repeat=None):
+        if binary is None:
+            binary = binary_protocol
+        self.pool = pool if pool is not None else connector.ConnectorPool(ip, base_port, n, binary=binary)
+        self.envs = [Env(con=c, auto_reset=auto_reset, action_repeat=action_repeat) for c in self.pool.cons]
+        if any(e.action_repeat > 1 and not e.remote_repeat for e in self.envs):
+            raise ValueError("VecEnv action repeat için sunucu desteği (FEATURE_ACTION_REPEAT) gerekli.")
+        self.n = len(self.envs)
+
+    @property
+    def termination_reasons(self):
+        return [e.termination_reason for e in self.envs]
+
+    def initialStart(self, indices=None):
+        if indices is None:
+            indices = range(self.n)
+        self.pool.send_all([self.envs[i].reset_msg() for i in indices], indices)
+
+    def readStates(self, indices=None):
+        if indices is None:
+            indices = range(self.n)
+        frames = self.pool.read_all(indices)
+        states = np.empty((len(frames), 13), dtype=np.float32)
+        for k, (i, f) in enumerate(zip(indices, frames)):
+            self.envs[i].parse_states(f, out=states[k])
+        return states
+
+    def step(self, actions):
+        """actions: (N, 4) -> states (N, 13), dones (N,), rewards (N,)"""
+        self.pool.send_all([e.step_msg(a) for e, a in zip(self.envs, actions)])
+        frames = self.pool.read_all()
+
+        states = np.empty((self.n, 13), dtype=np.float32)
+        dones = np.zeros(self.n, dtype=bool)
+        rewards = np.zeros(self.n, dtype=np.float32)
+        for i, (e, f) in enumerate(zip(self.envs, frames)):
+            _, dones[i], rewards[i] = e.finish_step_array(f, out=states[i])
+        return states, dones, rewards
+
+
+class AsyncEnv(Env):
+    """
+    Env'in asyncio karşılığı: initialStart, readStates ve step coroutine.
+    Simülatör cevabı beklenirken log yazımı / policy inference aynı event loop'ta ilerleyebilir.
+    Kullanım: env = await AsyncEnv.create()
+    """
+
+    @classmethod
+    async def create(cls, address=(ip, port), binary=None, auto_reset=None, action_repeat=None):
+        if binary is None:
+            binary = binary_protocol
+        if auto_reset is None:
+            auto_reset = auto_reset_protocol
+        con = await connector.AsyncConnector(*address, binary=binary).connect()
+        env = cls(con=con, auto_reset=False, action_repeat=1)  # özellik pazarlığı async yapılmalı
+        if auto_reset:
+            env.auto_reset = await con.request_feature(connector.FEATURE_AUTO_RESET)
+        env.action_repeat = int(action_repeat if action_repeat is not None else action_repeat_ticks)
+        if env.action_repeat > 1:
+            env.remote_repeat = await con.request_feature(connector.FEATURE_ACTION_REPEAT)
+        return env
+
+    async def step(self, action):
+        states, done, reward = await self.step_array(action)
+        return states.tolist(), done, reward
+
+    async def step_array(self, action, out=None):
+        if self.action_repeat > 1 and not self.remote_repeat:
+            return await self._repeat_locally(action, out)
+        await self.con.sendCs(self.step_msg(action))
+        return self.finish_step_array(await self.con.readCs(), out)
+
+    async def _repeat_locally(self, action, out):
+        reward = 0.0
+        for k in range(self.action_repeat):
+            await self.con.sendCs(self.step_msg(action))
+            states, done, r = self.finish_step_array(await self.con.readCs(), out)
+            reward += r
+            if done:
+                break
+        self.info["ticks"] = k + 1
+        return states, done, reward
+
+    async def initialStart(self):
+        await self.con.sendCs(self.reset_msg())
+
+    async def readStates(self):
+        return (await self.read_states_array()).tolist()
+
+    async def read_states_array(self, out=None):
+        return self.parse_states(await self.con.readCs(), out)
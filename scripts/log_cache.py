@@ -0,0 +1,207 @@
+"""
+Log Önbelleği: analiz scriptleri için artımlı (incremental) CSV log cache'i
+- Eğitim logları sadece sona eklenir: daha önce parse edilmiş satırlar sütun bazlı part dosyalarında
+  saklanır, yanında kaynağın bayt watermark'ı tutulur
+  - pyarrow varsa feather, yoksa numpy .npz (sütun başına bir dizi, pickle yok)
+- Sonraki çalıştırmada sadece watermark'tan sonraki kuyruk parse edilir ve kendi part dosyasına yazılır
+  (önceki part'lar yeniden yazılmaz); part sayısı MAX_PARTS'ı geçince tek part'ta birleştirilir
+- Kaynak kısaldıysa, başlığı/şeması değiştiyse ya da watermark öncesi baytlar tutmuyorsa
+  (dosya yeniden yazılmış) cache baştan kurulur
+- Yazımı süren son satır ('\\n' ile bitmemiş) bir sonraki çalıştırmaya kalır
+- Kullanım:
+    df = load_log_cached("models/detailed_log.csv")   # load_log ile aynı DataFrame
+"""
+
+import io
+import os
+import re
+import glob
+import json
+import numpy as np
+import pandas as pd
+
+from log_schema import LOG_SCHEMAS, read_schema, schema_dtypes
+
+try:
+    import pyarrow  # noqa: F401  (feather için)
+    CACHE_FORMAT = "feather"
+except ImportError:
+    CACHE_FORMAT = "npz"
+
+CACHE_DIR_NAME = ".log_cache"
+MAX_PARTS = 32  # bu kadar part birikince tek part'ta birleştirilir
+_FINGERPRINT = 64  # watermark öncesi kontrol edilen bayt sayısı
+
+
+def _cache_paths(path, cache_dir):
+    """(cache dizini, part dosyalarının ortak öneki, meta dosyası)"""
+    cache_dir = cache_dir or os.path.join(os.path.dirname(path) or ".", CACHE_DIR_NAME)
+    base = os.path.join(cache_dir, os.path.basename(path))
+    return cache_dir, base, base + ".cache.json"
+
+
+def _read_rows(f, start, end, columns, dtypes):
+    """[start, end) bayt aralığındaki tam satırları şemaya göre parse eder"""
+    f.seek(start)
+    raw = f.read(end - start)
+    if not raw.strip():
+        return pd.DataFrame({col: pd.Series(dtype=dtypes[col] if dtypes else "object") for col in columns})
+    return pd.read_csv(io.BytesIO(raw), header=None, names=columns, dtype=dtypes, engine="c")
+
+
+def _last_newline(f, size):
+    """Dosyadaki son '\\n'den sonraki offset (tam satırların sonu)"""
+    pos = size
+    while pos > 0:
+        step = min(1 << 16, pos)
+        f.seek(pos - step)
+        block = f.read(step)
+        i = block.rfind(b"\n")
+        if i >= 0:
+            return pos - step + i + 1
+        pos -= step
+    return 0
+
+
+def _fingerprint(f, lo, hi):
+    f.seek(lo)
+    return f.read(hi - lo).hex()
+
+
+def _write_part(df, path):
+    """
+    DataFrame'i tek part dosyasına yazar (atomik). npz: sayısal sütunlar c<i>; metin sütunları sözlük kodlu,
+    k<i> kodlar (boş -1) + s<i> farklı değerler (Reason gibi az çeşitli sütunlarda küçük ve hızlı okunur)
+    """
+    tmp = path + ".tmp"
+    if CACHE_FORMAT == "feather":
+        df.reset_index(drop=True).to_feather(tmp)
+    else:
+        arrays = {}
+        for i, col in enumerate(df.columns):
+            values = df[col]
+            if values.dtype.kind in "biuf":
+                arrays[f"c{i}"] = values.to_numpy()
+            else:
+                codes, uniques = pd.factorize(values)
+                arrays[f"k{i}"] = codes.astype(np.int32)
+                arrays[f"s{i}"] = np.asarray(uniques, dtype=str)
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def _read_part(path, columns):
+    if CACHE_FORMAT == "feather":
+        return pd.read_feather(path)
+    data = {}
+    with np.load(path, allow_pickle=False) as arrays:
+        for i, col in enumerate(columns):
+            if f"c{i}" in arrays:
+                data[col] = arrays[f"c{i}"]
+            else:
+                # Kod -1 (boş) son elemana, NaN'a düşer
+                uniques = np.append(arrays[f"s{i}"].astype(object), np.nan)
+                data[col] = pd.Series(uniques[arrays[f"k{i}"]], dtype="str")
+    return pd.DataFrame(data, columns=columns)
+
+
+def _write_meta(meta, meta_path):
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def _next_part_name(base):
+    """Diskteki part'lardan büyük yeni bir ad: mevcut bir part'ın üzerine asla yazılmaz"""
+    taken = [int(m.group(1)) for p in glob.glob(glob.escape(base) + ".part*")
+             if (m := re.search(r"\.part(\d+)\.", os.path.basename(p)))]
+    return f"{os.path.basename(base)}.part{max(taken, default=-1) + 1:04d}.{CACHE_FORMAT}"
+
+
+def _remove_parts(base, keep=()):
+    """base'e ait part dosyalarını (keep hariç) siler"""
+    for old in glob.glob(glob.escape(base) + ".part*"):
+        if os.path.basename(old) not in keep:
+            os.remove(old)
+    # Tek dosyalık eski cache (.pkl / .feather) artık kullanılmıyor
+    for old in (base + ".pkl", base + ".feather"):
+        if os.path.exists(old):
+            os.remove(old)
+
+
+def load_log_cached(path, name=None, cache_dir=None, verbose=False):
+    """
+    log_schema.load_log'un cache'li karşılığı: sadece son çalıştırmadan beri eklenen satırlar parse edilir.
+    cache_dir: varsayılan <log dizini>/.log_cache
+    """
+    cache_dir, base, meta_path = _cache_paths(path, cache_dir)
+
+    with open(path, "rb") as f:
+        log_name, version, columns, _ = read_schema(f, name)
+        data_start = f.tell()
+        f.seek(0)
+        header = f.read(data_start).hex()
+        size = os.fstat(f.fileno()).st_size
+        watermark = _last_newline(f, size)
+        dtypes = schema_dtypes(log_name, version) if log_name in LOG_SCHEMAS else None
+
+        meta = None
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path, "r", encoding="utf-8") as mf:
+                    meta = json.load(mf)
+            except ValueError:
+                meta = None
+        # Cache geçerli mi: aynı format/başlık, part'lar yerinde, kaynak kısalmamış, watermark öncesi baytlar aynı
+        if meta is not None:
+            old = meta.get("watermark", -1)
+            valid = (meta.get("format") == CACHE_FORMAT and meta.get("header") == header
+                     and all(os.path.exists(os.path.join(cache_dir, p)) for p in meta.get("parts", [None]))
+                     and meta.get("columns") == columns and old <= watermark
+                     and _fingerprint(f, max(data_start, old - _FINGERPRINT), old) == meta.get("fingerprint"))
+            if not valid:
+                meta = None
+
+        if meta is None:
+            df = _read_rows(f, data_start, watermark, columns, dtypes)
+            parsed = watermark - data_start
+            parts, new = [], df
+        else:
+            parts = meta["parts"]
+            frames = [_read_part(os.path.join(cache_dir, p), columns) for p in parts]
+            parsed = watermark - meta["watermark"]
+            new = _read_rows(f, meta["watermark"], watermark, columns, dtypes) if parsed > 0 else None
+            if new is not None and len(new):
+                frames.append(new)
+            df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+        if meta is None or parsed > 0:
+            os.makedirs(cache_dir, exist_ok=True)
+            if len(parts) >= MAX_PARTS:
+                # Birleştirme: tüm satırlar tek part'a
+                parts, new = [], df
+            if not parts or len(new):
+                name = _next_part_name(base)
+                _write_part(new, os.path.join(cache_dir, name))
+                parts = parts + [name]
+            _write_meta({
+                "source": os.path.abspath(path),
+                "format": CACHE_FORMAT,
+                "header": header,
+                "columns": columns,
+                "schema": [log_name, version],
+                "watermark": watermark,
+                "fingerprint": _fingerprint(f, max(data_start, watermark - _FINGERPRINT), watermark),
+                "rows": len(df),
+                "parts": parts,
+            }, meta_path)
+            # Meta'da olmayan part'lar (eski kurulum, birleştirilenler, yarım kalan yazımlar) silinir
+            _remove_parts(base, keep=parts)
+
+    if verbose:
+        mode = "baştan" if meta is None else "artımlı"
+        print(f"   [cache] {os.path.basename(path)}: {mode}, {parsed / 1e6:.2f} MB parse edildi, {len(df)} satır")
+    df.attrs["schema"] = (log_name, version)
+    return df
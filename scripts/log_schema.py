@@ -0,0 +1,182 @@
+"""
+Log Şemaları: CSV loglarının sürümlü başlıkları ve ortak tek geçişli okuyucu
+- Her log dosyası "#schema=<ad>/v<N>" satırıyla başlar, ardından sütun başlığı gelir
+- LOG_SCHEMAS: (ad, sürüm) -> sütunlar ve dtype'lar; en büyük sürüm train_main'in yazdığı
+- load_log(path): şemaya göre dtype'lı, pandas C engine ile tek geçişte okur (.traj için memmap)
+- Sürüm satırı olmayan eski loglar başlıktan tanınır; başlık ile satır genişliği uyuşmazsa
+  (ör. 7 sütunlu başlık + 8 değerli satırlar) aynı şemanın satır genişliğine uyan sürümü seçilir
+- Kullanım:
+    df = load_log("models/detailed_log.csv")
+    ensure_log_header("models/update_logs.csv", "update", defaults={"Epochs": 4, "PolicyLag": 0})
+"""
+
+import os
+
+SCHEMA_PREFIX = "#schema="
+
+LOG_SCHEMAS = {
+    "episode": {
+        1: (("Episode", "int64"), ("Return", "float64"), ("EpisodeLen", "int64"), ("Update", "int64")),
+    },
+    "update": {
+        1: (("Update", "int64"), ("Loss", "float64"), ("PolicyLoss", "float64"), ("ValueLoss", "float64"),
+            ("Entropy", "float64"), ("KL", "float64"), ("ClipFrac", "float64")),
+        2: (("Update", "int64"), ("Loss", "float64"), ("PolicyLoss", "float64"), ("ValueLoss", "float64"),
+            ("Entropy", "float64"), ("KL", "float64"), ("ClipFrac", "float64"), ("Epochs", "int64")),
+        3: (("Update", "int64"), ("Loss", "float64"), ("PolicyLoss", "float64"), ("ValueLoss", "float64"),
+            ("Entropy", "float64"), ("KL", "float64"), ("ClipFrac", "float64"), ("Epochs", "int64"),
+            ("PolicyLag", "int64")),
+    },
+    "detailed": {
+        1: (("Episode", "int64"), ("Update", "int64"), ("Return", "float64"), ("Length", "int64"),
+            ("Reason", "str"), ("StartAlt", "float64")),
+        2: (("Episode", "int64"), ("Update", "int64"), ("Return", "float64"), ("Reason", "str"),
+            ("StartAlt", "float64"), ("StartDist", "float64"), ("Difficulty", "float64")),
+        3: (("Episode", "int64"), ("Update", "int64"), ("Return", "float64"), ("Reason", "str"),
+            ("StartAlt", "float64"), ("StartDist", "float64"), ("final_dist", "float64"), ("final_vel", "float64")),
+    },
+    "state": {
+        1: (("Update", "int64"), ("Episode", "int64"), ("Step", "int64"), ("dy", "float64"), ("dx", "float64"),
+            ("vy", "float64"), ("thrust", "float64"), ("pitch", "float64"), ("reward", "float64")),
+    },
+    "episode_index": {
+        1: (("Update", "int64"), ("Episode", "int64"), ("File", "str"), ("Offset", "int64"), ("Length", "int64")),
+    },
+}
+
+
+def current_version(name):
+    return max(LOG_SCHEMAS[name])
+
+
+def schema_columns(name, version=None):
+    return [col for col, _ in LOG_SCHEMAS[name][version or current_version(name)]]
+
+
+def schema_dtypes(name, version=None):
+    return dict(LOG_SCHEMAS[name][version or current_version(name)])
+
+
+def header_text(name, version=None):
+    """Dosya başı: sürüm satırı + sütun başlığı ('\\n' ile biter)"""
+    version = version or current_version(name)
+    return f"{SCHEMA_PREFIX}{name}/v{version}\n" + ",".join(schema_columns(name, version)) + "\n"
+
+
+def read_schema(f, name=None):
+    """
+    Açık dosyanın (metin veya binary) başından şemayı okur; dosya ilk veri satırında kalır.
+    Dönüş: (ad, sürüm, sütunlar, sürüm satırı var mı). Tanınmayan başlıkta ad/sürüm None.
+    """
+    def readline():
+        line = f.readline()
+        return line.decode("utf-8") if isinstance(line, bytes) else line
+
+    first = readline().rstrip("\r\n")
+    if first.startswith(SCHEMA_PREFIX):
+        log_name, _, version = first[len(SCHEMA_PREFIX):].partition("/v")
+        version = int(version)
+        columns = readline().rstrip("\r\n").split(",")
+        if log_name in LOG_SCHEMAS and version in LOG_SCHEMAS[log_name]:
+            if columns != schema_columns(log_name, version):
+                raise ValueError(f"{log_name}/v{version} başlığı şemayla uyuşmuyor: {columns}")
+        return log_name, version, columns, True
+
+    # Eski log (sürüm satırı yok): başlığı bilinen sürümlerle eşleştir
+    columns = first.split(",")
+    names = [name] if name else list(LOG_SCHEMAS)
+    for log_name in names:
+        for version in sorted(LOG_SCHEMAS[log_name]):
+            if columns == schema_columns(log_name, version):
+                # Başlık yanlış yazılmış olabilir: satır genişliğine uyan sürüm geçerli
+                pos = f.tell()
+                row = readline().rstrip("\r\n")
+                f.seek(pos)
+                width = len(row.split(",")) if row else len(columns)
+                if width != len(columns):
+                    for other in sorted(LOG_SCHEMAS[log_name]):
+                        if len(LOG_SCHEMAS[log_name][other]) == width:
+                            return log_name, other, schema_columns(log_name, other), False
+                return log_name, version, columns, False
+    return None, None, columns, False
+
+
+def log_schema(path, name=None):
+    """Dosyanın şeması: (ad, sürüm, sütunlar, sürüm satırı var mı)"""
+    with open(path, "rb") as f:
+        return read_schema(f, name)
+
+
+def load_log(path, name=None, usecols=None):
+    """
+    Log dosyasını tek geçişte DataFrame'e okur (pandas C engine, şemadaki dtype'lar).
+    .traj dosyası verilirse sütunlar memmap'ten okunur (çok boyutlular obs_0, obs_1, ... diye açılır).
+    df.attrs["schema"] = (ad, sürüm)
+    """
+    import numpy as np
+    import pandas as pd
+
+    if path.endswith(".traj"):
+        from traj_store import TrajectoryFile
+        traj = TrajectoryFile(path)
+        flat = {}
+        for key in usecols or traj.columns:
+            value = np.asarray(traj[key])
+            if value.ndim == 1:
+                flat[key] = value
+            else:
+                for i in range(value.shape[1]):
+                    flat[f"{key}_{i}"] = value[:, i]
+        df = pd.DataFrame(flat)
+        df.attrs["schema"] = ("traj", traj.header["version"])
+        return df
+
+    with open(path, "rb") as f:
+        log_name, version, columns, _ = read_schema(f, name)
+        dtypes = schema_dtypes(log_name, version) if log_name in LOG_SCHEMAS else None
+        # Başlık okundu; pandas kalan veriyi kaldığı yerden tek geçişte okur
+        df = pd.read_csv(f, header=None, names=columns, usecols=usecols, dtype=dtypes, engine="c")
+    df.attrs["schema"] = (log_name, version)
+    return df
+
+
+def ensure_log_header(path, name, defaults=None):
+    """
+    Log dosyası yoksa güncel şema başlığıyla oluşturur. Eski sürümdeyse bir kez taşır:
+    - Sütunlar aynıysa (sadece başlık eksik / yanlış) başlık yenilenir
+    - Yeni sütunlar sonda ise eski satırlara defaults'taki değerler eklenir
+    - Taşınamıyorsa eski dosya <ad>.v<N>.csv olarak kenara alınır, yeni dosya açılır
+    """
+    target = schema_columns(name)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(header_text(name))
+        return
+
+    with open(path, "rb") as f:
+        log_name, version, columns, tagged = read_schema(f, name)
+        offset = f.tell()
+    if log_name == name and version == current_version(name) and tagged:
+        return
+
+    defaults = defaults or {}
+    extra = target[len(columns):]
+    if log_name == name and target[:len(columns)] == columns and all(c in defaults for c in extra):
+        fill = "".join(f",{defaults[c]}" for c in extra)
+        tmp = path + ".tmp"
+        with open(path, "rb") as src, open(tmp, "w", encoding="utf-8") as dst:
+            src.seek(offset)
+            dst.write(header_text(name))
+            for line in src:
+                line = line.decode("utf-8").rstrip("\r\n")
+                if line:
+                    dst.write(f"{line}{fill}\n")
+        os.replace(tmp, path)
+        return
+
+    root, ext = os.path.splitext(path)
+    backup = f"{root}.v{version or 0}{ext}"
+    os.replace(path, backup)
+    print(f"[LOG] {path} şeması ({log_name}/v{version}) taşınamadı; {backup} olarak saklandı, yeni dosya açılıyor")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header_text(name))
@@ -0,0 +1,125 @@
+"""
+Log Yazıcı: CSV loglarını rollout döngüsünün dışında yazan tamponlu sink
+- Dosyalar açık tutulur; satırlar bellekte birikir (write() dosya işlemi yapmaz)
+- Arka plan thread'i satır sayısı (flush_rows) veya süre (flush_interval) eşiğinde yazar
+- close() / çıkış (atexit, yakalanmamış exception dahil) bekleyen satırları boşaltır
+- Yazılamayan dosyanın (eksik dizin, dolu disk) satırları kaybolmaz: kuyruğa geri konur, sonraki flush tekrar dener;
+  close() sırasında hâlâ yazılamıyorsa kaç satırın kaldığını OSError ile bildirir
+- Kullanım:
+    sink = LogSink()
+    sink.write("models/state_log.csv", f"{up},{ep},{t}\\n")
+    sink.close()
+"""
+
+import os
+import time
+import atexit
+import threading
+
+
+class LogSink():
+
+    def __init__(self, flush_rows=4096, flush_interval=1.0):
+        self.flush_rows = flush_rows          # bu kadar satır birikince hemen yaz
+        self.flush_interval = flush_interval  # en geç bu kadar saniyede bir yaz
+        self._files = {}
+        self._pending = {}  # path -> [satırlar]
+        self._count = 0
+        self._closed = False
+        self._lock = threading.Lock()     # _pending / _count
+        self._io_lock = threading.Lock()  # flush'lar sıralı: satır sırası korunur
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, path, line):
+        """Satırı kuyruğa ekler ('\\n' ile bitmeli). Kapandıktan sonra doğrudan dosyaya yazar."""
+        with self._lock:
+            if not self._closed:
+                self._pending.setdefault(path, []).append(line)
+                self._count += 1
+                if self._count >= self.flush_rows:
+                    self._wake.set()
+                return
+        with self._io_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def flush(self):
+        """
+        Bekleyen satırları yazar (çağıran thread'de). Her dosya ayrı denenir: yazılamayan dosyanın satırları
+        kuyruğun başına geri konur, diğer dosyalar yazılmaya devam eder. Hata varsa sonunda OSError.
+        """
+        failed = {}
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending, self._count = self._pending, {}, 0
+            for path, lines in pending.items():
+                text = "".join(lines)
+                if os.linesep != "\n":
+                    text = text.replace("\n", os.linesep)  # metin modundaki gibi satır sonu
+                try:
+                    self._write_file(path, text.encode("utf-8"))
+                except Exception as e:
+                    failed[path] = (len(lines), e)
+                    with self._lock:
+                        self._pending[path] = lines + self._pending.get(path, [])
+                        self._count += len(lines)
+        if failed:
+            raise OSError("; ".join(f"{path}: {n} satır bekliyor ({e})" for path, (n, e) in failed.items()))
+
+    def _write_file(self, path, data):
+        """Tamponsuz tek yazım; yarıda kalırsa dosya yazım öncesi boyuna geri kesilir (yarım satır kalmaz)"""
+        f = self._files.get(path)
+        if f is None:
+            f = self._files[path] = open(path, "ab", buffering=0)
+        start = f.tell()
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[f.write(view):]
+        except BaseException:
+            self._files.pop(path, None)
+            try:
+                f.truncate(start)
+            except OSError:
+                pass
+            f.close()
+            raise
+
+    def _run(self):
+        last_error = None
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                last_error = None
+            except Exception as e:
+                if str(e) != last_error:
+                    print(f"[LogSink] Log yazılamadı, tekrar denenecek: {e}", flush=True)
+                last_error = str(e)
+                # Kuyruk flush_rows'u aşık kalır; her write'ta uyanıp boşuna denememek için bekle
+                time.sleep(self.flush_interval)
+
+    def close(self):
+        """
+        Bekleyen satırları boşaltır, dosyaları kapatır (tekrar çağrılabilir).
+        Yazılamayan satır kalırsa OSError: dosya başına kalan satır sayısı (satırlar diske yazılmadı).
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        try:
+            self.flush()
+        except OSError as e:
+            dropped = sum(len(lines) for lines in self._pending.values())
+            raise OSError(f"[LogSink] kapanışta {dropped} satır yazılamadı: {e}") from e
+        finally:
+            with self._io_lock:
+                for f in self._files.values():
+                    f.close()
+                self._files.clear()
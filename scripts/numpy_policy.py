@@ -0,0 +1,103 @@
+"""
+NumPy Policy: PPOAgent policy'sinin TensorFlow'suz çalıştırılması
+- Bundle (.npz): Dense kernel/bias'ları, aktivasyonlar ve log_std (PPOAgent.export_bundle)
+- NumpyPolicy: PPOAgent.act / act_batch ve play_test.act_deterministic'in saf NumPy karşılığı
+- Actor process'leri ve play-test TF import etmeden (saniyeler süren başlangıç, yüzlerce MB RSS) çalışır
+- Kullanım:
+    policy = NumpyPolicy.load("models/rocket_policy_up300.npz")
+    action, logp, value = policy.act(state_norm)
+"""
+
+import os
+import numpy as np
+
+POLICY_BUNDLE_VERSION = 1
+LOG_2PI = np.log(2.0 * np.pi).astype(np.float32)
+
+_ACTIVATIONS = {
+    "tanh": np.tanh,
+    "linear": None,
+    "relu": lambda x: np.maximum(x, 0.0),
+}
+
+
+def save_bundle(path, bundle):
+    """Bundle'ı atomik yazar (yarım dosya kalmaz)"""
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **bundle)
+    os.replace(tmp, path)
+
+
+def load_bundle(path):
+    with np.load(path) as data:
+        bundle = {key: data[key] for key in data.files}
+    version = int(bundle.get("format_version", -1))
+    if version != POLICY_BUNDLE_VERSION:
+        raise ValueError(f"Desteklenmeyen policy bundle sürümü: {version} (beklenen {POLICY_BUNDLE_VERSION})")
+    return bundle
+
+
+class NumpyPolicy():
+    """
+    Gövde (trunk) Dense katmanları sırayla, ardından mu ve v başlıkları (agent.build_model ile aynı topoloji).
+    Hesap float32: TF ile fark yuvarlama düzeyinde.
+    """
+
+    def __init__(self, bundle, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.set_weights(bundle)
+
+    @classmethod
+    def load(cls, path, seed=None):
+        return cls(load_bundle(path), seed=seed)
+
+    def set_weights(self, bundle):
+        """Yeni ağırlıkları yükler (ör. pipeline'da learner'ın yayınladığı bundle)"""
+        self.trunk = []
+        for i in range(int(bundle["n_trunk"])):
+            act = str(bundle[f"trunk_act_{i}"])
+            if act not in _ACTIVATIONS:
+                raise ValueError(f"Desteklenmeyen aktivasyon: {act}")
+            self.trunk.append((np.asarray(bundle[f"trunk_kernel_{i}"], dtype=np.float32),
+                               np.asarray(bundle[f"trunk_bias_{i}"], dtype=np.float32),
+                               _ACTIVATIONS[act]))
+        self.mu_kernel = np.asarray(bundle["mu_kernel"], dtype=np.float32)
+        self.mu_bias = np.asarray(bundle["mu_bias"], dtype=np.float32)
+        self.v_kernel = np.asarray(bundle["v_kernel"], dtype=np.float32)
+        self.v_bias = np.asarray(bundle["v_bias"], dtype=np.float32)
+        self.log_std = np.asarray(bundle["log_std"], dtype=np.float32)
+        self.state_size = self.trunk[0][0].shape[0] if self.trunk else self.mu_kernel.shape[0]
+        self.action_size = self.mu_kernel.shape[1]
+
+    def forward(self, states):
+        """(N, 13) -> mu (N, 4), value (N,)"""
+        x = np.asarray(states, dtype=np.float32)
+        for kernel, bias, act in self.trunk:
+            x = x @ kernel + bias
+            if act is not None:
+                x = act(x)
+        mu = x @ self.mu_kernel + self.mu_bias
+        v = x @ self.v_kernel + self.v_bias
+        return mu, v[:, 0]
+
+    def act_batch(self, states):
+        """PPOAgent.act_batch karşılığı: aksiyon (N, 4), logp (N,), value (N,)"""
+        mu, v = self.forward(states)
+        std = np.exp(self.log_std)
+        eps = self.rng.standard_normal(mu.shape, dtype=np.float32)
+        pre_tanh = mu + std * eps
+        a = np.tanh(pre_tanh)
+
+        var = np.exp(2.0 * self.log_std)
+        logp_gauss = np.sum(-0.5 * (((pre_tanh - mu) ** 2) / (var + 1e-8) + 2.0 * self.log_std + LOG_2PI), axis=-1)
+        correction = np.sum(np.log(1.0 - a * a + 1e-6), axis=-1)
+        return a, logp_gauss - correction, v
+
+    def act(self, state):
+        a, logp, v = self.act_batch(np.asarray(state, dtype=np.float32)[None, :])
+        return a[0], float(logp[0]), float(v[0])
+
+    def act_deterministic(self, state):
+        """Gürültüsüz aksiyon: tanh(mu) (play_test.act_deterministic karşılığı)"""
+        mu, _ = self.forward(np.asarray(state, dtype=np.float32)[None, :])
+        return np.tanh(mu[0])
@@ -4,6 +4,7 @@ Play-Test Script: Train edilmiş modeli test etmek için
 - Episode'lar çalıştırılır (random başlangıç)
 - Success durumunda 2-3 saniye bekler
 - Otomatik olarak yeni episode başlatır
+- --bundle: TensorFlow'suz, NumPy policy bundle'ı ile (numpy_policy.NumpyPolicy)
 """
 
 import os
@@ -11,15 +12,15 @@ import sys
 import time
 import argparse
 import numpy as np
-import tensorflow as tf
 from datetime import datetime
 
-from agent import PPOAgent
 from env import Env
+from numpy_policy import NumpyPolicy
 
 # GPU setup
 def setup_gpu():
     """GPU kullanımını yapılandırır"""
+    import tensorflow as tf
     gpus = tf.config.experimental.list_physical_devices('GPU')
     if gpus:
         try:
@@ -41,6 +42,7 @@ def as_float32(x):
 
 def load_checkpoint(model_path, state_path, agent):
     """Checkpoint yükler"""
+    import tensorflow as tf
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Model dosyası bulunamadı: {model_path}")
     
@@ -66,6 +68,7 @@ def act_deterministic(agent, state):
     Training'de agent.act() kullanılıyor, bu da exploration ekliyor. Test'te de aynı mantığı kullanalım
     ama seed'i sabitleyerek deterministik yapalım (her episode aynı sonuçlar için).
     """
+    import tensorflow as tf
     s = tf.convert_to_tensor(state[None,:], tf.float32)
     mu, v = agent.model(s)
     mu = tf.squeeze(mu, 0)
@@ -363,14 +366,15 @@ def main():
                         help='Success durumunda bekleme süresi (saniye, default: 2.5)')
     parser.add_argument('--show-steps', action='store_true',
                         help='Her adımı göster (default: sadece özet)')
+    parser.add_argument('--bundle', type=str, default=None,
+                        help='NumPy policy bundle (örn: models/rocket_policy_up300.npz) - TensorFlow yüklenmez')
     
     args = parser.parse_args()
     
-    # GPU setup
-    setup_gpu()
-    
     # Model yolu belirleme
-    if args.model:
+    if args.bundle:
+        model_path = args.bundle
+    elif args.model:
         model_path = args.model
         # State path'i bul: rocket_model_up300.keras -> rocket_state_up300.pkl.gz
         import re
@@ -413,11 +417,21 @@ def main():
     # Agent ve Environment oluştur
     print("[INFO] Environment ve Agent hazırlanıyor...")
     environment = Env()
-    agent = PPOAgent()
     
     # Model yükle
     try:
-        load_checkpoint(model_path, state_path, agent)
+        if args.bundle:
+            print(f"Policy bundle yükleniyor: {model_path}")
+            policy = NumpyPolicy.load(model_path)
+            act_fn = policy.act_deterministic
+            print("[OK] Bundle başarıyla yüklendi! (TensorFlow'suz)\n")
+        else:
+            # GPU setup
+            setup_gpu()
+            from agent import PPOAgent
+            agent = PPOAgent()
+            load_checkpoint(model_path, state_path, agent)
+            act_fn = lambda s: act_deterministic(agent, s)
     except Exception as e:
         print(f"[ERROR] Model yüklenirken hata: {e}")
         sys.exit(1)
@@ -459,7 +473,7 @@ def main():
             # Başlangıç state'ini oku (Unity reset komutunun response'unu bekler)
             # initialStart() Unity'ye Mode 1 reset gönderir, Unity bir response gönderir
             state_raw = as_float32(environment.readStates())
-            state_norm = as_float32(environment.normalize_state(state_raw))
+            state_norm = environment.normalize_state(state_raw)
             
             # Başlangıç bilgileri
             start_info = format_state(state_raw)
@@ -470,7 +484,7 @@ def main():
             
             while not done:
                 # Deterministik action al (exploration yok)
-                action = act_deterministic(agent, state_norm)
+                action = act_fn(state_norm)
                 
                 # Step
                 next_state_raw, done, reward = environment.step(action)
@@ -486,7 +500,7 @@ def main():
                 
                 # State güncelle
                 state_raw = as_float32(next_state_raw)
-                state_norm = as_float32(environment.normalize_state(state_raw))
+                state_norm = environment.normalize_state(state_raw)
             
             # Test sonu - son state zaten elimizde (next_state_raw'dan gelen)
             reason = getattr(environment, 'termination_reason', 'Unknown')
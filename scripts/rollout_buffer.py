@@ -0,0 +1,144 @@
+"""
+Rollout Buffer: PPO rollout verisi için bir kez ayrılan, yeniden kullanılan bellek
+- (T, N) düzeni: T adım x N ortam (tek ortamda N=1)
+- Tüm alanlar tek bitişik bellek bloğunun view'leri; learner kopyasız okur
+- shared=True: blok multiprocessing.shared_memory'de; worker process'ler spec() ile
+  attach() olup pickle'sız yazar (doluluk sayacı da aynı blokta)
+- Kullanım:
+    buf = RolloutBuffer(1800, n_envs=1)
+    buf.add(states=s, actions=a, old_logps=lp, rewards=r, dones=d, values=v)
+    ajan.train(buf.states, buf.actions, buf.old_logps, buf.rewards, buf.dones, buf.values, last_value)
+"""
+
+import numpy as np
+
+_ALIGN = 64  # her alan cache line sınırından başlar
+
+
+class RolloutBuffer():
+
+    def __init__(self, T, n_envs=1, state_size=13, action_size=4, extra_fields=None,
+                 shared=False, name=None, _attach=False):
+        """
+        extra_fields: ek alanlar {ad: (satır başı şekil, dtype)}, ör. {"raw_states": ((13,), np.float32)}
+        shared: True ise blok shared memory'de oluşturulur (name verilmezse OS isim atar)
+        """
+        self.T = T
+        self.n_envs = n_envs
+        self.state_size = state_size
+        self.action_size = action_size
+        self.extra_fields = dict(extra_fields or {})
+
+        fields = {
+            "states": ((state_size,), np.float32),
+            "actions": ((action_size,), np.float32),
+            "old_logps": ((), np.float32),
+            "rewards": ((), np.float32),
+            "dones": ((), np.float32),
+            "values": ((), np.float32),
+            "truncated": ((), np.bool_),           # TimeLimit bitişi (bkz. agent.compute_gae)
+            "bootstrap_values": ((), np.float32),  # truncated adımda bitiş state'inin V'si
+        }
+        for key, (shape, dtype) in self.extra_fields.items():
+            if key in fields:
+                raise ValueError(f"Alan adı çakışıyor: {key}")
+            fields[key] = (tuple(shape), dtype)
+        self.fields = tuple(fields)
+
+        # Yerleşim: [pos (int64)] + hizalı alanlar
+        layout = []
+        offset = _ALIGN
+        for key, (shape, dtype) in fields.items():
+            full = (T, n_envs) + tuple(shape)
+            layout.append((key, full, np.dtype(dtype), offset))
+            nbytes = int(np.prod(full)) * np.dtype(dtype).itemsize
+            offset += -(-nbytes // _ALIGN) * _ALIGN
+        self.nbytes = offset
+
+        self._shm = None
+        if shared or _attach:
+            from multiprocessing import shared_memory  # Python 3.8+
+            if _attach:
+                try:
+                    # 3.13+: bağlanan process bloğu resource tracker'a kaydetmez (çıkışta silmesin)
+                    self._shm = shared_memory.SharedMemory(name=name, track=False)
+                except TypeError:
+                    self._shm = shared_memory.SharedMemory(name=name)
+            else:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=self.nbytes)
+            buf = self._shm.buf
+        else:
+            buf = bytearray(self.nbytes)
+
+        self._pos = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        for key, full, dtype, off in layout:
+            setattr(self, key, np.ndarray(full, dtype=dtype, buffer=buf, offset=off))
+        if not _attach:
+            self.reset()
+
+    # --- Shared memory ---
+    @property
+    def name(self):
+        return self._shm.name if self._shm is not None else None
+
+    def spec(self):
+        """attach() için picklable tanım (process'e argüman olarak geçilebilir)"""
+        if self._shm is None:
+            raise ValueError("spec() sadece shared=True buffer'da kullanılabilir")
+        return {"T": self.T, "n_envs": self.n_envs, "state_size": self.state_size,
+                "action_size": self.action_size, "extra_fields": self.extra_fields, "name": self.name}
+
+    @classmethod
+    def attach(cls, spec):
+        """Başka process'in oluşturduğu shared buffer'a bağlan (kopya yok, sıfırlama yok)"""
+        return cls(spec["T"], spec["n_envs"], spec["state_size"], spec["action_size"],
+                   spec["extra_fields"], name=spec["name"], _attach=True)
+
+    def close(self):
+        """Bu process'in shared memory bağlantısını kapatır (view'ler artık kullanılamaz)"""
+        if self._shm is not None:
+            for key in self.fields:
+                setattr(self, key, None)
+            self._pos = None
+            self._shm.close()
+
+    def unlink(self):
+        """Shared memory bloğunu sistemden siler (sadece oluşturan process çağırmalı)"""
+        if self._shm is not None:
+            self._shm.unlink()
+
+    # --- Doluluk ---
+    @property
+    def pos(self):
+        return int(self._pos[0])
+
+    def __len__(self):
+        return self.pos
+
+    @property
+    def full(self):
+        return self.pos >= self.T
+
+    def reset(self):
+        """Yeni rollout: sadece sayaç ve bayraklar sıfırlanır, bellek yeniden ayrılmaz"""
+        self._pos[0] = 0
+        self.truncated[:] = False
+        self.bootstrap_values[:] = 0.0
+
+    def add(self, **values):
+        """
+        Sıradaki adımı yazar (N ortamın hepsi için); tek ortamda skaler / (13,) değerler yayınlanır.
+        Verilmeyen alanlar o adım için değişmez.
+        """
+        t = self.pos
+        if t >= self.T:
+            raise IndexError(f"RolloutBuffer dolu (T={self.T})")
+        for key, value in values.items():
+            getattr(self, key)[t] = value
+        self._pos[0] = t + 1
+        return t
+
+    def views(self):
+        """Dolu kısmın kopyasız view'leri: {alan: (pos, N, ...)}"""
+        t = self.pos
+        return {key: getattr(self, key)[:t] for key in self.fields}
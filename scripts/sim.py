@@ -0,0 +1,311 @@
+"""
+Headless Roket Simülatörü: env.cs ApplyPhysics'in saf NumPy karşılığı
+- Unity açmadan eğitim / ödül ayarı / PPO hiperparametre denemeleri için
+- connector.cs ile aynı komutları anlar: mode 1 (reset), mode 0 (aksiyon), her komut 1 physics step
+- Ek olarak mode 2 (auto-reset adımı) ve mode 3 (action repeat), bkz. connector.py
+- State formatı aynı: [dx, dy, dz, vx, vy, vz, wx, wy, wz, qx, qy, qz, qw]
+
+Fizik (env.cs + SampleScene Rigidbody ayarları):
+- Ana motor: AddRelativeForce(up * clamp01(thrust) * mainThrustPower), mainThrustPower = 20000
+- RCS: pitch/yaw rcsPower = 1200, roll 0.1x; env.cs'deki gibi transform.right/up/forward ile
+  dünya vektörüne çevrilip AddRelativeTorque'a veriliyor (yani iki kez döndürülüyor) - aynen taklit edildi
+- Kütle 1000 kg, linear damping 0.01, angular damping 0.2, max açısal hız 50 rad/s, g = 9.81
+- Fixed timestep 0.02 s, semi-implicit Euler (PhysX gibi: önce hız, sonra pozisyon)
+- Atalet tensörü: Unity implicit tensor (kapsül collider r=0.5, h=6.5) silindir yaklaşımıyla
+- BottomSensor roket merkezinin 3.35 m altında, hedef (TargetPoint) orijinde
+
+Tüm fonksiyonlar (M, ...) şekilli dizilerle çalışır; RocketSim tek roket için M=1 kullanır.
+"""
+
+import numpy as np
+
+from connector import AUTO_RESET_MODE, ACTION_REPEAT_MODE, FEATURE_AUTO_RESET, FEATURE_ACTION_REPEAT
+
+DT = 0.02
+GRAVITY = np.array([0.0, -9.81, 0.0])
+MASS = 1000.0
+MAIN_THRUST_POWER = 20000.0
+RCS_POWER = 1200.0
+ROLL_FACTOR = 0.1
+LINEAR_DAMPING = 0.01
+ANGULAR_DAMPING = 0.2
+MAX_ANGULAR_SPEED = 50.0
+SENSOR_OFFSET_Y = -3.35  # BottomSensor lokal y
+
+_RADIUS, _HEIGHT = 0.5, 6.5
+INERTIA = np.array([
+    MASS * (3.0 * _RADIUS ** 2 + _HEIGHT ** 2) / 12.0,  # x (pitch)
+    MASS * _RADIUS ** 2 / 2.0,                           # y (uzun eksen)
+    MASS * (3.0 * _RADIUS ** 2 + _HEIGHT ** 2) / 12.0,  # z
+])
+
+
+def euler_to_quat(pitch, yaw):
+    """Unity Quaternion.Euler(pitch, yaw, 0) (derece) -> (M, 4) [x, y, z, w]"""
+    p = np.radians(pitch) * 0.5
+    w = np.radians(yaw) * 0.5
+    sp, cp, sw, cw = np.sin(p), np.cos(p), np.sin(w), np.cos(w)
+    return np.stack([sp * cw, cp * sw, -sp * sw, cp * cw], axis=-1)
+
+
+def quat_to_matrix(q):
+    """(M, 4) [x, y, z, w] -> (M, 3, 3) rotasyon matrisi (lokal -> dünya)"""
+    x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    R = np.empty((q.shape[0], 3, 3))
+    R[:, 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    R[:, 0, 1] = 2.0 * (x * y - z * w)
+    R[:, 0, 2] = 2.0 * (x * z + y * w)
+    R[:, 1, 0] = 2.0 * (x * y + z * w)
+    R[:, 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    R[:, 1, 2] = 2.0 * (y * z - x * w)
+    R[:, 2, 0] = 2.0 * (x * z - y * w)
+    R[:, 2, 1] = 2.0 * (y * z + x * w)
+    R[:, 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    return R
+
+
+def _matvec(R, v):
+    return np.matmul(R, v[:, :, None])[:, :, 0]
+
+
+def _matvec_t(R, v):
+    return np.matmul(v[:, None, :], R)[:, 0, :]
+
+
+def physics_step(pos, vel, quat, angvel, thrust, torque_cmd):
+    """
+    Tek fixed step (yerinde günceller).
+    thrust: (M,) [0, 1], torque_cmd: (M, 3) lokal [pitch, yaw, roll*0.1] * rcsPower
+    """
+    R = quat_to_matrix(quat)
+
+    # AddRelativeForce(Vector3.up * motorGucu * mainThrustPower): lokal up = R'nin 2. sütunu
+    force = R[:, :, 1] * (np.clip(thrust, 0.0, 1.0) * MAIN_THRUST_POWER)[:, None]
+
+    # env.cs: tork = transform.right*pitch + transform.up*yaw + transform.forward*roll (dünya),
+    # sonra AddRelativeTorque(tork) -> tork lokal kabul edilip tekrar döndürülüyor
+    torque = _matvec(R, _matvec(R, torque_cmd))
+
+    # Açısal ivme: I_world^-1 * tau = R * diag(1/I) * R^T * tau
+    ang_acc = _matvec(R, _matvec_t(R, torque) / INERTIA)
+
+    vel += (force / MASS + GRAVITY) * DT
+    vel *= max(0.0, 1.0 - LINEAR_DAMPING * DT)
+    angvel += ang_acc * DT
+    angvel *= max(0.0, 1.0 - ANGULAR_DAMPING * DT)
+
+    w_mag = np.sqrt(np.einsum("ij,ij->i", angvel, angvel))
+    over = w_mag > MAX_ANGULAR_SPEED
+    if over.any():
+        angvel[over] *= (MAX_ANGULAR_SPEED / w_mag[over])[:, None]
+
+    pos += vel * DT
+
+    # Quaternion entegrasyonu: q += 0.5 * dt * (w, 0) x q
+    wx, wy, wz = angvel[:, 0], angvel[:, 1], angvel[:, 2]
+    x, y, z, w = quat[:, 0].copy(), quat[:, 1].copy(), quat[:, 2].copy(), quat[:, 3].copy()
+    h = 0.5 * DT
+    quat[:, 0] += h * (wx * w + wy * z - wz * y)
+    quat[:, 1] += h * (wy * w + wz * x - wx * z)
+    quat[:, 2] += h * (wz * w + wx * y - wy * x)
+    quat[:, 3] -= h * (wx * x + wy * y + wz * z)
+    quat /= np.sqrt(np.einsum("ij,ij->i", quat, quat))[:, None]
+
+    # Zemin: sensör y=0 altına inemez (gerçek temas Python tarafında Landing ile zaten biter)
+    sensor_y = pos[:, 1] + SENSOR_OFFSET_Y * (1.0 - 2.0 * (quat[:, 0] ** 2 + quat[:, 2] ** 2))
+    below = sensor_y < 0.0
+    if below.any():
+        pos[below, 1] -= sensor_y[below]
+        vel[below, 1] = np.maximum(vel[below, 1], 0.0)
+
+
+def get_states(pos, vel, quat, angvel, out=None):
+    """env.cs getStates() -> (M, 13) float32"""
+    if out is None:
+        out = np.empty((pos.shape[0], 13), dtype=np.float32)
+    sensor = pos + quat_to_matrix(quat)[:, :, 1] * SENSOR_OFFSET_Y
+    out[:, 0] = -sensor[:, 0]   # dx = target.x - bottom.x
+    out[:, 1] = sensor[:, 1]    # dy = bottom.y - target.y
+    out[:, 2] = -sensor[:, 2]   # dz = target.z - bottom.z
+    out[:, 3:6] = vel
+    out[:, 6:9] = angvel
+    out[:, 9:13] = quat
+    return out
+
+
+class RocketSim():
+    """
+    Tek roketli headless simülatör. Connector ile aynı arayüz (sendCs / readCs),
+    bu yüzden doğrudan Env(con=RocketSim()) olarak kullanılabilir.
+    """
+
+    def __init__(self):
+        self.pos = np.zeros((1, 3))
+        self.vel = np.zeros((1, 3))
+        self.quat = np.array([[0.0, 0.0, 0.0, 1.0]])
+        self.angvel = np.zeros((1, 3))
+        self._thrust = np.zeros(1)
+        self._torque = np.zeros((1, 3))
+        self._reply = None
+        # Auto-reset: son mode 2 cevabındaki spekülatif reset (pos, vel, quat, angvel)
+        self._pending = tuple(np.zeros_like(a) for a in (self.pos, self.vel, self.quat, self.angvel))
+        self._pending_key = None    # reset parametreleri episode boyunca aynı -> bir kez hesaplanır
+        self._pending_state = None
+
+    def reset(self, x, y, z, pitch, yaw):
+        """env.cs ResetEnv()"""
+        self.pos[0] = (x, y, z)
+        self.vel[:] = 0.0
+        self.angvel[:] = 0.0
+        self.quat[:] = euler_to_quat(np.array([pitch]), np.array([yaw]))
+
+    def handle(self, values):
+        """connector.cs Update(): doAction -> Physics.Simulate -> getStates"""
+        mode = int(values[0])
+        self._thrust[0] = 0.0
+        self._torque[:] = 0.0
+        auto_reset = mode == AUTO_RESET_MODE and len(values) >= 11
+        ticks = 1  # action repeat: aynı aksiyonla kaç physics step
+        if mode == 1 and len(values) >= 6:
+            self.reset(*values[1:6])
+        elif mode in (0, AUTO_RESET_MODE, ACTION_REPEAT_MODE) and len(values) >= 5:
+            if auto_reset:
+                if values[5]:
+                    self._commit_reset()
+                if len(values) >= 12:
+                    ticks = max(1, int(values[11]))
+            elif mode == ACTION_REPEAT_MODE and len(values) >= 6:
+                ticks = max(1, int(values[5]))
+            pitch, yaw, thrust, roll = values[1:5]
+            self._thrust[0] = thrust
+            self._torque[0] = (pitch * RCS_POWER, yaw * RCS_POWER, roll * RCS_POWER * ROLL_FACTOR)
+
+        states = []
+        for _ in range(ticks):
+            physics_step(self.pos, self.vel, self.quat, self.angvel, self._thrust, self._torque)
+            states.append(get_states(self.pos, self.vel, self.quat, self.angvel)[0])
+        if auto_reset:
+            states.append(self._speculative_reset(*values[6:11]))
+        return states[0] if len(states) == 1 else np.concatenate(states)
+
+    def _speculative_reset(self, x, y, z, pitch, yaw):
+        """Asıl roketi değiştirmeden reset + 1 physics step (itki yok) sonucunu hesaplar."""
+        key = (x, y, z, pitch, yaw)
+        if key == self._pending_key:
+            return self._pending_state
+        pos, vel, quat, angvel = self._pending
+        pos[0] = (x, y, z)
+        vel[:] = 0.0
+        angvel[:] = 0.0
+        quat[:] = euler_to_quat(np.array([pitch]), np.array([yaw]))
+        physics_step(pos, vel, quat, angvel, np.zeros(1), np.zeros((1, 3)))
+        self._pending_key = key
+        self._pending_state = get_states(pos, vel, quat, angvel)[0]
+        return self._pending_state
+
+    def _commit_reset(self):
+        for dst, src in zip((self.pos, self.vel, self.quat, self.angvel), self._pending):
+            dst[:] = src
+
+    def request_feature(self, code):
+        return code in (FEATURE_AUTO_RESET, FEATURE_ACTION_REPEAT)
+
+    # --- Connector arayüzü ---
+    def sendCs(self, data):
+        self._reply = self.handle(data)
+
+    def readCs(self):
+        reply, self._reply = self._reply, None
+        if reply is None:
+            raise ConnectionError("Headless sim: cevap bekleyen komut yok.")
+        return reply
+
+    def close(self):
+        pass
+
+
+class BatchRocketSim():
+    """
+    M roketi structure-of-arrays düzeninde tek vektörize adımda ilerleten simülatör.
+    - pos/vel/angvel (M, 3), quat (M, 4) bitişik float64 diziler
+    - step(actions) -> (M, 13) state, (M,) ödül, (M,) done maskesi
+    - Biten roketler Env.init_*_min/max aralıklarından otomatik resetlenir;
+      döndürülen state yeni episode'un ilk state'idir, bitiş state'i terminal_states'te,
+      bitiş sebebi reason_codes'ta (env.TERMINATION_REASONS index'i) kalır
+    """
+
+    def __init__(self, n, env=None, seed=None):
+        if env is None:
+            from env import HeadlessEnv  # env.py sim'i import ediyor, döngüyü burada kır
+            env = HeadlessEnv()
+        self.n = n
+        self.env = env  # ödül fonksiyonu, max_steps ve başlangıç aralıkları buradan
+        self.rng = np.random.default_rng(seed)
+
+        self.pos = np.zeros((n, 3))
+        self.vel = np.zeros((n, 3))
+        self.quat = np.zeros((n, 4))
+        self.angvel = np.zeros((n, 3))
+        self.step_counts = np.zeros(n, dtype=np.int64)
+
+        self.states = np.zeros((n, 13), dtype=np.float32)
+        self.terminal_states = np.zeros((n, 13), dtype=np.float32)
+        self.reason_codes = np.zeros(n, dtype=np.int8)  # env.TERMINATION_REASONS index'i
+
+    def _draw_resets(self, k):
+        e, u = self.env, self.rng.uniform
+        return (u(e.init_x_min, e.init_x_max, k), u(e.init_y_min, e.init_y_max, k),
+                u(e.init_z_min, e.init_z_max, k),
+                u(e.init_pitch_min, e.init_pitch_max, k), u(e.init_yaw_min, e.init_yaw_max, k))
+
+    def reset(self, idx=None):
+        """
+        idx roketlerini resetler (None: hepsi). connector.cs gibi reset sonrası 1 physics step
+        (itki yok) uygulanır. Dönüş: tüm roketlerin güncel state'i (M, 13).
+        """
+        if idx is None:
+            idx = np.arange(self.n)
+        k = len(idx)
+        if k == 0:
+            return self.states
+        x, y, z, pitch, yaw = self._draw_resets(k)
+
+        pos = np.stack([x, y, z], axis=1)
+        vel = np.zeros((k, 3))
+        angvel = np.zeros((k, 3))
+        quat = euler_to_quat(pitch, yaw)
+        physics_step(pos, vel, quat, angvel, np.zeros(k), np.zeros((k, 3)))
+
+        self.pos[idx], self.vel[idx], self.quat[idx], self.angvel[idx] = pos, vel, quat, angvel
+        self.step_counts[idx] = 0
+        self.states[idx] = get_states(pos, vel, quat, angvel)
+        return self.states
+
+    def step(self, actions):
+        """
+        actions: (M, 4) [pitch, yaw, thrust_raw, roll] (Env.step ile aynı format)
+        Dönüş: states (M, 13), rewards (M,) (0.35 ölçekli), dones (M,) bool
+        """
+        actions = np.asarray(actions, dtype=np.float64)
+        thrust = np.clip(0.5 * (actions[:, 2] + 1.0), 0.0, 1.0)
+        torque_cmd = np.empty((self.n, 3))
+        torque_cmd[:, 0] = actions[:, 0] * RCS_POWER
+        torque_cmd[:, 1] = actions[:, 1] * RCS_POWER
+        torque_cmd[:, 2] = actions[:, 3] * (RCS_POWER * ROLL_FACTOR)
+
+        physics_step(self.pos, self.vel, self.quat, self.angvel, thrust, torque_cmd)
+        self.step_counts += 1
+        get_states(self.pos, self.vel, self.quat, self.angvel, out=self.states)
+
+        rewards, dones = self._rewards(self.states)
+
+        done_idx = np.flatnonzero(dones)
+        if done_idx.size:
+            self.terminal_states[done_idx] = self.states[done_idx]
+            self.reset(done_idx)
+        return self.states.copy(), rewards, dones
+
+    def _rewards(self, states):
+        # Env.compute_reward_done_batch: tek NumPy geçişi, skaler versiyonla bit-bit aynı
+        rewards, dones, self.reason_codes = self.env.compute_reward_done_batch(states, self.step_counts)
+        return rewards.astype(np.float32), dones
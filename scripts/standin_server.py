@@ -0,0 +1,176 @@
+"""
+Stand-in Sunucu: Unity connector.cs'in Python taklidi
+- Aynı TCP protokolü: mode 1 (reset), mode 0 (aksiyon), her komuta 1 state cevabı
+- Handshake (mode 9) ile binary float32 protokolünü destekler (connector.py)
+- Auto-reset özelliği (FEATURE_AUTO_RESET, mode 2): bölüm sonunda ayrı reset round trip'i gerekmez
+- Action repeat özelliği (FEATURE_ACTION_REPEAT, mode 3): tek komutla K physics step
+- Unity'nin "state + boş satır" davranışını taklit eder
+- Fizik: sim.RocketSim (env.cs ApplyPhysics'in NumPy karşılığı)
+- Unity açmadan Connector/Env testleri ve protokol benchmark'ı için
+"""
+
+import time
+import socket
+import struct
+import argparse
+import threading
+import multiprocessing
+
+from connector import PROTO_CSV, PROTO_BINARY, HANDSHAKE_MODE, FEATURE_AUTO_RESET, FEATURE_ACTION_REPEAT
+from sim import RocketSim
+
+_FRAME_HEADER = struct.Struct("<H")
+
+
+class StandInServer():
+
+    def __init__(self, host="127.0.0.1", port=5000, binary=True, delay=0.0, auto_reset=True, action_repeat=True):
+        self.host = host
+        self.binary_supported = binary
+        self.auto_reset_supported = auto_reset
+        self.action_repeat_supported = action_repeat
+        self.delay = delay  # komut başına bekleme (Unity Update() frame temposunu taklit eder)
+        self.rocket = RocketSim()  # env.cs fiziğinin NumPy karşılığı
+        self.frames = 0  # işlenen komut sayısı (= round trip sayısı)
+
+        self._srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._srv.bind((host, port))
+        self._srv.listen(1)
+        self.port = self._srv.getsockname()[1]  # port=0 ise OS'in verdiği port
+
+        self._stop = False
+        self._thread = None
+
+    # --- sunucu yaşam döngüsü ---
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop = True
+        try:
+            self._srv.close()
+        except OSError:
+            pass
+
+    def serve_forever(self):
+        while not self._stop:
+            try:
+                client, _ = self._srv.accept()
+            except OSError:
+                break
+            with client:
+                client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                try:
+                    self._serve_client(client)
+                except (ConnectionError, OSError):
+                    pass
+
+    # --- protokol ---
+    def _serve_client(self, client):
+        proto = PROTO_CSV
+        buf = b""
+        while not self._stop:
+            if proto == PROTO_BINARY:
+                while len(buf) < _FRAME_HEADER.size:
+                    buf += self._recv(client)
+                (count,) = _FRAME_HEADER.unpack(buf[:_FRAME_HEADER.size])
+                end = _FRAME_HEADER.size + 4 * count
+                while len(buf) < end:
+                    buf += self._recv(client)
+                values = struct.unpack(f"<{count}f", buf[_FRAME_HEADER.size:end])
+                buf = buf[end:]
+                reply = self._feature_reply(values) or self.handle(values)
+                client.sendall(_FRAME_HEADER.pack(len(reply)) + struct.pack(f"<{len(reply)}f", *reply))
+                continue
+
+            while b"\n" not in buf:
+                buf += self._recv(client)
+            line, buf = buf.split(b"\n", 1)
+            line = line.decode("utf-8").strip()
+            if not line:
+                continue
+            values = [float(x) for x in line.split(",") if x.strip()]
+
+            is_version = len(values) == 2 and int(values[1]) < FEATURE_AUTO_RESET  # özellik kodu değil
+            if int(values[0]) == HANDSHAKE_MODE and self.binary_supported and is_version:
+                accepted = PROTO_BINARY if int(values[1]) == PROTO_BINARY else PROTO_CSV
+                client.sendall(f"{HANDSHAKE_MODE},{accepted}\n".encode("utf-8"))
+                proto = accepted
+                continue
+
+            reply = self._feature_reply(values) or self.handle(values)
+            # connector.cs gibi: state + "\n" + "\n" (boş satır Python tarafında yutuluyor)
+            client.sendall((",".join(repr(float(x)) for x in reply) + "\n\n").encode("utf-8"))
+
+    def _feature_reply(self, values):
+        """Desteklenen özellik isteğine "9,<kod>" cevabı; değilse None (Unity gibi normal komut işlenir)."""
+        if len(values) == 2 and int(values[0]) == HANDSHAKE_MODE:
+            code = int(values[1])
+            if (code == FEATURE_AUTO_RESET and self.auto_reset_supported) or \
+                    (code == FEATURE_ACTION_REPEAT and self.action_repeat_supported):
+                return [HANDSHAKE_MODE, code]
+        return None
+
+    @staticmethod
+    def _recv(client):
+        chunk = client.recv(4096)
+        if not chunk:
+            raise ConnectionError("İstemci bağlantıyı kapattı.")
+        return chunk
+
+    def handle(self, values):
+        """connector.cs Update(): doAction -> Physics.Simulate -> getStates"""
+        self.frames += 1
+        if self.delay > 0:
+            time.sleep(self.delay)
+        return self.rocket.handle(values).tolist()
+
+
+def _run_server(host, port, binary, delay, ready):
+    server = StandInServer(host, port, binary=binary, delay=delay)
+    ready.set()
+    server.serve_forever()
+
+
+def spawn_servers(n, base_port, host="127.0.0.1", binary=True, delay=0.0):
+    """
+    Ardışık portlarda (base_port .. base_port+n-1) N stand-in sunucuyu ayrı process'lerde başlatır.
+    Her biri ayrı bir Unity instance'ı gibi davranır (GIL paylaşılmaz).
+    """
+    procs = []
+    for i in range(n):
+        ready = multiprocessing.Event()
+        p = multiprocessing.Process(target=_run_server, args=(host, base_port + i, binary, delay, ready), daemon=True)
+        p.start()
+        ready.wait()
+        procs.append(p)
+    return procs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Unity connector.cs stand-in sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--count", type=int, default=1, help="Ardışık portlarda kaç instance açılacak")
+    parser.add_argument("--delay", type=float, default=0.0, help="Komut başına bekleme (saniye)")
+    parser.add_argument("--csv-only", action="store_true", help="Handshake'i reddet (eski Unity davranışı)")
+    args = parser.parse_args()
+
+    if args.count > 1:
+        procs = spawn_servers(args.count, args.port, args.host, binary=not args.csv_only, delay=args.delay)
+        print(f"{args.count} stand-in sunucu {args.host}:{args.port}-{args.port + args.count - 1} dinliyor")
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            pass
+    else:
+        server = StandInServer(args.host, args.port, binary=not args.csv_only, delay=args.delay)
+        print(f"Stand-in sunucu {args.host}:{server.port} dinliyor (binary={'hayır' if args.csv_only else 'evet'})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
@@ -3,6 +3,8 @@ import re
 import glob
 import gzip
 import pickle
+import queue
+import threading
 import warnings
 import numpy as np
 import tensorflow as tf
@@ -10,7 +12,12 @@ from datetime import datetime
 warnings.filterwarnings("ignore")
 
 from agent import PPOAgent
-from env import Env
+from log_schema import ensure_log_header
+from log_writer import LogSink
+from numpy_policy import NumpyPolicy
+from rollout_buffer import RolloutBuffer
+from traj_store import EPISODE_INDEX_FILE, episode_index_lines, rebuild_traj_index, write_trajectory
+from env import Env, HeadlessEnv
 
 def setup_gpu():
     """GPU kullanımını yapılandırır ve etkinleştirir"""
@@ -30,18 +37,45 @@ def setup_gpu():
 
 MODELS_DIR = "models"
 
+# True: Unity yerine sim.RocketSim (saf NumPy, env.cs fiziği) ile eğit - ödül/hiperparametre denemeleri için
+USE_HEADLESS_SIM = False
+
+# True: PPOAgent graph fonksiyonları (act / train step) ayrıca XLA ile derlenir
+USE_XLA = False
+
 # --- LOG DOSYALARI ---
 EP_LOG_FILE = os.path.join(MODELS_DIR, "episode_logs.csv") 
 UP_LOG_FILE = os.path.join(MODELS_DIR, "update_logs.csv")  
 DETAILED_LOG_FILE = os.path.join(MODELS_DIR, "detailed_log.csv") # <-- ÖNEMLİ OLAN BU
 STATE_LOG_FILE = os.path.join(MODELS_DIR, "state_log.csv") 
 
+# Ham yörünge kaydı (update başına traj_up{N}.traj, bkz. traj_store.py): tam 13'lü state, aksiyon,
+# ödül, done, logp, value - kayıpsız ve memmap ile okunur (analyses/rescore_rewards.py vb.)
+SAVE_TRAJECTORIES = True
+TRAJ_DIR = os.path.join(MODELS_DIR, "trajectories")
+# (update, episode) -> dosya/satır aralığı: tek episode tarama yapmadan okunur (traj_store.EpisodeIndex)
+TRAJ_INDEX_FILE = os.path.join(TRAJ_DIR, EPISODE_INDEX_FILE)
+# True: eski adım bazlı metin logu (state_log.csv) da yazılır; aynı veri .traj dosyalarında kayıpsız var
+STATE_LOG_CSV = False
+
+# True: TimeLimit bitişi gerçek terminal sayılmaz; GAE bitiş state'inin V'si ile bootstrap yapar
+BOOTSTRAP_TIMELIMIT = False
+
+# None: her update'te tüm PPO epoch'ları; değer (ör. 0.02): epoch ortalama KL'i aşınca kalan epoch'lar atlanır
+TARGET_KL = None
+
+# True: actor thread rollout k+1'i toplarken learner rollout k üzerinde eğitir (iki buffer dönüşümlü)
+PIPELINE = False
+# Actor'ün kullandığı ağırlıkların learner'a göre en fazla kaç update geride kalabileceği (0 = sıralı)
+MAX_POLICY_LAG = 1
+
+ROLLOUT_LEN = 1800
+TOTAL_UPDATES = 10000 # Uzun soluklu eğitim için artırdım
+SAVE_EVERY_UPDATES = 20
+
 if not os.path.exists(MODELS_DIR):
     os.makedirs(MODELS_DIR)
 
-def as_float32(x):
-    return np.asarray(x, dtype=np.float32)
-
 def save_agent_state(agent, path, extra=None):
     state = { "log_std": agent.log_std.numpy().tolist() }
     if extra: state.update(extra)
@@ -67,15 +101,265 @@ def latest_index(pattern, regex=r"_up(\d+)\.keras$"):
         if m: nums.append(int(m.group(1)))
     return max(nums) if nums else None
 
+def make_rollout_buffer(agent):
+    # Rollout verisi: bir kez ayrılır, her update'te sadece sayaç sıfırlanır (T, N=1)
+    return RolloutBuffer(ROLLOUT_LEN, n_envs=1, state_size=agent.state_size, action_size=agent.action_size,
+                         extra_fields={
+                             "traj_obs": ((13,), np.float32),     # aksiyonun alındığı RAW state
+                             "traj_states": ((13,), np.float32),  # adım sonrası RAW state
+                             "traj_steps": ((), np.int32),        # ödülde kullanılan step_count
+                             "traj_episode": ((), np.int64),
+                         })
+
+class RolloutActor():
+    """
+    Ortamı adımlayıp RolloutBuffer'ı dolduran taraf: episode sayaçları, episode/state logları,
+    yörünge kaydı. agent: act / act_batch sağlayan policy (NumpyPolicy; PPOAgent de olur).
+    log_sink: log satırlarının yazıldığı LogSink (main'de açılır).
+    PIPELINE modunda kendi thread'inde, learner'ın yayınladığı ağırlık kopyasıyla çalışır.
+    """
+
+    def __init__(self, enviroment, agent, log_sink):
+        self.env = enviroment
+        self.agent = agent
+        self.log_sink = log_sink
+
+        # Değişkenler
+        self.episode = 0
+        self.ep_return = 0.0
+        self.ep_len = 0
+
+        # İlk Reset
+        enviroment.initialStart()
+        # RAW state ping-pong buffer'ları: step_array bir sonraki state'i diğerine yazar
+        self.state_raw = np.empty(13, dtype=np.float32)
+        self.next_buf = np.empty(13, dtype=np.float32)
+        enviroment.read_states_array(out=self.state_raw)
+        self.state_norm = np.empty(13, dtype=np.float32)  # her adım yeniden kullanılır (normalize_state out=)
+        enviroment.normalize_state(self.state_raw, out=self.state_norm)
+
+        # --- BAŞLANGIÇ KOŞULLARINI KAYDET (Start Conditions) ---
+        self.start_alt = self.state_raw[1]  # Raw state loglar için
+        self.start_dist = np.sqrt(self.state_raw[0]**2 + self.state_raw[2]**2)
+
+    def collect(self, rollout, up):
+        """rollout'u baştan doldurur. Dönüş: son state'in value'su (GAE bootstrap)"""
+        enviroment, ajan = self.env, self.agent
+        state_raw, next_buf, state_norm = self.state_raw, self.next_buf, self.state_norm
+        rollout.reset()
+
+        for t in range(rollout.T):
+            action, logp, value = ajan.act(state_norm)  # Agent normalize state kullanır
+            next_state_raw, done, reward = enviroment.step_array(action, out=next_buf)
+            # Auto-reset: bitişte dönen state yeni episode'un ilk state'i, bitiş state'i info'da
+            final_state_raw = next_state_raw
+            if done and enviroment.auto_reset:
+                final_state_raw = enviroment.info["terminal_observation"]
+
+            # --- 1. DETAYLI ADIM LOGU (State & Actions) ---
+            # Her adımı kaydeder: Ne yaptı? (Thrust, Pitch) -> Ne Oldu? (dy, dx, vy)
+            # LOGLAR RAW STATE KULLANIR
+            # (varsayılan kapalı: aynı veri kayıpsız olarak traj_up{N}.traj'da)
+            if STATE_LOG_CSV:
+                thrust_val = (action[2] + 1) / 2 # Normalize (0-1 arası okumak için)
+                pitch_cmd = action[0]
+                # Format: up, ep, step, dy(yükseklik), dx(konum), vy(hız), thrust, pitch, reward
+                self.log_sink.write(STATE_LOG_FILE, f"{up},{self.episode},{t},{state_raw[1]:.2f},{state_raw[0]:.2f},{state_raw[4]:.2f},{thrust_val:.2f},{pitch_cmd:.2f},{reward:.3f}\n")
+
+            # Agent training için normalize edilmiş state sakla
+            rollout.add(states=state_norm, actions=action, old_logps=logp, rewards=reward,
+                        dones=1.0 if done else 0.0, values=value)
+            if SAVE_TRAJECTORIES:
+                rollout.traj_obs[t] = state_raw
+                rollout.traj_states[t] = final_state_raw
+                rollout.traj_steps[t] = enviroment.step_count
+                rollout.traj_episode[t] = self.episode
+
+            self.ep_return += reward
+            self.ep_len += 1
+
+            # Raw ve normalize state'leri güncelle (buffer'lar yer değiştirir, kopya yok)
+            state_raw, next_buf = next_state_raw, state_raw
+            enviroment.normalize_state(state_raw, out=state_norm)
+
+            if done:
+                self.episode += 1
+                reason = getattr(enviroment, 'termination_reason', 'Unknown')
+                if BOOTSTRAP_TIMELIMIT and reason == "TimeLimit":
+                    rollout.truncated[t] = True
+                    _, _, v_final = ajan.act_batch(enviroment.normalize_state(final_state_raw)[None, :])
+                    rollout.bootstrap_values[t] = v_final[0]
+
+                self._log_episode(up, reason, final_state_raw)
+
+                # --- YENİ BÖLÜM --- (auto-reset'te state_raw zaten yeni episode'un ilk state'i)
+                if not enviroment.auto_reset:
+                    enviroment.initialStart()
+                    enviroment.read_states_array(out=state_raw)
+                    enviroment.normalize_state(state_raw, out=state_norm)
+
+                # Yeni başlangıç şartlarını al (RAW STATE)
+                self.start_alt = state_raw[1]
+                self.start_dist = np.sqrt(state_raw[0]**2 + state_raw[2]**2)
+
+                self.ep_return = 0.0
+                self.ep_len = 0
+
+        self.state_raw, self.next_buf = state_raw, next_buf
+
+        if SAVE_TRAJECTORIES:
+            os.makedirs(TRAJ_DIR, exist_ok=True)
+            traj_name = f"traj_up{up}.traj"
+            index = write_trajectory(os.path.join(TRAJ_DIR, traj_name), {
+                "obs": rollout.traj_obs[:, 0],
+                "states": rollout.traj_states[:, 0],  # rescore_rewards ödülü bu state'ten hesaplar
+                "actions": rollout.actions[:, 0],
+                "rewards": rollout.rewards[:, 0],
+                "dones": rollout.dones[:, 0].astype(bool),
+                "logps": rollout.old_logps[:, 0],
+                "values": rollout.values[:, 0],
+                "step_counts": rollout.traj_steps[:, 0],
+                "episode": rollout.traj_episode[:, 0],
+            }, meta={"update": up, "max_steps": enviroment.max_steps,
+                     "reward_params": dict(enviroment.reward_params)})
+            self.log_sink.write(TRAJ_INDEX_FILE, "".join(episode_index_lines(up, traj_name, index)))
+
+        # GAE bootstrap: rollout'u toplayan policy ile son state'in value'su
+        _, _, last_value = ajan.act_batch(state_norm[None, :])
+        return float(last_value[0])
+
+    def _log_episode(self, up, reason, final_state_raw):
+        episode, ep_return, ep_len = self.episode, self.ep_return, self.ep_len
+        start_alt, start_dist = self.start_alt, self.start_dist
+
+        # --- SONUÇ ANALİZİ (Post-Mortem) ---
+        # Bölüm bittiğinde roketin son durumu neydi?
+        # LOGLAR RAW STATE KULLANIR
+        final_alt = final_state_raw[1]
+        final_dist = np.sqrt(final_state_raw[0]**2 + final_state_raw[2]**2)
+        final_vel = final_state_raw[4] # Yere çarpma hızı (vy)
+
+        # --- TEMİZ KONSOL ÇIKTISI ---
+        # Örnek: [EP 10] Crash | Ret: -500 | Start: 40m/5m | End: 0m/12m | Vel: -9.5
+        # Format: Start: [Dikey (Alt)] / [Yatay (Dist)], End: [Dikey (Alt)] / [Yatay (Dist)]
+        # PID ve timestamp eklendi: multiple instance'ları ayırt etmek için
+        pid = os.getpid()
+        timestamp = datetime.now().strftime("%H:%M:%S")
+
+        log_str = f"[PID {pid}] [EP {episode:<5}] {reason:<12} | Ret: {ep_return:>7.1f} | "
+        log_str += f"Start: {start_alt:>4.1f}m / {start_dist:>4.1f}m | "
+        log_str += f"End: {final_alt:>4.1f}m / {final_dist:>4.1f}m | Vel: {final_vel:>5.1f} m/s | {timestamp}"
+
+        # Başarılı ise YEŞİL yap, dikkat çeksin
+        # flush=True: Buffer sorununu çözer, output hemen görünür
+        if reason == "Success":
+            print(f"\033[92m{log_str}\033[0m", flush=True)
+        else:
+            print(log_str, flush=True)
+
+        # 1. Özet CSV (Excel için)
+        self.log_sink.write(EP_LOG_FILE, f"{episode},{ep_return:.6f},{ep_len},{up}\n")
+
+        # 2. Detaylı CSV (Analiz için)
+        # Low/Med etiketlerini kaldırdım, saf veri ekledim
+        self.log_sink.write(DETAILED_LOG_FILE, f"{episode},{up},{ep_return:.4f},{reason},{start_alt:.2f},{start_dist:.2f},{final_dist:.2f},{final_vel:.2f}\n")
+
+def learner_update(ajan, rollout, last_value):
+    # PPO Update (normalize edilmiş state kullan)
+    # Buffer view'leri kopyasız geçer; truncated sadece BOOTSTRAP_TIMELIMIT'te doludur
+    return ajan.train(rollout.states, rollout.actions, rollout.old_logps, rollout.rewards,
+                      rollout.dones, rollout.values, last_value,
+                      rollout.truncated, rollout.bootstrap_values)
+
+def log_update(ajan, log_sink, logs, up, policy_lag):
+    log_sink.write(UP_LOG_FILE, f"{up},{logs['loss']:.6f},{logs['policy_loss']:.6f},{logs['value_loss']:.6f},{logs['entropy']:.6f},{logs['kl']:.6f},{logs['clip_frac']:.6f},{logs['epochs']},{policy_lag}\n")
+
+    if (up + 1) % 10 == 0:
+        pid = os.getpid()
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        print(f"[PID {pid}] [UP {up+1}] loss={logs['loss']:.4f} ent={logs['entropy']:.4f} kl={logs['kl']:.4f} lag={policy_lag} | {timestamp}", flush=True)
+
+    if (up + 1) % SAVE_EVERY_UPDATES == 0:
+        print(f"[SAVE] Update {up+1}: Model kaydediliyor...")
+        ajan.model.save(os.path.join(MODELS_DIR, f"rocket_model_up{up+1}.keras"))
+        save_agent_state(ajan, os.path.join(MODELS_DIR, f"rocket_state_up{up+1}.pkl.gz"), {"update": up + 1})
+        # TF'siz çalıştırma için (play_test.py --bundle, actor process'leri)
+        ajan.export_bundle(os.path.join(MODELS_DIR, f"rocket_policy_up{up+1}.npz"))
+
+def run_sequential(enviroment, ajan, log_sink, start_update):
+    # Rollout NumPy policy ile (adım başına TF çağrısı yok); her update sonunda ağırlıklar eşitlenir
+    actor_policy = NumpyPolicy(ajan.policy_bundle())
+    actor = RolloutActor(enviroment, actor_policy, log_sink)
+    rollout = make_rollout_buffer(ajan)
+    for up in range(start_update, TOTAL_UPDATES):
+        last_value = actor.collect(rollout, up)
+        logs = learner_update(ajan, rollout, last_value)
+        actor_policy.set_weights(ajan.policy_bundle())
+        log_update(ajan, log_sink, logs, up, policy_lag=0)
+
+def run_pipeline(enviroment, ajan, log_sink, start_update):
+    """
+    Actor thread rollout k+1'i toplarken learner rollout k üzerinde eğitir; iki buffer dönüşümlü.
+    Actor, learner'ın her update sonunda yayınladığı policy bundle'ıyla NumPy'da çalışır
+    (TF çağrısı yok: learner'ın train graph'ıyla TF thread havuzunda yarışmaz).
+    Policy lag (rollout'u toplayan ağırlıkların kaç update geride olduğu) MAX_POLICY_LAG ile sınırlı.
+    """
+    free_buffers = queue.Queue()
+    full_buffers = queue.Queue()
+    for _ in range(2):
+        free_buffers.put(make_rollout_buffer(ajan))
+
+    # Yayınlanan ağırlıklar: version = o ağırlıklara kadar uygulanmış update sayısı
+    published = {"version": start_update, "bundle": ajan.policy_bundle()}
+    actor_policy = NumpyPolicy(published["bundle"])
+    cond = threading.Condition()
+    stop = threading.Event()
+
+    def actor_loop():
+        try:
+            actor = RolloutActor(enviroment, actor_policy, log_sink)
+            loaded = start_update
+            for up in range(start_update, TOTAL_UPDATES):
+                rollout = free_buffers.get()
+                with cond:
+                    cond.wait_for(lambda: published["version"] >= up - MAX_POLICY_LAG or stop.is_set())
+                    if stop.is_set():
+                        return
+                    version, bundle = published["version"], published["bundle"]
+                if version != loaded:
+                    actor_policy.set_weights(bundle)
+                    loaded = version
+                last_value = actor.collect(rollout, up)
+                full_buffers.put((rollout, last_value, version))
+        except BaseException as e:
+            full_buffers.put(e)
+
+    thread = threading.Thread(target=actor_loop, name="rollout-actor", daemon=True)
+    thread.start()
+    try:
+        for up in range(start_update, TOTAL_UPDATES):
+            item = full_buffers.get()
+            if isinstance(item, BaseException):
+                raise item
+            rollout, last_value, version = item
+            logs = learner_update(ajan, rollout, last_value)
+            with cond:
+                published["version"] = up + 1
+                published["bundle"] = ajan.policy_bundle()
+                cond.notify_all()
+            free_buffers.put(rollout)
+            log_update(ajan, log_sink, logs, up, policy_lag=up - version)
+    finally:
+        stop.set()
+        with cond:
+            cond.notify_all()
+
 if __name__ == "__main__":
     setup_gpu()
     
-    enviroment = Env()
-    ajan = PPOAgent()
-
-    ROLLOUT_LEN = 1800
-    TOTAL_UPDATES = 10000 # Uzun soluklu eğitim için artırdım
-    SAVE_EVERY_UPDATES = 20
+    enviroment = HeadlessEnv() if USE_HEADLESS_SIM else Env()
+    ajan = PPOAgent(jit_compile=USE_XLA)
+    ajan.target_kl = TARGET_KL
 
     # Resume işlemleri
     start_update = 0
@@ -92,141 +376,26 @@ if __name__ == "__main__":
              print(f"HATA: Model yüklenemedi! Sıfırdan başlanıyor. {e}")
     
     # --- LOG BAŞLIKLARI (Yoksa Oluştur) ---
-    if not os.path.exists(EP_LOG_FILE):
-        with open(EP_LOG_FILE, "w", encoding="utf-8") as f:
-            f.write("Episode,Return,EpisodeLen,Update\n")
-            
-    if not os.path.exists(UP_LOG_FILE):
-        with open(UP_LOG_FILE, "w", encoding="utf-8") as f:
-            f.write("Update,Loss,PolicyLoss,ValueLoss,Entropy,KL,ClipFrac\n")
-
-    # DETAYLI LOG BAŞLIĞI
-    if not os.path.exists(DETAILED_LOG_FILE):
-        with open(DETAILED_LOG_FILE, "w", encoding="utf-8") as f:
-            # Difficulty sütunu ekledim
-            f.write("Episode,Update,Return,Reason,StartAlt,StartDist,Difficulty\n")
-            
-    if not os.path.exists(STATE_LOG_FILE):
-        with open(STATE_LOG_FILE, "w", encoding="utf-8") as f:
-            f.write("Update,Episode,Step,dy,dx,vy,thrust,pitch,reward\n")
-
-    # Değişkenler
-    episode = 0
-    ep_return = 0.0
-    ep_len = 0
-
-    # İlk Reset
-    enviroment.initialStart()
-    state_raw = as_float32(enviroment.readStates())
-    state_norm = as_float32(enviroment.normalize_state(state_raw))
-    
-    # --- BAŞLANGIÇ KOŞULLARINI KAYDET (Start Conditions) ---
-    start_alt = state_raw[1]  # Raw state loglar için
-    start_dist = np.sqrt(state_raw[0]**2 + state_raw[2]**2)
-    # -------------------------------------------------------
-
-    for up in range(start_update, TOTAL_UPDATES):
-        states = np.zeros((ROLLOUT_LEN, ajan.state_size), dtype=np.float32)
-        actions = np.zeros((ROLLOUT_LEN, ajan.action_size), dtype=np.float32)
-        old_logps = np.zeros((ROLLOUT_LEN,), dtype=np.float32)
-        rewards = np.zeros((ROLLOUT_LEN,), dtype=np.float32)
-        dones = np.zeros((ROLLOUT_LEN,), dtype=np.float32)
-        values = np.zeros((ROLLOUT_LEN,), dtype=np.float32)
-
-        for t in range(ROLLOUT_LEN):
-            action, logp, value = ajan.act(state_norm)  # Agent normalize state kullanır
-            next_state_raw, done, reward = enviroment.step(action)
-
-            # --- 1. DETAYLI ADIM LOGU (State & Actions) ---
-            # Her adımı kaydeder: Ne yaptı? (Thrust, Pitch) -> Ne Oldu? (dy, dx, vy)
-            # LOGLAR RAW STATE KULLANIR
-            with open(STATE_LOG_FILE, "a", encoding="utf-8") as f:
-                thrust_val = (action[2] + 1) / 2 # Normalize (0-1 arası okumak için)
-                pitch_cmd = action[0]
-                # Format: up, ep, step, dy(yükseklik), dx(konum), vy(hız), thrust, pitch, reward
-                f.write(f"{up},{episode},{t},{state_raw[1]:.2f},{state_raw[0]:.2f},{state_raw[4]:.2f},{thrust_val:.2f},{pitch_cmd:.2f},{reward:.3f}\n")
+    # Sürümlü şema başlığı (bkz. log_schema.LOG_SCHEMAS); eski sürümdeki loglar bir kez taşınır
+    ensure_log_header(EP_LOG_FILE, "episode")
+    # Eski update logu: o update'lerde her zaman tüm epoch'lar çalıştı ve eğitim sıralıydı (lag 0)
+    ensure_log_header(UP_LOG_FILE, "update", defaults={"Epochs": ajan.epochs, "PolicyLag": 0})
+    # Detaylı log: eski 7 sütunlu başlık (Difficulty) aslında 8 değerli satırlar içeriyordu, başlık düzeltilir
+    ensure_log_header(DETAILED_LOG_FILE, "detailed")
+    if STATE_LOG_CSV:
+        ensure_log_header(STATE_LOG_FILE, "state")
 
-            # Agent training için normalize edilmiş state sakla
-            states[t] = state_norm
-            actions[t] = action
-            old_logps[t] = logp
-            rewards[t] = reward
-            dones[t] = 1.0 if done else 0.0
-            values[t] = value
-
-            ep_return += reward
-            ep_len += 1
-            
-            # Raw ve normalize state'leri güncelle
-            state_raw = as_float32(next_state_raw)
-            state_norm = as_float32(enviroment.normalize_state(state_raw))
+    if SAVE_TRAJECTORIES and not os.path.exists(TRAJ_INDEX_FILE):
+        # İlk çalıştırma: sadece başlık; indekssiz eski .traj'lar varsa header'larından eklenir
+        os.makedirs(TRAJ_DIR, exist_ok=True)
+        rebuild_traj_index(TRAJ_DIR, TRAJ_INDEX_FILE)
 
-            if done:
-                episode += 1
-                reason = getattr(enviroment, 'termination_reason', 'Unknown')
-                
-                # --- SONUÇ ANALİZİ (Post-Mortem) ---
-                # Bölüm bittiğinde roketin son durumu neydi?
-                # LOGLAR RAW STATE KULLANIR
-                final_alt = state_raw[1]
-                final_dist = np.sqrt(state_raw[0]**2 + state_raw[2]**2)
-                final_vel = state_raw[4] # Yere çarpma hızı (vy)
-                
-                # --- TEMİZ KONSOL ÇIKTISI ---
-                # Örnek: [EP 10] Crash | Ret: -500 | Start: 40m/5m | End: 0m/12m | Vel: -9.5
-                # Format: Start: [Dikey (Alt)] / [Yatay (Dist)], End: [Dikey (Alt)] / [Yatay (Dist)]
-                # PID ve timestamp eklendi: multiple instance'ları ayırt etmek için
-                pid = os.getpid()
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                
-                log_str = f"[PID {pid}] [EP {episode:<5}] {reason:<12} | Ret: {ep_return:>7.1f} | "
-                log_str += f"Start: {start_alt:>4.1f}m / {start_dist:>4.1f}m | "
-                log_str += f"End: {final_alt:>4.1f}m / {final_dist:>4.1f}m | Vel: {final_vel:>5.1f} m/s | {timestamp}"
-                
-                # Başarılı ise YEŞİL yap, dikkat çeksin
-                # flush=True: Buffer sorununu çözer, output hemen görünür
-                if reason == "Success":
-                    print(f"\033[92m{log_str}\033[0m", flush=True) 
-                else:
-                    print(log_str, flush=True)
-
-                # 1. Özet CSV (Excel için)
-                with open(EP_LOG_FILE, "a", encoding="utf-8") as f:
-                    f.write(f"{episode},{ep_return:.6f},{ep_len},{up}\n")
-
-                # 2. Detaylı CSV (Analiz için)
-                with open(DETAILED_LOG_FILE, "a", encoding="utf-8") as f:
-                    # Low/Med etiketlerini kaldırdım, saf veri ekledim
-                    f.write(f"{episode},{up},{ep_return:.4f},{reason},{start_alt:.2f},{start_dist:.2f},{final_dist:.2f},{final_vel:.2f}\n")
-
-                # --- YENİ BÖLÜM ---
-                enviroment.initialStart()
-                state_raw = as_float32(enviroment.readStates())
-                state_norm = as_float32(enviroment.normalize_state(state_raw))
-                
-                # Yeni başlangıç şartlarını al (RAW STATE)
-                start_alt = state_raw[1]
-                start_dist = np.sqrt(state_raw[0]**2 + state_raw[2]**2)
-                
-                ep_return = 0.0
-                ep_len = 0
-
-        # PPO Update Loop (normalize edilmiş state kullan)
-        s_tf = tf.convert_to_tensor(state_norm[None, :], dtype=tf.float32)
-        _, v_tf = ajan.model(s_tf)
-        last_value = float(tf.squeeze(v_tf, axis=0).numpy()[0])
-
-        logs = ajan.train(states, actions, old_logps, rewards, dones, values, last_value)
-
-        with open(UP_LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{up},{logs['loss']:.6f},{logs['policy_loss']:.6f},{logs['value_loss']:.6f},{logs['entropy']:.6f},{logs['kl']:.6f},{logs['clip_frac']:.6f}\n")
-
-        if (up + 1) % 10 == 0:
-            pid = os.getpid()
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"[PID {pid}] [UP {up+1}] loss={logs['loss']:.4f} ent={logs['entropy']:.4f} kl={logs['kl']:.4f} | {timestamp}", flush=True)
-
-        if (up + 1) % SAVE_EVERY_UPDATES == 0:
-            print(f"[SAVE] Update {up+1}: Model kaydediliyor...")
-            ajan.model.save(os.path.join(MODELS_DIR, f"rocket_model_up{up+1}.keras"))
-            save_agent_state(ajan, os.path.join(MODELS_DIR, f"rocket_state_up{up+1}.pkl.gz"), {"update": up + 1})
\ No newline at end of file
+    # Log satırları bellekte birikir, arka plan thread'i toplu yazar (adım başına dosya aç/kapa yok)
+    log_sink = LogSink()
+    try:
+        if PIPELINE:
+            run_pipeline(enviroment, ajan, log_sink, start_update)
+        else:
+            run_sequential(enviroment, ajan, log_sink, start_update)
+    finally:
+        log_sink.close()  # bekleyen log satırlarını boşalt (hata / Ctrl+C dahil)
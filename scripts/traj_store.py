@@ -0,0 +1,406 @@
+"""
+Yörünge Deposu: update başına tek dosyalık, sütun bazlı (columnar) binary kayıt
+- state_log.csv (9 yuvarlanmış metin sütunu) ve traj_up*.npz yerine: kayıpsız, metin parse'ı yok
+- Dosya düzeni (.traj):
+    [8 bayt magic "RKTTRAJ1"] [8 bayt header uzunluğu (uint64, little-endian)] [JSON header]
+    [sütunlar: her biri 64 bayt hizalı, ham little-endian dizi]
+- Header: adım sayısı, sütunların dtype/şekil/offset'i, meta (update, max_steps, reward_params)
+  ve episode sınırları indeksi (episode, başlangıç satırı, uzunluk)
+- Okuma np.memmap ile: sadece erişilen sütunun sayfaları diskten gelir, kopya yok
+- Kullanım:
+    write_trajectory("models/trajectories/traj_up12.traj", {"obs": obs, "rewards": r, ...}, meta={"update": 12})
+    traj = TrajectoryFile("models/trajectories/traj_up12.traj")
+    traj["rewards"], traj.episode(41)["actions"]
+"""
+
+import os
+import re
+import glob
+import json
+import numpy as np
+
+from log_schema import LOG_SCHEMAS, header_text, read_schema, schema_dtypes
+
+TRAJ_MAGIC = b"RKTTRAJ1"
+TRAJ_EXT = ".traj"
+_ALIGN = 64
+
+
+def episode_index(episode):
+    """Satır başına episode numarasından sınır indeksi: {"episode", "start", "length"} (listeler)"""
+    episode = np.asarray(episode)
+    if len(episode) == 0:
+        return {"episode": [], "start": [], "length": []}
+    starts = np.flatnonzero(np.r_[True, episode[1:] != episode[:-1]])
+    lengths = np.diff(np.append(starts, len(episode)))
+    return {"episode": episode[starts].tolist(), "start": starts.tolist(), "length": lengths.tolist()}
+
+
+def write_trajectory(path, columns, meta=None, episode_column="episode"):
+    """
+    columns: {ad: dizi}, hepsi aynı satır sayısında (ilk eksen = adım).
+    episode_column varsa sınır indeksi header'a yazılır. Dosya atomik yazılır (tmp + os.replace).
+    Dönüş: episode sınır indeksi (bkz. episode_index) veya None
+    """
+    arrays = {key: np.ascontiguousarray(value) for key, value in columns.items()}
+    lengths = {len(a) for a in arrays.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Sütun uzunlukları farklı: {sorted(lengths)}")
+    n_steps = lengths.pop() if lengths else 0
+
+    # Header uzunluğu offset'lere bağlı: önce göreli offset'ler, sonra veri başlangıcı eklenir
+    layout = {}
+    offset = 0
+    for key, a in arrays.items():
+        layout[key] = {"dtype": a.dtype.newbyteorder("<").str, "shape": list(a.shape[1:]), "offset": offset}
+        offset += -(-a.nbytes // _ALIGN) * _ALIGN
+    header = {
+        "version": 1,
+        "n_steps": n_steps,
+        "columns": layout,
+        "meta": meta or {},
+        "episodes": episode_index(arrays[episode_column]) if episode_column in arrays else None,
+    }
+    # data_start header'ın kendi içinde; uzunluğu sabitlenene kadar tekrar kodla
+    data_start = 0
+    while True:
+        header["data_start"] = data_start
+        raw = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        need = -(-(16 + len(raw)) // _ALIGN) * _ALIGN
+        if need == data_start:
+            break
+        data_start = need
+    raw = raw.ljust(data_start - 16, b" ")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(TRAJ_MAGIC)
+        f.write(np.uint64(len(raw)).tobytes())
+        f.write(raw)
+        for key, a in arrays.items():
+            f.seek(data_start + layout[key]["offset"])
+            f.write(a.astype(layout[key]["dtype"], copy=False).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return header["episodes"]
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic = f.read(8)
+        if magic != TRAJ_MAGIC:
+            raise ValueError(f"Yörünge dosyası değil: {path}")
+        n = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+        return json.loads(f.read(n).decode("utf-8"))
+
+
+class TrajectoryFile():
+    """
+    .traj dosyasının memmap okuyucusu. traj["actions"] -> (n_steps, 4) salt okunur view.
+    Dosya handle'ı view'ler yaşadığı sürece açık kalır (Windows'ta silme/üzerine yazma engellenir).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header = read_header(path)
+        self.meta = self.header["meta"]
+        self.n_steps = self.header["n_steps"]
+        self.columns = tuple(self.header["columns"])
+        self._mm = None
+        self._cache = {}
+
+    def __len__(self):
+        return self.n_steps
+
+    def __contains__(self, key):
+        return key in self.header["columns"]
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            col = self.header["columns"][key]
+            shape = (self.n_steps,) + tuple(col["shape"])
+            if self.n_steps == 0:
+                self._cache[key] = np.zeros(shape, dtype=col["dtype"])
+            else:
+                if self._mm is None:
+                    self._mm = np.memmap(self.path, dtype=np.uint8, mode="r")
+                self._cache[key] = np.ndarray(shape, dtype=col["dtype"], buffer=self._mm,
+                                              offset=self.header["data_start"] + col["offset"])
+        return self._cache[key]
+
+    def load(self, keys=None):
+        """Sütunları bellekte kopya olarak döner: {ad: dizi} (keys=None: hepsi)"""
+        return {key: np.array(self[key]) for key in (keys or self.columns)}
+
+    @property
+    def episodes(self):
+        """Episode sınırları: [(episode, başlangıç, uzunluk), ...]; ilk/son parça başka dosyada devam edebilir"""
+        idx = self.header.get("episodes") or {"episode": [], "start": [], "length": []}
+        return list(zip(idx["episode"], idx["start"], idx["length"]))
+
+    def episode(self, episode, keys=None):
+        """Tek episode'un bu dosyadaki satırları: {ad: view}"""
+        for ep, start, length in self.episodes:
+            if ep == episode:
+                return {key: self[key][start:start + length] for key in (keys or self.columns)}
+        raise KeyError(f"Episode {episode} bu dosyada yok: {self.path}")
+
+    def close(self):
+        self._cache.clear()
+        self._mm = None
+
+
+def list_trajectories(traj_dir, first=None, last=None, ext=TRAJ_EXT):
+    """traj_up{N}<ext> dosyalarını update sırasıyla döner: [(update, path), ...]"""
+    files = []
+    pattern = re.compile(r"traj_up(\d+)" + re.escape(ext) + "$")
+    for path in glob.glob(os.path.join(traj_dir, "traj_up*" + ext)):
+        m = pattern.search(os.path.basename(path))
+        if not m:
+            continue
+        up = int(m.group(1))
+        if (first is None or up >= first) and (last is None or up <= last):
+            files.append((up, path))
+    return sorted(files)
+
+
+def load_columns(traj_dir, keys, first=None, last=None):
+    """Update aralığındaki dosyaların istenen sütunlarını uç uca ekler: {ad: dizi, "update": (n,)}"""
+    parts = {key: [] for key in keys}
+    updates = []
+    for up, path in list_trajectories(traj_dir, first, last):
+        traj = TrajectoryFile(path)
+        for key in keys:
+            parts[key].append(np.array(traj[key]))
+        updates.append(np.full(len(traj), up, dtype=np.int64))
+        traj.close()
+    out = {key: np.concatenate(v) if v else np.zeros(0) for key, v in parts.items()}
+    out["update"] = np.concatenate(updates) if updates else np.zeros(0, dtype=np.int64)
+    return out
+
+
+# --- Episode indeksi: (update, episode) -> dosya, offset, uzunluk ---
+# Tek CSV (şema episode_index/v1): Update,Episode,File,Offset,Length. File indeks dosyasına göre göreli yol;
+# .traj için Offset/Length satır, metin log (eski state_log.csv) için bayt cinsinden.
+EPISODE_INDEX_FILE = "episode_index.csv"
+
+
+def episode_index_lines(update, file_name, index):
+    """episode_index() çıktısını indeks satırlarına çevirir (train_main her .traj yazımında ekler)"""
+    return [f"{update},{ep},{file_name},{start},{length}\n"
+            for ep, start, length in zip(index["episode"], index["start"], index["length"])]
+
+
+def rebuild_traj_index(traj_dir, index_path=None):
+    """Mevcut .traj dosyalarının header'larından indeksi baştan yazar (veri okunmaz)"""
+    index_path = index_path or os.path.join(traj_dir, EPISODE_INDEX_FILE)
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(header_text("episode_index"))
+        for up, path in list_trajectories(traj_dir):
+            header = read_header(path)
+            if header.get("episodes"):
+                rel = os.path.relpath(path, os.path.dirname(index_path) or ".")
+                f.writelines(episode_index_lines(up, rel, header["episodes"]))
+    os.replace(tmp, index_path)
+    return index_path
+
+
+def rebuild_csv_index(csv_path, index_path=None, block_size=64 << 20):
+    """
+    Metin adım logunu (ilk iki sütun Update,Episode) bir kez tarayıp bayt offset indeksi yazar.
+    Dosya blok blok okunur (bellek block_size ile sınırlı); satır sınırları NumPy ile, ilk iki sütun pandas C parser ile.
+    """
+    import io
+    import pandas as pd
+
+    index_path = index_path or os.path.splitext(csv_path)[0] + ".index.csv"
+    rel = os.path.relpath(csv_path, os.path.dirname(index_path) or ".")
+    out = [header_text("episode_index")]
+    seg = None  # açık segment: [update, episode, offset, end]
+
+    with open(csv_path, "rb") as f:
+        read_schema(f)  # sürüm satırı + başlık
+        base = f.tell()
+        tail = b""
+        while True:
+            chunk = f.read(block_size)
+            data = tail + chunk
+            if not chunk:
+                if not data:
+                    break
+                if not data.endswith(b"\n"):
+                    data += b"\n"  # son satırda '\n' yoksa
+                cut = len(data)
+            else:
+                cut = data.rfind(b"\n") + 1
+                if cut == 0:
+                    tail = data
+                    continue
+            block, tail = data[:cut], data[cut:]
+            ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10) + 1
+            starts = np.r_[0, ends[:-1]]
+            keys = pd.read_csv(io.BytesIO(block), header=None, usecols=[0, 1], skip_blank_lines=False,
+                               dtype="float64").to_numpy()
+            keys = np.where(np.isnan(keys), -1, keys).astype(np.int64)  # boş satır: (-1, -1), indekslenmez
+            # Blok içinde (update, episode) değişim noktaları -> segmentler
+            change = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+            first = np.r_[0, change]
+            last = np.r_[change, len(keys)] - 1
+            for i, j in zip(first, last):
+                up, ep = int(keys[i, 0]), int(keys[i, 1])
+                if seg is not None and seg[0] == up and seg[1] == ep and seg[3] == base + int(starts[i]):
+                    seg[3] = base + int(ends[j])  # önceki bloktan devam
+                    continue
+                if seg is not None and seg[0] >= 0:
+                    out.append(f"{seg[0]},{seg[1]},{rel},{seg[2]},{seg[3] - seg[2]}\n")
+                seg = [up, ep, base + int(starts[i]), base + int(ends[j])]
+            base += len(block)
+            if not chunk:
+                break
+    if seg is not None and seg[0] >= 0:
+        out.append(f"{seg[0]},{seg[1]},{rel},{seg[2]},{seg[3] - seg[2]}\n")
+
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(out)
+    os.replace(tmp, index_path)
+    return index_path
+
+
+class EpisodeIndex():
+    """
+    Episode indeksi okuyucusu: tek episode'u (veya aralığı) dosya başına tek seek ile döner.
+    Sonuç {sütun: dizi}; .traj için tüm sütunlar, metin log için başlıktaki sütunlar.
+    Aynı update birden fazla blokta geçiyorsa (resume sonrası yeniden yazılan update) son blok geçerlidir.
+    train_main episode sayacını her çalıştırmada sıfırladığı için episode numarası oturumlar (run) arasında
+    tekrar eder: update'ler sırayla gezilirken episode numarası geri giderse ya da update atlanırsa yeni run
+    başlar (runs: her run'ın ilk update'i). Anahtar (run, episode); update verilirse o update'in run'ı seçilir,
+    verilmezse episode birden fazla run'da geçiyorsa ValueError.
+    """
+
+    def __init__(self, index_path):
+        self.path = index_path
+        self.base_dir = os.path.dirname(index_path) or "."
+        by_update = {}
+        prev = None  # (update, dosya, bitiş offset'i)
+        with open(index_path, "r", encoding="utf-8") as f:
+            read_schema(f, "episode_index")
+            for line in f:
+                parts = line.rstrip("\n").split(",")
+                if len(parts) != 5:
+                    continue  # yarım kalmış son satır
+                up, ep, name, off, length = int(parts[0]), int(parts[1]), parts[2], int(parts[3]), int(parts[4])
+                # Bu update'in yeni bloğu (başka update'ten sonra ya da offset geri gitmiş): eskisini geçersiz kıl
+                if prev is None or up != prev[0] or (name == prev[1] and off < prev[2]):
+                    by_update[up] = []
+                prev = (up, name, off + length)
+                by_update[up].append((up, ep, name, off, length))
+
+        self.runs = []
+        keyed = []
+        prev_up = prev_ep = None
+        for up in sorted(by_update):
+            segs = by_update[up]
+            if prev_up is None or up != prev_up + 1 or segs[0][1] < prev_ep:
+                self.runs.append(up)
+            keyed.extend((self.runs[-1],) + s for s in segs)
+            prev_up, prev_ep = up, max(s[1] for s in segs)
+        keyed.sort(key=lambda k: (k[2], k[0], k[1]))  # episode, run, update
+        self.segments = [k[1:] for k in keyed]
+        self._runs = np.array([k[0] for k in keyed], dtype=np.int64)
+        self._episodes = np.array([s[1] for s in self.segments], dtype=np.int64)
+        self._files = {}
+
+    @classmethod
+    def for_trajectories(cls, traj_dir, rebuild=False):
+        """traj_dir'deki indeksi açar; yoksa (veya rebuild=True) .traj header'larından kurar"""
+        path = os.path.join(traj_dir, EPISODE_INDEX_FILE)
+        if rebuild or not os.path.exists(path):
+            rebuild_traj_index(traj_dir, path)
+        return cls(path)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def run_of(self, update):
+        """update'in ait olduğu run (ilk update'i); indeksin başından önceyse None"""
+        i = np.searchsorted(self.runs, update, side="right") - 1
+        return self.runs[i] if i >= 0 else None
+
+    def lookup(self, first, last=None, update=None):
+        """
+        Episode aralığının segmentleri: [(update, episode, dosya, offset, uzunluk), ...] (episode, update sırasıyla).
+        update: aranacak run'ı seçer (o update'i içeren run). Verilmezse aralık birden fazla run'a düşüyorsa ValueError.
+        """
+        last = first if last is None else last
+        lo = np.searchsorted(self._episodes, first, side="left")
+        hi = np.searchsorted(self._episodes, last, side="right")
+        runs = self._runs[lo:hi]
+        if update is not None:
+            keep = np.flatnonzero(runs == self.run_of(update))
+            return [self.segments[lo + i] for i in keep]
+        found = sorted(set(runs.tolist()))
+        if len(found) > 1:
+            spans = ", ".join(f"{a}-{b}" for a, b in self.run_spans(first, last))
+            raise ValueError(f"Episode {first}{'' if last == first else f'..{last}'} birden fazla run'da geçiyor "
+                             f"(update aralıkları: {spans}); update verin")
+        return self.segments[lo:hi]
+
+    def run_spans(self, first, last=None):
+        """Episode aralığının geçtiği her run için (ilk update, son update)"""
+        last = first if last is None else last
+        lo = np.searchsorted(self._episodes, first, side="left")
+        hi = np.searchsorted(self._episodes, last, side="right")
+        spans = {}
+        for run, seg in zip(self._runs[lo:hi].tolist(), self.segments[lo:hi]):
+            a, b = spans.get(run, (seg[0], seg[0]))
+            spans[run] = (min(a, seg[0]), max(b, seg[0]))
+        return [spans[run] for run in sorted(spans)]
+
+    def episode(self, episode, update=None):
+        """Tek episode; update sınırını aşan episode'un parçaları birleştirilir (aynı run içinde ardışık update'ler)"""
+        segs = self.lookup(episode, update=update)
+        if not segs:
+            raise KeyError(f"Episode {episode} indekste yok: {self.path}")
+        return self._read(segs)
+
+    def episodes(self, first, last, update=None):
+        """first..last (dahil) arası episode'lar tek sonuçta (dosya başına tek bitişik okuma)"""
+        return self._read(self.lookup(first, last, update=update))
+
+    def _read(self, segs):
+        # Aynı dosyada bitişik segmentler tek aralıkta birleşir: dosya başına tek seek
+        spans = []
+        for up, ep, name, off, length in sorted(segs, key=lambda s: (s[0], s[1])):
+            if spans and spans[-1][0] == name and spans[-1][2] == off:
+                spans[-1][2] = off + length
+            else:
+                spans.append([name, off, off + length])
+        parts = [self._read_span(name, lo, hi) for name, lo, hi in spans]
+        if len(parts) == 1:
+            return parts[0]
+        return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+    def _read_span(self, name, lo, hi):
+        path = os.path.join(self.base_dir, name)
+        if name.endswith(TRAJ_EXT):
+            traj = self._files.get(name)
+            if traj is None:
+                traj = self._files[name] = TrajectoryFile(path)
+            return {key: traj[key][lo:hi] for key in traj.columns}
+
+        import io
+        import pandas as pd
+        with open(path, "rb") as f:
+            log_name, version, columns, _ = read_schema(f)
+            f.seek(lo)
+            raw = f.read(hi - lo)
+        dtypes = schema_dtypes(log_name, version) if log_name in LOG_SCHEMAS else None
+        df = pd.read_csv(io.BytesIO(raw), header=None, names=columns, dtype=dtypes)
+        return {key: df[key].to_numpy() for key in columns}
+
+    def close(self):
+        for traj in self._files.values():
+            traj.close()
+        self._files.clear()
@@ -0,0 +1,125 @@
+"""
+VecEnv / ConnectorPool cevap yönlendirmesi: N stand-in sunucu (port=0, OS'in verdiği portlar) üzerinde
+her env'in yörüngesi, aynı reset seed'i ve aksiyonlarla tek Env + ayrı sunucudan alınan referansla
+birebir aynı olmalı. Cevaplar env'ler arasında karışırsa veya sırası kayarsa yörüngeler ayrışır.
+Tam itki episode'ları kısa tutar (CeilingHit): per-index initialStart / readStates yolu da sınanır.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from connector import Connector, ConnectorPool  # noqa: E402
+from env import Env, VecEnv  # noqa: E402
+from standin_server import StandInServer  # noqa: E402
+
+N_ENVS = 3
+STEPS = 300
+TIMEOUT = 30.0  # yanlış env'e giden komutta read_all cevabı sonsuza kadar bekler: takılma = hata
+
+
+@pytest.fixture
+def servers():
+    started = [StandInServer(port=0).start() for _ in range(N_ENVS)]
+    yield started
+    for server in started:
+        server.stop()
+
+
+def make_actions(n, steps):
+    actions = np.random.default_rng(1234).uniform(-1.0, 1.0, (n, steps, 4)).astype(np.float32)
+    actions[:, :, 2] = 1.0  # tam itki -> CeilingHit
+    return actions
+
+
+def rollout_single(port, binary, auto_reset, seed, actions):
+    """Referans: tek Env, kendi sunucusunda. Dönüş: states (T, 13), dones (T,), rewards (T,)"""
+    env = Env(con=Connector("127.0.0.1", port, binary=binary), auto_reset=auto_reset, action_repeat=1)
+    env.rng = np.random.default_rng(seed)
+    states = np.empty((len(actions), 13), dtype=np.float32)
+    dones = np.zeros(len(actions), dtype=bool)
+    rewards = np.zeros(len(actions), dtype=np.float32)
+    env.initialStart()
+    env.read_states_array()
+    for t, a in enumerate(actions):
+        _, dones[t], rewards[t] = env.step_array(a, out=states[t])
+        if dones[t] and not env.auto_reset:
+            env.initialStart()
+            env.read_states_array()
+    env.con.close()
+    return states, dones, rewards
+
+
+def rollout_vec(ports, binary, auto_reset, seeds, actions):
+    """VecEnv ile aynı rollout: states (T, N, 13), dones (T, N), rewards (T, N)"""
+    n, steps = actions.shape[:2]
+    pool = ConnectorPool("127.0.0.1", None, n, binary=binary, ports=ports)
+    venv = VecEnv(n, pool=pool, auto_reset=auto_reset, action_repeat=1)
+    for e, seed in zip(venv.envs, seeds):
+        e.rng = np.random.default_rng(seed)
+    states = np.empty((steps, n, 13), dtype=np.float32)
+    dones = np.zeros((steps, n), dtype=bool)
+    rewards = np.zeros((steps, n), dtype=np.float32)
+    venv.initialStart()
+    venv.readStates()
+    for t in range(steps):
+        states[t], dones[t], rewards[t] = venv.step(actions[:, t])
+        if dones[t].any() and not auto_reset:
+            idx = list(np.flatnonzero(dones[t]))
+            venv.initialStart(idx)
+            venv.readStates(idx)
+    for con in pool.cons:
+        con.close()
+    return states, dones, rewards
+
+
+def run_with_timeout(fn, *args):
+    result = {}
+
+    def target():
+        try:
+            result["value"] = fn(*args)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT)
+    assert not thread.is_alive(), "VecEnv cevap beklerken takıldı (komut yanlış env'e gitmiş olabilir)"
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("auto_reset", [False, True])
+def test_vecenv_matches_single_env_reference(servers, binary, auto_reset):
+    actions = make_actions(N_ENVS, STEPS)
+    seeds = [100 + i for i in range(N_ENVS)]
+    states, dones, rewards = run_with_timeout(rollout_vec, [s.port for s in servers], binary, auto_reset,
+                                              seeds, actions)
+
+    # Reset yolu gerçekten sınandı: her env birden fazla episode bitirdi, ve env'ler farklı anlarda bitti
+    assert (dones.sum(axis=0) >= 2).all(), dones.sum(axis=0)
+    assert any(dones[t].any() and not dones[t].all() for t in range(STEPS))
+    # Yörüngeler birbirinden farklı, yoksa karışma fark edilmez
+    for i in range(N_ENVS):
+        for j in range(i + 1, N_ENVS):
+            assert not np.array_equal(states[:, i], states[:, j])
+
+    ref_server = StandInServer(port=0).start()
+    try:
+        for i in range(N_ENVS):
+            ref_states, ref_dones, ref_rewards = rollout_single(ref_server.port, binary, auto_reset,
+                                                                seeds[i], actions[i])
+            np.testing.assert_array_equal(states[:, i], ref_states, err_msg=f"env {i} state")
+            np.testing.assert_array_equal(dones[:, i], ref_dones, err_msg=f"env {i} done")
+            np.testing.assert_array_equal(rewards[:, i], ref_rewards, err_msg=f"env {i} reward")
+    finally:
+        ref_server.stop()